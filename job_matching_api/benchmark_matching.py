@@ -0,0 +1,226 @@
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from src.synthetic_data import SyntheticDataGenerator, write_sqlite
+
+print("Benchmarking the matching engine...")
+
+# Benchmark settings
+POOL_SIZES = [int(size) for size in os.environ.get('BENCHMARK_SIZES', '1000,10000,100000,1000000').split(',')]
+CASES = os.environ.get(
+    'BENCHMARK_CASES', 'prepare_features,train_models,calculate_skill_similarity,match_candidates_to_job,matches_endpoint'
+).split(',')
+REPEATS = int(os.environ.get('BENCHMARK_REPEATS', '5'))
+# A case stops repeating once it has run this long; it always runs at least once
+CASE_BUDGET_S = float(os.environ.get('BENCHMARK_CASE_SECONDS', '30'))
+SKILL_CALLS = int(os.environ.get('BENCHMARK_SKILL_CALLS', '20000'))
+NUM_POSTINGS = 200
+TOP_K = 10
+SEED = 42
+
+OUTPUT = os.environ.get('BENCHMARK_OUTPUT', './benchmark_results.json')
+BASELINE = os.environ.get('BENCHMARK_BASELINE')
+# 'run' measures, writes OUTPUT and compares it with BASELINE if set; 'compare' only compares OUTPUT with BASELINE
+MODE = os.environ.get('BENCHMARK_MODE', 'run')
+
+# Largest relative regression allowed per metric, e.g. BENCHMARK_THRESHOLDS=p95_ms=0.3,throughput=0.1
+THRESHOLDS = {'p50_ms': 0.25, 'p95_ms': 0.5, 'throughput': 0.2, 'peak_rss_mb': 0.25}
+for setting in filter(None, os.environ.get('BENCHMARK_THRESHOLDS', '').split(',')):
+    metric, limit = setting.split('=')
+    THRESHOLDS[metric.strip()] = float(limit)
+HIGHER_IS_BETTER = {'throughput'}
+# Latency changes below this are timer noise, not regressions
+MIN_LATENCY_DELTA_MS = 0.05
+
+def reset_peak_rss():
+    # On Linux, writing 5 to clear_refs resets the VmHWM high-water mark to the current RSS
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+def peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Lifetime peak, in kB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def summarize(case, size, timings_ms, units_per_run, unit, **extra):
+    timings_ms = np.asarray(timings_ms)
+    result = {
+        'case': case,
+        'size': size,
+        'runs': len(timings_ms),
+        'p50_ms': round(float(np.percentile(timings_ms, 50)), 4),
+        'p95_ms': round(float(np.percentile(timings_ms, 95)), 4),
+        'mean_ms': round(float(timings_ms.mean()), 4),
+        'throughput': round(units_per_run * len(timings_ms) / (timings_ms.sum() / 1000), 2),
+        'throughput_unit': unit,
+        'peak_rss_mb': round(peak_rss_mb(), 1)
+    }
+    result.update(extra)
+    print(f"  {case:<28} {size:>9,}  p50 {result['p50_ms']:>10.3f} ms  p95 {result['p95_ms']:>10.3f} ms  "
+          f"{result['throughput']:>14,.1f} {unit}  peak RSS {result['peak_rss_mb']:,.0f} MB")
+    return result
+
+def measure(case, size, run, units_per_run, unit, **extra):
+    """Time run(i) up to REPEATS times within CASE_BUDGET_S"""
+    reset_peak_rss()
+    timings_ms = []
+    started = time.perf_counter()
+    while len(timings_ms) < REPEATS and (not timings_ms or time.perf_counter() - started < CASE_BUDGET_S):
+        # The engine reports progress with print; keep it out of the results
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            run(len(timings_ms))
+            timings_ms.append((time.perf_counter() - start) * 1000)
+    return summarize(case, size, timings_ms, units_per_run, unit, **extra)
+
+def bench_skill_similarity(engine, seekers_df, postings):
+    # A per-call function: time individual calls over a sample of the pool's skill lists
+    skills = [json.loads(value) for value in seekers_df['skills'].head(SKILL_CALLS)]
+    reset_peak_rss()
+    timings_ms = []
+    for i, candidate_skills in enumerate(skills):
+        posting = postings[i % len(postings)]
+        required, preferred = json.loads(posting['required_skills']), json.loads(posting['preferred_skills'])
+        start = time.perf_counter()
+        engine.calculate_skill_similarity(candidate_skills, required, preferred)
+        timings_ms.append((time.perf_counter() - start) * 1000)
+    return summarize('calculate_skill_similarity', len(skills), timings_ms, 1, 'calls/s')
+
+def bench_endpoint(generator, size, work_dir):
+    # The API as deployed, over a SQLite file holding this pool, through the Flask test client
+    from flask import Flask
+    from src.models.user import db
+    from src.routes.employer import employer_bp
+    from src.ml_engine import ml_engine
+
+    path = os.path.join(work_dir, f'pool-{size}.db')
+    write_sqlite(path, generator, size, NUM_POSTINGS)
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.register_blueprint(employer_bp, url_prefix='/api/employer')
+    db.init_app(app)
+    client = app.test_client()
+
+    def request(job_id):
+        response = client.get(f'/api/employer/jobs/{job_id}/matches?top_k={TOP_K}')
+        if response.status_code != 200:
+            raise RuntimeError(f"/matches returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+
+    # The first request loads the candidate store from the database; later requests score the resident pool
+    ml_engine.unload_seekers()
+    reset_peak_rss()
+    start = time.perf_counter()
+    request(1)
+    cold_ms = (time.perf_counter() - start) * 1000
+    result = measure('matches_endpoint', size, lambda i: request(2 + i % (NUM_POSTINGS - 1)), 1, 'requests/s',
+                     cold_ms=round(cold_ms, 1))
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    return result
+
+def run_benchmarks():
+    from src.ml_engine import JobMatchingEngine, preload_ml_stack
+
+    # Import the lazily loaded ML stack up front so the first timed run does not pay for it
+    preload_ml_stack()
+    generator = SyntheticDataGenerator(seed=SEED)
+    postings = generator.job_postings(NUM_POSTINGS).to_dict('records')
+    results = []
+    work_dir = tempfile.mkdtemp(prefix='benchmark-')
+    try:
+        if 'calculate_skill_similarity' in CASES:
+            results.append(bench_skill_similarity(JobMatchingEngine(), generator.job_seekers(SKILL_CALLS), postings))
+        for size in POOL_SIZES:
+            print(f"\nPool of {size:,} job seekers")
+            seekers_df = generator.job_seekers(size)
+            engine = JobMatchingEngine()
+            if 'prepare_features' in CASES:
+                results.append(measure('prepare_features', size, lambda i: engine.prepare_features(seekers_df), size, 'rows/s'))
+            if 'train_models' in CASES:
+                results.append(measure('train_models', size, lambda i: engine.train_models(seekers_df), size, 'rows/s'))
+            if 'match_candidates_to_job' in CASES:
+                results.append(measure(
+                    'match_candidates_to_job', size,
+                    lambda i: engine.match_candidates_to_job(postings[i % NUM_POSTINGS], seekers_df, TOP_K),
+                    size, 'candidates/s'
+                ))
+            if 'matches_endpoint' in CASES:
+                results.append(bench_endpoint(generator, size, work_dir))
+            del seekers_df, engine
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+def compare(baseline, current):
+    """Regressions of current against baseline past THRESHOLDS, as messages"""
+    baseline_results = {(result['case'], result['size']): result for result in baseline['results']}
+    regressions = []
+    print(f"\nComparing with {BASELINE}:")
+    for result in current['results']:
+        key = (result['case'], result['size'])
+        if key not in baseline_results:
+            print(f"  {result['case']} @ {result['size']:,}: not in baseline")
+            continue
+        for metric, limit in THRESHOLDS.items():
+            old, new = baseline_results[key].get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            if metric.endswith('_ms') and abs(new - old) < MIN_LATENCY_DELTA_MS:
+                continue
+            status = 'REGRESSION' if worse > limit else 'ok'
+            print(f"  {result['case']} @ {result['size']:,} {metric}: {old:,.3f} -> {new:,.3f} ({change:+.1%}) {status}")
+            if worse > limit:
+                regressions.append(f"{result['case']} @ {result['size']:,}: {metric} {change:+.1%} (limit {limit:.0%})")
+    return regressions
+
+if MODE == 'run':
+    current = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': SEED,
+        'results': run_benchmarks()
+    }
+    with open(OUTPUT, 'w') as f:
+        json.dump(current, f, indent=2)
+    print(f"\nResults written to {OUTPUT}")
+elif MODE == 'compare':
+    with open(OUTPUT) as f:
+        current = json.load(f)
+else:
+    sys.exit(f"Unknown BENCHMARK_MODE {MODE!r}; use 'run' or 'compare'")
+
+if BASELINE:
+    with open(BASELINE) as f:
+        regressions = compare(json.load(f), current)
+    if regressions:
+        for regression in regressions:
+            print(f"FAIL: {regression}")
+        sys.exit(1)
+    print("No regressions past the thresholds.")
+elif MODE == 'compare':
+    sys.exit("BENCHMARK_MODE=compare needs BENCHMARK_BASELINE")
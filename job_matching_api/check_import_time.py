@@ -0,0 +1,80 @@
+import os
+import shutil
+import subprocess
+import sys
+import statistics
+import tempfile
+
+print("Checking cold start time of the API...")
+
+# Budget for importing src.main and building the app with create_app, in milliseconds
+IMPORT_BUDGET_MS = float(os.environ.get('IMPORT_BUDGET_MS', '1500'))
+RUNS = int(os.environ.get('IMPORT_RUNS', '5'))
+
+# Modules the API must not import until the ML engine first needs them
+LAZY_MODULES = ['pandas', 'sklearn', 'scipy', 'joblib']
+
+app_dir = os.path.dirname(os.path.abspath(__file__))
+
+# The app is built against a scratch database, never the committed app.db
+work_dir = tempfile.mkdtemp(prefix='import_check_')
+database_uri = f"sqlite:///{os.path.join(work_dir, 'app.db')}"
+startup = (
+    "from src.main import create_app\n"
+    f"create_app(load_models=False, database_uri={database_uri!r})\n"
+)
+probe = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    + startup +
+    "elapsed = (time.perf_counter() - start) * 1000\n"
+    f"loaded = [name for name in {LAZY_MODULES!r} if name in sys.modules]\n"
+    "print(str(elapsed) + '|' + ','.join(loaded))\n"
+)
+
+# Each run is a fresh interpreter, like a new worker; models are not loaded, only imports and app setup are timed
+probe_env = dict(os.environ, PRELOAD_ML_STACK='0', LOAD_MODELS_AT_BOOT='0')
+timings = []
+for run in range(RUNS):
+    result = subprocess.run(
+        [sys.executable, '-c', probe], cwd=app_dir, capture_output=True, text=True,
+        env=probe_env
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        sys.exit("Building the app failed")
+    elapsed, loaded = result.stdout.strip().splitlines()[-1].split('|')
+    timings.append(float(elapsed))
+    print(f"Run {run + 1}: {float(elapsed):.0f} ms")
+
+median_ms = statistics.median(timings)
+print(f"\nMedian startup time: {median_ms:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)")
+
+failures = []
+if median_ms > IMPORT_BUDGET_MS:
+    failures.append(f"create_app took {median_ms:.0f} ms, over the {IMPORT_BUDGET_MS:.0f} ms budget")
+if loaded:
+    failures.append(f"create_app loaded heavy modules eagerly: {loaded}")
+
+# Show the slowest imports to point at the regression
+if failures:
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', startup], cwd=app_dir, capture_output=True, text=True,
+        env=probe_env
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    print("\nSlowest imports (cumulative us):")
+    for cumulative, name in sorted(rows, reverse=True)[:15]:
+        print(f"  {cumulative:>9} {name}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    shutil.rmtree(work_dir, ignore_errors=True)
+    sys.exit(1)
+
+shutil.rmtree(work_dir, ignore_errors=True)
+print("Import time check passed.")
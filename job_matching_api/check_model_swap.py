@@ -0,0 +1,132 @@
+import pandas as pd
+import numpy as np
+import threading
+import random
+import json
+import time
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from src.ml_engine import JobMatchingEngine
+
+print("Checking model swaps under concurrent matching...")
+
+# Check settings
+NUM_SEEKERS = int(os.environ.get('SWAP_CHECK_SEEKERS', '5000'))
+NUM_RETRAINS = int(os.environ.get('SWAP_CHECK_RETRAINS', '3'))
+NUM_READERS = 4
+CANDIDATE_BUDGET = 200
+SEED = 7
+
+rng = random.Random(SEED)
+job_postings = pd.read_csv('./sample_job_postings.csv').to_dict('records')
+for i, posting in enumerate(job_postings):
+    posting['id'] = i + 1
+locations = sorted({(posting['city'], posting['state']) for posting in job_postings})
+all_skills = sorted({
+    skill
+    for posting in job_postings
+    for column in ('required_skills', 'preferred_skills')
+    for skill in json.loads(posting[column])
+})
+
+job_seekers = []
+for i in range(NUM_SEEKERS):
+    city, state = rng.choice(locations)
+    salary_min = rng.choice([15000, 18000, 20000, 25000])
+    job_seekers.append({
+        'id': i + 1,
+        'city': city,
+        'state': state,
+        'diploma_score': round(rng.uniform(50, 95), 2),
+        'experience_years': rng.choice([0, 0, 1, 2, 3, 5]),
+        'skills': json.dumps(rng.sample(all_skills, rng.randint(0, 5))),
+        'category': rng.choice(['General', 'OBC', 'SC', 'ST']),
+        'gender': rng.choice(['Male', 'Female']),
+        'training_result': rng.choice(['Pass', 'Pass', 'Fail']),
+        'placement_status': rng.choice(['Placed', 'Not Placed']),
+        'preferred_salary_min': salary_min,
+        'preferred_salary_max': salary_min + rng.choice([10000, 15000, 20000]),
+        'availability_status': 'available'
+    })
+job_seekers_df = pd.DataFrame(job_seekers)
+probe_df = job_seekers_df.head(50)
+
+engine = JobMatchingEngine()
+engine.train_models(job_seekers_df)
+engine.load_seekers(job_seekers)
+
+# Each retrain sees a different half of the seekers, so every snapshot differs
+training_sets = [job_seekers_df.sample(frac=0.5, random_state=SEED + i) for i in range(NUM_RETRAINS)]
+
+stop = threading.Event()
+errors = []
+observations = []  # (snapshot, posting index, projection, placement probabilities)
+latencies = []
+
+def reader(reader_id):
+    reader_rng = random.Random(reader_id)
+    while not stop.is_set():
+        posting_index = reader_rng.randrange(len(job_postings))
+        posting = job_postings[posting_index]
+        start = time.perf_counter()
+        try:
+            engine.match_job_approximate(posting, 10, None, CANDIDATE_BUDGET, placement_weight=0.3)
+            # Work from one snapshot, as a request would
+            models = engine.models
+            projection = engine.project_job_posting(posting, models)
+            probabilities = engine.predict_placement(probe_df, models)
+        except Exception as e:
+            errors.append(f"reader {reader_id}: {type(e).__name__}: {e}")
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+        observations.append((models, posting_index, projection, probabilities))
+
+threads = [threading.Thread(target=reader, args=(i,), daemon=True) for i in range(NUM_READERS)]
+for thread in threads:
+    thread.start()
+
+train_ms = []
+for training_set in training_sets:
+    start = time.perf_counter()
+    engine.train_models(training_set)
+    train_ms.append((time.perf_counter() - start) * 1000)
+    time.sleep(0.2)
+
+stop.set()
+for thread in threads:
+    thread.join()
+
+# Every observation must match a recomputation from the snapshot it was made with
+torn = 0
+references = {}
+for models, posting_index, projection, probabilities in observations:
+    key = (models.model_id, posting_index)
+    if key not in references:
+        references[key] = (
+            engine.project_job_posting(job_postings[posting_index], models),
+            engine.predict_placement(probe_df, models)
+        )
+    reference_projection, reference_probabilities = references[key]
+    if not (np.array_equal(projection, reference_projection) and np.array_equal(probabilities, reference_probabilities)):
+        torn += 1
+
+snapshots_seen = len({models.model_id for models, _, _, _ in observations})
+print(f"{len(observations)} reads over {snapshots_seen} model snapshots, {NUM_RETRAINS} retrains")
+print(f"Training: {np.mean(train_ms):.0f} ms mean; reads: p50 {np.percentile(latencies, 50):.1f} ms, "
+      f"max {np.max(latencies):.1f} ms")
+
+failures = errors[:5]
+if torn:
+    failures.append(f"{torn} reads disagree with their snapshot")
+if snapshots_seen < 2:
+    failures.append("readers never saw a model swap")
+if np.max(latencies) >= min(train_ms):
+    failures.append("a read took as long as a training run")
+if failures:
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1)
+
+print("Model swap check passed.")
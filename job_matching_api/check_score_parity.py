@@ -0,0 +1,149 @@
+import pandas as pd
+import numpy as np
+import random
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from src.ml_engine import JobMatchingEngine
+
+print("Checking the vectorized scorer against the per-candidate helpers...")
+
+# Check settings
+NUM_SEEKERS = int(os.environ.get('PARITY_CHECK_SEEKERS', '2000'))
+TOLERANCE = 1e-9
+SEED = 11
+
+rng = random.Random(SEED)
+job_postings = pd.read_csv('./sample_job_postings.csv').to_dict('records')
+locations = sorted({(posting['city'], posting['state']) for posting in job_postings})
+all_skills = sorted({
+    skill
+    for posting in job_postings
+    for column in ('required_skills', 'preferred_skills')
+    for skill in json.loads(posting[column])
+})
+
+# Postings with missing and zero salaries, and with no preferred skills
+extra_postings = []
+for i, posting in enumerate(job_postings[:4]):
+    posting = dict(posting)
+    if i == 0:
+        posting['salary_min'] = None
+    elif i == 1:
+        posting['salary_max'] = 0
+    elif i == 2:
+        posting['preferred_skills'] = '[]'
+    else:
+        posting['city'] = posting['city'].upper()
+    extra_postings.append(posting)
+job_postings += extra_postings
+
+# Salaries cover the cases the per-candidate helper treats specially: missing
+# (None, which a DataFrame turns into NaN), zero, empty and inverted ranges
+salary_ranges = [
+    (None, None), (None, 30000), (20000, None), (0, 30000), (20000, 0),
+    (25000, 25000), (30000, 20000), (500000, 900000)
+]
+
+job_seekers = []
+for i in range(NUM_SEEKERS):
+    city, state = rng.choice(locations + [('Nowhere', 'Elsewhere')])
+    if rng.random() < 0.2:
+        salary_min, salary_max = rng.choice(salary_ranges)
+    else:
+        salary_min = rng.choice([15000, 18000, 20000, 25000])
+        salary_max = salary_min + rng.choice([0, 10000, 15000, 20000])
+    job_seekers.append({
+        'id': i + 1,
+        'city': city.lower() if rng.random() < 0.1 else city,
+        'state': state,
+        'diploma_score': round(rng.uniform(40, 100), 2),
+        'experience_years': rng.choice([0, 0, 1, 2, 3, 5]),
+        'skills': json.dumps(rng.sample(all_skills, rng.randint(0, 5))),
+        'category': rng.choice(['General', 'OBC', 'SC', 'ST']),
+        'gender': rng.choice(['Male', 'Female']),
+        'training_result': rng.choice(['Pass', 'Pass', 'Fail']),
+        'placement_status': rng.choice(['Placed', 'Not Placed']),
+        'preferred_salary_min': salary_min,
+        'preferred_salary_max': salary_max,
+        'availability_status': 'available'
+    })
+job_seekers_df = pd.DataFrame(job_seekers)
+
+engine = JobMatchingEngine()
+
+def row_scores(job_posting, candidate):
+    """
+    Component and match scores of one DataFrame row, computed the way match_candidates_to_job did per row
+    """
+    candidate_skills = json.loads(candidate['skills'])
+    scores = {
+        'skill_score': engine.calculate_skill_similarity(
+            candidate_skills, json.loads(job_posting['required_skills']), json.loads(job_posting['preferred_skills'])
+        ),
+        'location_score': engine.calculate_location_score(
+            candidate['city'], candidate['state'], job_posting['city'], job_posting['state']
+        ),
+        'salary_score': engine.calculate_salary_compatibility(
+            candidate.get('preferred_salary_min', 20000), candidate.get('preferred_salary_max', 35000),
+            job_posting.get('salary_min', 15000), job_posting.get('salary_max', 40000)
+        )
+    }
+
+    required_exp = job_posting.get('experience_required', 0)
+    candidate_exp = candidate.get('experience_years', 0)
+    if required_exp == 0 or candidate_exp >= required_exp:
+        scores['experience_score'] = 1.0
+    else:
+        scores['experience_score'] = max(0.3, candidate_exp / required_exp)
+
+    min_diploma_score = job_posting.get('minimum_diploma_score', 60.0)
+    candidate_diploma = candidate.get('diploma_score', 70.0)
+    if candidate_diploma >= min_diploma_score:
+        scores['diploma_score'] = min(candidate_diploma / 100.0, 1.0)
+    else:
+        scores['diploma_score'] = max(0.2, candidate_diploma / min_diploma_score)
+
+    training_bonus = 0.1 if candidate.get('training_result') == 'Pass' else 0
+    scores['match_score'] = min(
+        scores['skill_score'] * 0.35 + scores['location_score'] * 0.20 + scores['salary_score'] * 0.15 +
+        scores['experience_score'] * 0.15 + scores['diploma_score'] * 0.15 + training_bonus,
+        1.0
+    )
+    return scores
+
+COMPONENTS = ('match_score', 'skill_score', 'location_score', 'salary_score', 'experience_score', 'diploma_score')
+
+mismatches = {}
+examples = []
+for job_posting in job_postings:
+    # Every candidate, ranked by the vectorized kernel
+    matches = {match['job_seeker_id']: match for match in engine.match_candidates_to_job(job_posting, job_seekers_df, None)}
+    if len(matches) != len(job_seekers_df):
+        mismatches['candidates'] = mismatches.get('candidates', 0) + 1
+        continue
+    for _, candidate in job_seekers_df.iterrows():
+        expected = row_scores(job_posting, candidate)
+        match = matches[candidate['id']]
+        for component in COMPONENTS:
+            if abs(match[component] - expected[component]) > TOLERANCE:
+                mismatches[component] = mismatches.get(component, 0) + 1
+                if len(examples) < 5:
+                    examples.append(
+                        f"seeker {candidate['id']}, posting {job_posting['title']!r}: {component} "
+                        f"{match[component]!r} vs per-candidate {expected[component]!r}"
+                    )
+
+salary_cases = int(job_seekers_df['preferred_salary_min'].isna().sum() + job_seekers_df['preferred_salary_max'].isna().sum())
+print(f"{len(job_postings)} postings x {len(job_seekers_df)} seekers compared ({salary_cases} missing candidate salaries)")
+
+if mismatches:
+    for component, count in sorted(mismatches.items()):
+        print(f"FAIL: {component} differs for {count} candidate/posting pairs")
+    for example in examples:
+        print(f"  {example}")
+    sys.exit(1)
+
+print("Score parity check passed.")
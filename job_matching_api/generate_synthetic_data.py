@@ -0,0 +1,32 @@
+import time
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from src.synthetic_data import SyntheticDataGenerator, write_sqlite, write_columnar
+
+print("Generating synthetic Suryamitra data...")
+
+# Generator settings
+NUM_SEEKERS = int(os.environ.get('SYNTHETIC_SEEKERS', '1000000'))
+NUM_POSTINGS = int(os.environ.get('SYNTHETIC_POSTINGS', '2000'))
+NUM_EMPLOYERS = int(os.environ.get('SYNTHETIC_EMPLOYERS', '100'))
+SEED = int(os.environ.get('SYNTHETIC_SEED', '42'))
+# A .db path gets a new SQLite database with the app's schema; anything else a directory of .npz column files
+OUTPUT = os.environ.get('SYNTHETIC_OUTPUT', './synthetic/suryamitra_synthetic.db')
+
+generator = SyntheticDataGenerator(seed=SEED, num_employers=NUM_EMPLOYERS)
+start = time.perf_counter()
+
+def progress(written):
+    elapsed = time.perf_counter() - start
+    print(f"  {written:,} / {NUM_SEEKERS:,} seekers ({written / elapsed:,.0f} rows/s)")
+
+if OUTPUT.endswith('.db'):
+    os.makedirs(os.path.dirname(os.path.abspath(OUTPUT)), exist_ok=True)
+    write_sqlite(OUTPUT, generator, NUM_SEEKERS, NUM_POSTINGS, progress)
+else:
+    write_columnar(OUTPUT, generator, NUM_SEEKERS, NUM_POSTINGS, progress)
+
+print(f"\nWrote {NUM_SEEKERS:,} seekers, {NUM_POSTINGS:,} postings and {NUM_EMPLOYERS} employers "
+      f"to {OUTPUT} in {time.perf_counter() - start:.1f}s (seed {SEED})")
@@ -0,0 +1,108 @@
+import pandas as pd
+import numpy as np
+import random
+import json
+import time
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from src.ml_engine import JobMatchingEngine
+
+print("KNN retrieval recall vs latency report...")
+
+# Report settings
+NUM_SEEKERS = 20000
+NUM_POSTINGS = 50
+TOP_K = 10
+BUDGETS = [100, 250, 500, 1000, 2000, 5000]
+SEED = 42
+
+rng = random.Random(SEED)
+
+# Job postings: the sample postings plus seeded variations of them
+sample_postings = pd.read_csv('./sample_job_postings.csv').to_dict('records')
+locations = sorted({(posting['city'], posting['state']) for posting in sample_postings})
+all_skills = sorted({
+    skill
+    for posting in sample_postings
+    for column in ('required_skills', 'preferred_skills')
+    for skill in json.loads(posting[column])
+})
+
+job_postings = []
+for i in range(NUM_POSTINGS):
+    posting = dict(sample_postings[i % len(sample_postings)])
+    if i >= len(sample_postings):
+        posting['city'], posting['state'] = rng.choice(locations)
+        posting['required_skills'] = json.dumps(rng.sample(all_skills, rng.randint(1, 4)))
+        posting['preferred_skills'] = json.dumps(rng.sample(all_skills, rng.randint(0, 3)))
+        posting['minimum_diploma_score'] = rng.choice([60.0, 65.0, 70.0, 75.0, 80.0])
+        posting['experience_required'] = rng.choice([0, 0, 1, 2])
+    posting['id'] = i + 1
+    job_postings.append(posting)
+
+# Job seekers drawn over the same locations and skills
+job_seekers = []
+for i in range(NUM_SEEKERS):
+    city, state = rng.choice(locations)
+    salary_min = rng.choice([15000, 18000, 20000, 25000])
+    job_seekers.append({
+        'id': i + 1,
+        'city': city,
+        'state': state,
+        'diploma_score': round(rng.uniform(50, 95), 2),
+        'experience_years': rng.choice([0, 0, 1, 2, 3, 5]),
+        'skills': json.dumps(rng.sample(all_skills, rng.randint(0, 5))),
+        'category': rng.choice(['General', 'OBC', 'SC', 'ST']),
+        'gender': rng.choice(['Male', 'Female']),
+        'training_result': rng.choice(['Pass', 'Pass', 'Fail']),
+        'placement_status': rng.choice(['Placed', 'Not Placed']),
+        'preferred_salary_min': salary_min,
+        'preferred_salary_max': salary_min + rng.choice([10000, 15000, 20000]),
+        'availability_status': 'available'
+    })
+
+print(f"{len(job_seekers)} job seekers, {len(job_postings)} job postings, top_k={TOP_K}")
+
+engine = JobMatchingEngine()
+engine.train_models(pd.DataFrame(job_seekers))
+engine.load_seekers(job_seekers)
+
+def timed(match):
+    start = time.perf_counter()
+    matches = match()
+    return matches, (time.perf_counter() - start) * 1000
+
+# Exhaustive ranking is the reference
+exact = {}
+exact_ms = []
+for posting in job_postings:
+    exact[posting['id']], elapsed = timed(lambda: engine.match_job_approximate(posting, TOP_K, None, NUM_SEEKERS))
+    exact_ms.append(elapsed)
+
+print(f"\n{'budget':>8} {'recall@k':>9} {'score recall':>13} {'p50 ms':>8} {'p95 ms':>8}")
+print(f"{'exact':>8} {1.0:>9.3f} {1.0:>13.3f} {np.percentile(exact_ms, 50):>8.2f} {np.percentile(exact_ms, 95):>8.2f}")
+
+for budget in BUDGETS:
+    recalls = []
+    score_recalls = []
+    latencies = []
+    for posting in job_postings:
+        matches, elapsed = timed(lambda: engine.match_job_approximate(posting, TOP_K, None, budget))
+        latencies.append(elapsed)
+
+        reference = exact[posting['id']]
+        if not reference:
+            continue
+        reference_ids = {match['job_seeker_id'] for match in reference}
+        recalls.append(sum(match['job_seeker_id'] in reference_ids for match in matches) / len(reference))
+
+        # Ties at the k-th score make several top-k lists equally correct
+        kth_score = reference[-1]['match_score']
+        score_recalls.append(sum(match['match_score'] >= kth_score for match in matches) / len(reference))
+
+    print(f"{budget:>8} {np.mean(recalls):>9.3f} {np.mean(score_recalls):>13.3f} "
+          f"{np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 95):>8.2f}")
+
+print("\nReport complete.")
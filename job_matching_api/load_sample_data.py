@@ -11,7 +11,7 @@ import os
 # Add the project root to the path
 sys.path.insert(0, os.path.dirname(__file__))
 
-from src.main import app
+from src.main import create_app
 from src.models.user import User
 from src.models.job_seeker import JobSeeker
 from src.models.job_posting import JobPosting
@@ -155,6 +155,7 @@ def create_default_users():
 
 def main():
     """Main function to load all sample data"""
+    app = create_app(load_models=False)
     with app.app_context():
         print("Loading Suryamitra sample data...")
         
@@ -1,7 +1,10 @@
 import sqlite3
 import pandas as pd
-import pickle
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from src.model_artifacts import ModelArtifact, ForestArrays, FOREST_ARRAYS, resolve_artifact
 
 print("=== Suryamitra Job Matching System Verification ===\n")
 
@@ -43,32 +46,21 @@ print("\n" + "="*50)
 print("2. Testing ML Models...")
 models_dir = '/../models'
 try:
-    # Check if model files exist
-    model_files = [
-        'placement_predictor.pkl',
-        'similarity_model.pkl',
-        'feature_scaler.pkl',
-        'label_encoders.pkl',
-        'skills_data.pkl',
-        'feature_columns.pkl',
-        'model_metadata.pkl'
-    ]
-    
-    for model_file in model_files:
-        file_path = os.path.join(models_dir, model_file)
-        if os.path.exists(file_path):
-            print(f"   ✅ {model_file} exists")
-        else:
-            print(f"   ❌ {model_file} missing")
+    # Open the latest model artifact and check it against its manifest
+    artifact_path = resolve_artifact(models_dir)
+    if artifact_path is None:
+        raise FileNotFoundError(f"No model artifact found in {models_dir}")
+    artifact = ModelArtifact(artifact_path, verify=True)
+    print(f"   ✅ Model artifact {artifact.name} verified ({len(artifact.files)} files)")
     
     # Load and test placement predictor
-    with open(f'{models_dir}/placement_predictor.pkl', 'rb') as f:
-        rf_model = pickle.load(f)
+    rf_model = ForestArrays(
+        {name: artifact.array(name) for name in FOREST_ARRAYS}, artifact.code_tables['rf_classes']
+    )
     print(f"   ✅ Random Forest model loaded (n_estimators: {rf_model.n_estimators})")
     
     # Load model metadata
-    with open(f'{models_dir}/model_metadata.pkl', 'rb') as f:
-        metadata = pickle.load(f)
+    metadata = artifact.metadata
     print(f"   ✅ Model metadata loaded:")
     print(f"      Training date: {metadata['training_date']}")
     print(f"      Total candidates: {metadata['total_candidates']}")
@@ -120,11 +112,9 @@ print("\n" + "="*50)
 # Test 4: Skills Analysis
 print("4. Skills Analysis...")
 try:
-    with open(f'{models_dir}/skills_data.pkl', 'rb') as f:
-        skills_data = pickle.load(f)
-    
-    unique_skills = skills_data['unique_skills']
-    skills_matrix = skills_data['skills_matrix']
+    artifact = ModelArtifact(resolve_artifact(models_dir))
+    unique_skills = artifact.code_tables['unique_skills']
+    skills_matrix = artifact.array('skills_matrix')
     
     print(f"   ✅ Unique skills identified: {len(unique_skills)}")
     print("   ✅ Skills list:")
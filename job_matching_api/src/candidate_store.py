@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+In-process columnar store of matchable job seekers
+Keeps the attributes used for scoring as numpy arrays so match requests skip the database
+"""
+
+import itertools
+import numpy as np
+import threading
+from src.skill_vocabulary import parse_skill_list
+
+# Code used for a missing city or state
+MISSING_CODE = -1
+
+# Code returned for a city or state that no stored candidate has
+UNKNOWN_CODE = -2
+
+# Row layouts handed out to stores; see CandidateStore.layout
+_layouts = itertools.count(1)
+
+def _grow(array, capacity):
+    """
+    Return a copy of array resized to capacity along the first axis
+    """
+    grown = np.zeros(capacity, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+def _to_float(value):
+    """
+    Convert a nullable number to float, with NaN for missing values
+    """
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+def gather_skills(skill_indptr, skill_indices, rows):
+    """
+    Skill ID set arrays (indptr, indices) restricted to the given rows
+    """
+    starts = skill_indptr[rows]
+    lengths = skill_indptr[rows + 1] - starts
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    positions = np.repeat(starts - indptr[:-1], lengths) + np.arange(indptr[-1])
+    return indptr, skill_indices[positions]
+
+def seeker_terms(seeker, vocabulary):
+    """
+    Matching attributes of a job seeker dict, with skills interned and missing values normalized
+    """
+    return {
+        'skill_ids': list(dict.fromkeys(
+            vocabulary.intern(skill) for skill in parse_skill_list(seeker.get('skills'))
+        )),
+        'diploma_score': _to_float(seeker.get('diploma_score', 70.0)),
+        'experience_years': _to_float(seeker.get('experience_years', 0)),
+        'salary_min': _to_float(seeker.get('preferred_salary_min', 20000)),
+        'salary_max': _to_float(seeker.get('preferred_salary_max', 35000)),
+        'city': seeker.get('city'),
+        'state': seeker.get('state'),
+        'passed_training': seeker.get('training_result') == 'Pass',
+        'placed': seeker.get('placement_status') == 'Placed'
+    }
+
+class _RowList:
+    """
+    Growable, ascending list of store rows for one inverted-index key
+    """
+
+    def __init__(self):
+        self.rows = np.zeros(8, dtype=np.int64)
+        self.size = 0
+
+    def append(self, row):
+        if self.size == len(self.rows):
+            self.rows = _grow(self.rows, self.size * 2)
+        self.rows[self.size] = row
+        self.size += 1
+
+    def below(self, limit):
+        """
+        Rows less than limit, i.e. the rows visible to a snapshot of that size
+        """
+        rows = self.rows[:self.size]
+        return rows[:np.searchsorted(rows, limit)]
+
+def _row_lists(keys, rows):
+    """
+    Inverted index {key: _RowList} of rows by key, with rows kept in ascending order
+    """
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    bounds = np.flatnonzero(np.diff(sorted_keys)) + 1
+    index = {}
+    for start, end in zip(np.concatenate([[0], bounds]), np.concatenate([bounds, [len(keys)]])):
+        if start == end or sorted_keys[start] == MISSING_CODE:
+            continue
+        row_list = _RowList()
+        row_list.rows = rows[order[start:end]]
+        row_list.size = end - start
+        index[int(sorted_keys[start])] = row_list
+    return index
+
+class CandidateSnapshot:
+    """
+    Consistent, read-only view of the candidate store for a single match request
+    """
+
+    def __init__(self, store, size, nnz):
+        self.size = size
+        self.version = store.version
+        self.layout = store.layout
+        self.seeker_ids = store._seeker_ids[:size]
+        # Tombstones copy the alive flags once a snapshot shares them; see CandidateStore._tombstone
+        self.alive = store._alive[:size]
+        store._alive_shared = True
+        self.diploma_score = store._diploma_score[:size]
+        self.experience_years = store._experience_years[:size]
+        self.salary_min = store._salary_min[:size]
+        self.salary_max = store._salary_max[:size]
+        self.city_codes = store._city_codes[:size]
+        self.state_codes = store._state_codes[:size]
+        self.passed_training = store._passed_training[:size]
+        self.placed = store._placed[:size]
+        self.placement_probability = store._placement_probability[:size]
+        self.skill_indptr = store._skill_indptr[:size + 1]
+        self.skill_indices = store._skill_indices[:nnz]
+        # Copies, so codes of cities and states appended after the snapshot stay unknown to it
+        self._cities = dict(store._cities)
+        self._states = dict(store._states)
+        self._vocabulary = store.vocabulary
+        self._city_index = store._city_index
+        self._state_index = store._state_index
+        self._skill_index = store._skill_index
+
+    def city_code(self, city):
+        """
+        Code of a city among the snapshot's rows, compared case-insensitively
+        """
+        return self._cities.get(city.lower(), UNKNOWN_CODE) if isinstance(city, str) else UNKNOWN_CODE
+
+    def state_code(self, state):
+        """
+        Code of a state among the snapshot's rows, compared case-insensitively
+        """
+        return self._states.get(state.lower(), UNKNOWN_CODE) if isinstance(state, str) else UNKNOWN_CODE
+
+    @property
+    def skill_matrix(self):
+        """
+        Sparse (rows x vocabulary) skill ID set matrix
+        """
+        return self._vocabulary.skill_matrix(self.skill_indptr, self.skill_indices)
+
+    def _gather_skills(self, rows):
+        return gather_skills(self.skill_indptr, self.skill_indices, rows)
+
+    def skill_matrix_for(self, rows=None):
+        """
+        Sparse skill ID set matrix of the given rows (all rows if None)
+        """
+        if rows is None:
+            return self.skill_matrix
+        return self._vocabulary.skill_matrix(*self._gather_skills(rows))
+
+    def has_any_skill(self, rows, skill_mask):
+        """
+        For each of the given rows, whether it holds a skill flagged in skill_mask
+        """
+        indptr, indices = self._gather_skills(rows)
+        hits = skill_mask[indices]
+        owners = np.repeat(np.arange(len(rows)), np.diff(indptr))
+        return np.bincount(owners, weights=hits, minlength=len(rows)) > 0
+
+    def live_rows(self):
+        """
+        Rows of seekers that are still in the store
+        """
+        return np.flatnonzero(self.alive)
+
+    def _lookup(self, index, keys):
+        lists = [index[key].below(self.size) for key in keys if key in index]
+        if not lists:
+            return np.zeros(0, dtype=np.int64)
+        rows = lists[0] if len(lists) == 1 else np.unique(np.concatenate(lists))
+        return rows[self.alive[rows]]
+
+    def rows_for_city(self, city_code):
+        """
+        Live rows whose city has the given code, in ascending order
+        """
+        return self._lookup(self._city_index, [city_code])
+
+    def rows_for_state(self, state_code):
+        """
+        Live rows whose state has the given code, in ascending order
+        """
+        return self._lookup(self._state_index, [state_code])
+
+    def rows_for_skills(self, skill_ids):
+        """
+        Live rows holding any of the given skill IDs, in ascending order
+        """
+        return self._lookup(self._skill_index, skill_ids)
+
+class CandidateStore:
+    """
+    Columnar snapshot of available job seekers, refreshed incrementally on writes.
+
+    Rows are append-only: an update tombstones the seeker's old row and appends
+    a new one, and a delete only tombstones. Tombstoned rows are dropped by
+    compact() once they make up half of the store. Readers take a snapshot()
+    and never see a write half-applied to the rows they score. A row's
+    scoring columns never change until a load or compaction rewrites the
+    rows and starts a new layout, a process-wide unique number.
+
+    Inverted indexes map city, state and skill ID to store rows, so a match
+    request can find the candidates near a posting or holding its skills
+    without scanning the whole pool.
+    """
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+        self.is_loaded = False
+        self.version = 0
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self, capacity=0):
+        self.layout = next(_layouts)
+        self._size = 0
+        self._dead = 0
+        self._rows = {}  # seeker id -> row
+        self._seeker_ids = np.zeros(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._alive_shared = False  # whether a snapshot views _alive, so tombstones must copy it
+        self._diploma_score = np.zeros(capacity, dtype=float)
+        self._experience_years = np.zeros(capacity, dtype=float)
+        self._salary_min = np.zeros(capacity, dtype=float)
+        self._salary_max = np.zeros(capacity, dtype=float)
+        self._city_codes = np.zeros(capacity, dtype=np.int32)
+        self._state_codes = np.zeros(capacity, dtype=np.int32)
+        self._passed_training = np.zeros(capacity, dtype=bool)
+        self._placed = np.zeros(capacity, dtype=bool)
+        self._placement_probability = np.full(capacity, np.nan)  # NaN until predicted
+        self._skill_indptr = np.zeros(capacity + 1, dtype=np.int64)
+        self._skill_indices = np.zeros(0, dtype=np.int64)
+        self._cities = {}  # lowercased city -> code
+        self._states = {}  # lowercased state -> code
+        self._city_index = {}  # city code -> _RowList
+        self._state_index = {}  # state code -> _RowList
+        self._skill_index = {}  # skill id -> _RowList
+
+    def __len__(self):
+        return self._size - self._dead
+
+    def __contains__(self, seeker_id):
+        return seeker_id in self._rows
+
+    def row(self, seeker_id):
+        """
+        Current row of a stored job seeker, or None
+        """
+        return self._rows.get(seeker_id)
+
+    def city_code(self, city):
+        """
+        Code of a city, compared case-insensitively
+        """
+        return self._cities.get(city.lower(), UNKNOWN_CODE) if isinstance(city, str) else UNKNOWN_CODE
+
+    def state_code(self, state):
+        """
+        Code of a state, compared case-insensitively
+        """
+        return self._states.get(state.lower(), UNKNOWN_CODE) if isinstance(state, str) else UNKNOWN_CODE
+
+    def snapshot(self):
+        """
+        Return a CandidateSnapshot of the current rows
+        """
+        with self._lock:
+            return CandidateSnapshot(self, self._size, int(self._skill_indptr[self._size]))
+
+    def load(self, job_seekers):
+        """
+        Replace the store contents with a list of job seeker dicts
+        """
+        with self._lock:
+            self._reset(capacity=len(job_seekers))
+            for seeker in job_seekers:
+                if seeker.get('availability_status') == 'available':
+                    self._append(seeker)
+            self.is_loaded = True
+            self.version += 1
+
+    def load_frame(self, job_seekers_df):
+        """
+        Replace the store contents with the available rows of a job seeker DataFrame.
+
+        Gives the same store as load(job_seekers_df.to_dict('records')), but
+        fills the numeric, location and training columns with whole-column
+        operations and builds the inverted indexes with one sort per index.
+        Only the skill lists are parsed row by row.
+        """
+        import pandas as pd
+
+        def column(name, default):
+            if name in job_seekers_df.columns:
+                return available_df[name]
+            return pd.Series(default, index=available_df.index, dtype=object)
+
+        def numbers(name, default):
+            return pd.to_numeric(column(name, default), errors='coerce').to_numpy(dtype=float)
+
+        def codes(name):
+            # Non-string values have no code, like _code; factorize numbers codes by first appearance
+            values = column(name, None).astype(object)
+            lowered = values.where(values.map(lambda value: isinstance(value, str)), None).str.lower()
+            value_codes, uniques = pd.factorize(lowered, use_na_sentinel=True)
+            return value_codes.astype(np.int32), {value: code for code, value in enumerate(uniques)}
+
+        if 'availability_status' in job_seekers_df.columns:
+            available_df = job_seekers_df[job_seekers_df['availability_status'] == 'available']
+        else:
+            available_df = job_seekers_df.iloc[:0]
+
+        with self._lock:
+            size = len(available_df)
+            self._reset(capacity=size)
+
+            skill_lists = [
+                list(dict.fromkeys(self.vocabulary.intern(skill) for skill in parse_skill_list(value)))
+                for value in column('skills', None)
+            ]
+            lengths = np.fromiter(map(len, skill_lists), dtype=np.int64, count=size)
+            np.cumsum(lengths, out=self._skill_indptr[1:])
+            self._skill_indices = np.fromiter(
+                (skill_id for skill_ids in skill_lists for skill_id in skill_ids), dtype=np.int64, count=int(lengths.sum())
+            )
+
+            self._seeker_ids[:] = available_df['id'].to_numpy(dtype=np.int64)
+            self._alive[:] = True
+            self._diploma_score[:] = numbers('diploma_score', 70.0)
+            self._experience_years[:] = numbers('experience_years', 0)
+            self._salary_min[:] = numbers('preferred_salary_min', 20000)
+            self._salary_max[:] = numbers('preferred_salary_max', 35000)
+            self._city_codes[:], self._cities = codes('city')
+            self._state_codes[:], self._states = codes('state')
+            self._passed_training[:] = (column('training_result', None) == 'Pass').to_numpy(dtype=bool)
+            self._placed[:] = (column('placement_status', None) == 'Placed').to_numpy(dtype=bool)
+
+            rows = np.arange(size, dtype=np.int64)
+            self._city_index = _row_lists(self._city_codes, rows)
+            self._state_index = _row_lists(self._state_codes, rows)
+            self._skill_index = _row_lists(self._skill_indices, np.repeat(rows, lengths))
+            self._rows = dict(zip(self._seeker_ids.tolist(), rows.tolist()))
+            self._size = size
+            self.is_loaded = True
+            self.version += 1
+
+    def unload(self):
+        """
+        Empty the store and mark it unloaded, so it is loaded again before the next match
+        """
+        with self._lock:
+            self._reset()
+            self.is_loaded = False
+            self.version += 1
+
+    def upsert(self, seeker):
+        """
+        Insert or refresh a job seeker dict; unavailable seekers are removed
+        """
+        with self._lock:
+            if not self.is_loaded:
+                return  # The next full load picks the change up
+            self._tombstone(seeker['id'])
+            if seeker.get('availability_status') == 'available':
+                self._append(seeker)
+            self.version += 1
+            self._maybe_compact()
+
+    def remove(self, seeker_id):
+        """
+        Remove a job seeker from the store
+        """
+        with self._lock:
+            if not self.is_loaded:
+                return
+            self._tombstone(seeker_id)
+            self.version += 1
+            self._maybe_compact()
+
+    def set_placement_probabilities(self, probabilities):
+        """
+        Set the placement probability of stored job seekers from {seeker_id: probability}.
+
+        The column is replaced rather than written in place, so snapshots
+        taken earlier keep the probabilities they started with. Predictions
+        do not change match scores, so the store version stays the same.
+        """
+        with self._lock:
+            column = self._placement_probability.copy()
+            for seeker_id, probability in probabilities.items():
+                row = self._rows.get(seeker_id)
+                if row is not None:
+                    column[row] = probability
+            self._placement_probability = column
+
+    def clear_placement_probabilities(self):
+        """
+        Forget every placement probability, e.g. after the models change
+        """
+        with self._lock:
+            self._placement_probability = np.full(len(self._placement_probability), np.nan)
+
+    def _tombstone(self, seeker_id):
+        row = self._rows.pop(seeker_id, None)
+        if row is not None:
+            # Copy-on-write, so snapshots taken earlier still see the row alive
+            if self._alive_shared:
+                self._alive = self._alive.copy()
+                self._alive_shared = False
+            self._alive[row] = False
+            self._dead += 1
+        return row
+
+    def _code(self, codes, value):
+        if not isinstance(value, str):
+            return MISSING_CODE
+        return codes.setdefault(value.lower(), len(codes))
+
+    def _append(self, seeker):
+        row = self._size
+        if row == len(self._seeker_ids):
+            self._grow_rows(max(64, row * 2))
+
+        terms = seeker_terms(seeker, self.vocabulary)
+        skill_ids = terms['skill_ids']
+        start = int(self._skill_indptr[row])
+        end = start + len(skill_ids)
+        if end > len(self._skill_indices):
+            self._skill_indices = _grow(self._skill_indices, max(256, end * 2))
+        self._skill_indices[start:end] = skill_ids
+        self._skill_indptr[row + 1] = end
+
+        self._seeker_ids[row] = int(seeker['id'])
+        self._diploma_score[row] = terms['diploma_score']
+        self._experience_years[row] = terms['experience_years']
+        self._salary_min[row] = terms['salary_min']
+        self._salary_max[row] = terms['salary_max']
+        self._city_codes[row] = self._code(self._cities, terms['city'])
+        self._state_codes[row] = self._code(self._states, terms['state'])
+        self._passed_training[row] = terms['passed_training']
+        self._placed[row] = terms['placed']
+        self._placement_probability[row] = np.nan
+        self._alive[row] = True
+
+        self._index_row(row)
+        self._rows[int(seeker['id'])] = row
+        self._size += 1
+        return row
+
+    def _index_row(self, row):
+        keys = [
+            (self._city_index, self._city_codes[row]),
+            (self._state_index, self._state_codes[row])
+        ]
+        keys.extend((self._skill_index, skill_id) for skill_id in
+                    self._skill_indices[self._skill_indptr[row]:self._skill_indptr[row + 1]])
+        for index, key in keys:
+            key = int(key)
+            if key != MISSING_CODE:
+                index.setdefault(key, _RowList()).append(row)
+
+    def _grow_rows(self, capacity):
+        # Copy-on-grow, so snapshots taken earlier keep their own arrays
+        for name in ('_seeker_ids', '_alive', '_diploma_score', '_experience_years', '_salary_min',
+                     '_salary_max', '_city_codes', '_state_codes', '_passed_training', '_placed',
+                     '_placement_probability'):
+            setattr(self, name, _grow(getattr(self, name), capacity))
+        self._skill_indptr = _grow(self._skill_indptr, capacity + 1)
+        self._alive_shared = False
+
+    def _maybe_compact(self):
+        if self._dead > 64 and self._dead * 2 > self._size:
+            self.compact()
+
+    def compact(self):
+        """
+        Drop tombstoned rows, keeping the relative order of live rows
+        """
+        with self._lock:
+            live = np.flatnonzero(self._alive[:self._size])
+            indptr = self._skill_indptr
+            lengths = indptr[live + 1] - indptr[live]
+            skill_rows = [self._skill_indices[indptr[row]:indptr[row + 1]] for row in live]
+
+            size = len(live)
+            for name in ('_seeker_ids', '_alive', '_diploma_score', '_experience_years', '_salary_min',
+                         '_salary_max', '_city_codes', '_state_codes', '_passed_training', '_placed',
+                         '_placement_probability'):
+                setattr(self, name, _grow(getattr(self, name)[live], max(64, size * 2)))
+            self._skill_indptr = np.zeros(len(self._seeker_ids) + 1, dtype=np.int64)
+            self._skill_indptr[1:size + 1] = np.cumsum(lengths)
+            self._skill_indices = np.concatenate(skill_rows) if skill_rows else np.zeros(0, dtype=np.int64)
+
+            self._rows = {int(seeker_id): row for row, seeker_id in enumerate(self._seeker_ids[:size])}
+            self._alive_shared = False
+            self._size = size
+            self.layout = next(_layouts)
+            
+            # Fresh index objects, so snapshots taken earlier keep the old ones
+            self._city_index = {}
+            self._state_index = {}
+            self._skill_index = {}
+            for row in range(size):
+                self._index_row(row)
+            self._dead = 0
+            self.version += 1
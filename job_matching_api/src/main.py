@@ -1,5 +1,6 @@
 import os
 import sys
+import threading
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
@@ -9,44 +10,84 @@ from src.models.user import db
 from src.models.job_seeker import JobSeeker
 from src.models.job_posting import JobPosting
 from src.models.job_match import JobMatch
+from src.models.placement_prediction import PlacementPrediction
 from src.routes.user import user_bp
 from src.routes.admin import admin_bp
 from src.routes.employer import employer_bp
+from src.ml_engine import (
+    ml_engine, MODEL_DIR, preload_ml_stack, load_persisted_models, apply_placement_predictions, start_parallel_scoring
+)
+from src.timing import init_request_timing
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'suryamitra_job_matching_secret_key_2025'
-
-# Enable CORS for all routes
-CORS(app)
-
-# Register blueprints
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(admin_bp, url_prefix='/api/admin')
-app.register_blueprint(employer_bp, url_prefix='/api/employer')
-
-# Database configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-with app.app_context():
-    db.create_all()
-
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-            return "Static folder not configured", 404
-
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
+def _load_models_in_background(app, model_dir):
+    """Load the persisted models off the startup path; matching uses rule-based scores until they are ready"""
+    def load():
+        if load_persisted_models(model_dir):
+            with app.app_context():
+                apply_placement_predictions(PlacementPrediction.for_model(ml_engine.model_id), ml_engine.model_id)
+
+    thread = threading.Thread(target=load, name='model-loader', daemon=True)
+    thread.start()
+    return thread
+
+DATABASE_URI = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+
+def create_app(load_models=None, model_dir=MODEL_DIR, database_uri=DATABASE_URI):
+    """Build the API app; WSGI servers call this factory, e.g. gunicorn 'src.main:create_app()'"""
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config['SECRET_KEY'] = 'suryamitra_job_matching_secret_key_2025'
+
+    # The ML stack loads on first use unless preloaded, e.g. before forking workers
+    if os.environ.get('PRELOAD_ML_STACK') == '1':
+        preload_ml_stack()
+
+    # Scoring workers (MATCH_WORKERS) start before any background thread, so they can fork
+    start_parallel_scoring()
+
+    # Enable CORS for all routes
+    CORS(app)
+
+    # Per-stage request timings; TIMING_HEADER=1 returns them in a Server-Timing header
+    init_request_timing(app)
+
+    # Register blueprints
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(employer_bp, url_prefix='/api/employer')
+
+    # Database configuration
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+
+    # Models are loaded from disk, never trained inside a request
+    if load_models is None:
+        load_models = os.environ.get('LOAD_MODELS_AT_BOOT', '1') == '1'
+    if load_models:
+        _load_models_in_background(app, model_dir)
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        static_folder_path = app.static_folder
+        if static_folder_path is None:
+                return "Static folder not configured", 404
+
+        if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
+            return send_from_directory(static_folder_path, path)
         else:
-            return "index.html not found", 404
+            index_path = os.path.join(static_folder_path, 'index.html')
+            if os.path.exists(index_path):
+                return send_from_directory(static_folder_path, 'index.html')
+            else:
+                return "index.html not found", 404
+
+    return app
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5001, debug=True)
+    # The reloader would run create_app again in a child process, with its own workers and model loader
+    app = create_app()
+    app.run(host='0.0.0.0', port=5001, debug=True, use_reloader=False)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Versioned LRU cache of ranked match results for the Job Matching System
+Serves repeated match requests without rescoring, and drops only the entries a write can change
+"""
+
+import threading
+from collections import OrderedDict
+
+class MatchCache:
+    """
+    Bounded LRU cache of match_job results.
+
+    Entries are keyed by job posting ID and version (updated_at), top_k,
+    min_score and the engine's model version, and are stamped with the
+    candidate store version they were computed against. An entry is only
+    served while its stamp equals the current store version.
+
+    On a job seeker write, apply_seeker_change keeps the entries the write
+    cannot affect and moves their stamp to the new store version. Those are
+    the full top-k lists the seeker is not on and whose k-th match the
+    seeker's new score does not beat. Everything else is dropped.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> entry dict
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(job_posting, top_k, min_score, model_version):
+        """
+        Cache key of a match request
+        """
+        return (job_posting['id'], job_posting.get('updated_at'), top_k, min_score, model_version)
+
+    def get(self, key, pool_version):
+        """
+        Return the cached matches for key, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['pool_version'] != pool_version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry['matches']
+
+    def put(self, key, job_posting, top_k, matches, pool_version):
+        """
+        Store the matches computed for key against the given store version
+        """
+        with self._lock:
+            self._entries[key] = {
+                'job_posting': job_posting,
+                'top_k': top_k,
+                'matches': matches,
+                'ranked_ids': {match['job_seeker_id'] for match in matches},
+                'pool_version': pool_version
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def cached_postings(self):
+        """
+        The job posting dicts with cached entries, by (job posting ID, updated_at)
+        """
+        with self._lock:
+            return {key[:2]: entry['job_posting'] for key, entry in self._entries.items()}
+
+    def _drop(self, keys):
+        for key in keys:
+            del self._entries[key]
+        self.invalidations += len(keys)
+
+    def invalidate_job(self, job_id):
+        """
+        Drop every entry for a job posting
+        """
+        with self._lock:
+            self._drop([key for key in self._entries if key[0] == job_id])
+
+    def apply_seeker_change(self, seeker_id, scores, old_version, new_version):
+        """
+        Patch the cache for one job seeker write that moved the store from old_version to new_version.
+
+        scores maps (job posting ID, updated_at) to the seeker's new match
+        score, or is None if the seeker left the store (deleted or no longer
+        available).
+        """
+        with self._lock:
+            stale = []
+            for key, entry in self._entries.items():
+                if entry['pool_version'] != old_version or seeker_id in entry['ranked_ids']:
+                    stale.append(key)
+                elif scores is not None:
+                    score = scores.get(key[:2])
+                    matches = entry['matches']
+                    if score is None or entry['top_k'] is None or len(matches) < entry['top_k']:
+                        stale.append(key)
+                    elif score > matches[-1]['match_score'] or (
+                        score == matches[-1]['match_score'] and seeker_id < matches[-1]['job_seeker_id']
+                    ):
+                        stale.append(key)
+
+            self._drop(stale)
+            for entry in self._entries.values():
+                entry['pool_version'] = new_version
+
+    def clear(self):
+        """
+        Drop every entry
+        """
+        with self._lock:
+            self._drop(list(self._entries))
+
+    def stats(self):
+        """
+        Hit/miss counters and occupancy, for sizing the cache
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
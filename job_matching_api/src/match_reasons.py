@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Match reason codes for the Job Matching System
+Matches carry short reason codes; the text is rendered only when a response is built
+"""
+
+import json
+
+# Reason code -> text; 'skills' codes carry the skill score as 'skills:<percentage>'
+REASON_TEXT = {
+    'skills': "Strong skills match ({value}%)",
+    'city': "Same city location",
+    'state': "Same state location",
+    'salary': "Excellent salary compatibility",
+    'diploma': "High diploma score",
+    'placed': "Previously placed successfully"
+}
+
+def reason_codes(match, candidate_diploma, candidate_placed):
+    """
+    Reason codes for a match dict's component scores
+    """
+    codes = []
+    if match['skill_score'] > 0.7:
+        codes.append(f"skills:{match['skill_score'] * 100:.1f}")
+    if match['location_score'] == 1.0:
+        codes.append('city')
+    elif match['location_score'] > 0.5:
+        codes.append('state')
+    if match['salary_score'] > 0.8:
+        codes.append('salary')
+    if candidate_diploma >= 85:
+        codes.append('diploma')
+    if candidate_placed:
+        codes.append('placed')
+    return codes
+
+def render_reasons(codes):
+    """
+    Human-readable reasons for a list of reason codes; unknown codes are skipped
+    """
+    reasons = []
+    for code in codes:
+        name, _, value = code.partition(':')
+        if name in REASON_TEXT:
+            reasons.append(REASON_TEXT[name].format(value=value))
+    return reasons
+
+def pack_reason_codes(codes):
+    """
+    Reason codes as one comma-separated string, for storage
+    """
+    return ','.join(codes)
+
+def unpack_reasons(value):
+    """
+    Rendered reasons from a stored value: packed codes, or a JSON list of reason text stored before codes
+    """
+    if not value:
+        return []
+    if value.startswith('['):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return []
+    return render_reasons(value.split(','))
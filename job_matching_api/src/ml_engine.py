@@ -4,17 +4,236 @@ Machine Learning Engine for Job Matching System
 Uses KNN and other ML techniques to match candidates with job postings
 """
 
-import pandas as pd
 import numpy as np
 import json
-from sklearn.neighbors import NearestNeighbors
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.ensemble import RandomForestClassifier
-import joblib
 import os
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
+from src.skill_vocabulary import SkillVocabulary, parse_skill_list
+from src.candidate_store import CandidateStore, seeker_terms, gather_skills
+from src.posting_index import PostingIndex, posting_terms
+from src.match_cache import MatchCache
+from src.match_reasons import reason_codes
+from src.top_k_tracker import TopKTracker
+from src.parallel_scoring import ShardedScorer
+from src.timing import span
+from src.model_snapshot import ModelSnapshot, NO_MODELS
+from src.model_artifacts import (
+    ArrayScaler, ForestArrays, FOREST_ARRAYS, ModelArtifact, forest_arrays, resolve_artifact, write_artifact
+)
+
+# pandas, scikit-learn, scipy and joblib are imported where they are used, so
+# processes that never match or train skip loading them; see preload_ml_stack
+
+# Weights of the component scores in the overall match score
+MATCH_WEIGHTS = {
+    'skills': 0.35,
+    'location': 0.20,
+    'salary': 0.15,
+    'experience': 0.15,
+    'diploma': 0.15
+}
+
+# Flat bonus added to the match score of candidates who passed training
+TRAINING_PASS_BONUS = 0.1
+
+# Target number of cells in one jobs x seekers score block of a batch match
+BATCH_BLOCK_CELLS = 4000000
+
+# Maximum number of cached match_job results
+MATCH_CACHE_SIZE = 1024
+
+# Top-k lists kept per active posting: the smallest tracked k, the slack kept
+# above the requested k, and the largest k worth tracking incrementally
+TRACKED_TOP_K = 10
+TOP_K_SLACK = 10
+MAX_TRACKED_TOP_K = 100
+
+# Matches per chunk when streaming large result sets
+STREAM_CHUNK_SIZE = 500
+
+# Default number of nearest seekers the KNN retrieval stage hands to exact scoring
+RETRIEVAL_CANDIDATE_BUDGET = 1000
+
+# Incremental model updates (see update_models and refit_reason): fewest trees
+# added per update, forest size that calls for a full refit, largest shift of a
+# numeric feature's mean over the seekers added since the last full refit (in
+# standard deviations at that refit), seekers added by updates relative to the
+# last full refit, and full refit schedule
+MIN_UPDATE_TREES = 5
+MAX_FOREST_TREES = 200
+DRIFT_THRESHOLD = 0.5
+MAX_UPDATE_GROWTH = 1.0
+FULL_REFIT_INTERVAL_DAYS = float(os.environ.get('FULL_REFIT_INTERVAL_DAYS', '7'))
+
+# Where trained models are saved, by the admin training job and retrain_ml_model.py
+MODEL_DIR = os.environ.get(
+    'MODEL_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'engine')
+)
+
+# Parallel scoring: worker processes (0 or 1 keeps scoring in-process) and the
+# smallest group of candidate rows worth spreading across them
+PARALLEL_WORKERS = int(os.environ.get('MATCH_WORKERS', '0'))
+PARALLEL_MIN_CANDIDATES = int(os.environ.get('MATCH_PARALLEL_MIN_CANDIDATES', '50000'))
+
+# The process's ShardedScorer, shared by every engine; created and started by
+# start_parallel_scoring (or configure_parallel_scoring), so engines built for
+# training or by scripts never start worker processes of their own
+_parallel_scorer = None
+_parallel_scorer_lock = threading.Lock()
+
+def _column(df, name, default):
+    """
+    Return a DataFrame column as a numpy array, or a constant array if it is missing
+    """
+    if name in df.columns:
+        return df[name].to_numpy()
+    return np.full(len(df), default, dtype=object)
+
+def _skill_scores(vocabulary, skill_matrix, job_required_skills, job_preferred_skills):
+    """
+    Vectorized JobMatchingEngine.calculate_skill_similarity over a skill ID set matrix
+    """
+    required_score = vocabulary.match_fractions(skill_matrix, job_required_skills)
+    preferred_score = vocabulary.match_fractions(skill_matrix, job_preferred_skills)
+    
+    # Weighted combination (required skills are more important)
+    total_scores = (required_score * 0.7) + (preferred_score * 0.3)
+    total_scores = np.where(total_scores > 1.0, 1.0, total_scores)
+    return np.where(np.diff(skill_matrix.indptr) > 0, total_scores, 0.0)
+
+def _location_scores(same_city, same_state):
+    """
+    Vectorized JobMatchingEngine.calculate_location_score
+    """
+    return np.where(same_city, 1.0, np.where(same_state, 0.7, 0.3))
+
+def _salary_scores(candidate_min, candidate_max, job_min, job_max):
+    """
+    Vectorized JobMatchingEngine.calculate_salary_compatibility.
+
+    Job values may be scalars or column vectors, to score several postings at once.
+    """
+    # Default score if salary info is missing; a missing posting salary is stored as NaN
+    missing = (
+        (candidate_min == 0) | (candidate_max == 0) |
+        np.isnan(job_min) | np.isnan(job_max) | (job_min == 0) | (job_max == 0)
+    )
+    # Candidate salaries arrive as NaN from DataFrame rows, where the per-candidate
+    # helper fails every range comparison on them and scores 0
+    unknown = np.isnan(candidate_min) | np.isnan(candidate_max)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        overlap_start = np.maximum(candidate_min, job_min)
+        overlap_end = np.minimum(candidate_max, job_max)
+        
+        # Overlapping ranges score by overlap relative to the average range
+        overlap_size = overlap_end - overlap_start
+        avg_range = ((candidate_max - candidate_min) + (job_max - job_min)) / 2
+        overlap_ratio = overlap_size / avg_range
+        overlap_scores = np.where(avg_range > 0, np.where(overlap_ratio > 1.0, 1.0, overlap_ratio), 1.0)
+        
+        # Disjoint ranges score by how far apart they are
+        gap = overlap_start - overlap_end
+        max_salary = np.maximum(candidate_max, job_max)
+        gap_scores = 1 - (gap / max_salary)
+        gap_scores = np.where(max_salary > 0, np.where(gap_scores > 0, gap_scores, 0.0), 0.0)
+    
+    scores = np.where(overlap_start <= overlap_end, overlap_scores, gap_scores)
+    return np.where(missing, 0.5, np.where(unknown, 0.0, scores))
+
+def _experience_scores(candidate_experience, required_experience):
+    """
+    Score candidate experience against the posting requirement
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        partial = candidate_experience / required_experience
+        partial = np.where(partial > 0.3, partial, 0.3)  # Partial credit
+        scores = np.where(candidate_experience >= required_experience, 1.0, partial)
+    return np.where(required_experience == 0, 1.0, scores)  # No experience required
+
+def _diploma_scores(candidate_diploma, minimum_diploma_score):
+    """
+    Score candidate diploma marks against the posting minimum
+    """
+    with np.errstate(invalid='ignore'):
+        above = candidate_diploma / 100.0
+        above = np.where(above > 1.0, 1.0, above)
+        below = candidate_diploma / minimum_diploma_score
+        below = np.where(below > 0.2, below, 0.2)
+        return np.where(candidate_diploma >= minimum_diploma_score, above, below)
+
+def score_columns(columns, rows, job_terms):
+    """
+    Match scores of the given rows of raw candidate columns.
+
+    The columns are CandidateSnapshot arrays (as published by
+    parallel_scoring) and job_terms comes from JobMatchingEngine._job_terms.
+    Gives the same match_score as JobMatchingEngine.score_candidates without
+    needing the engine's vocabulary, so worker processes can run it.
+    """
+    from scipy import sparse
+    
+    indptr, indices = gather_skills(columns['skill_indptr'], columns['skill_indices'], rows)
+    skill_matrix = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.int32), indices, indptr), shape=(len(rows), job_terms['vocabulary_size'])
+    )
+    
+    def match_fractions(related):
+        if related.shape[1] == 0:
+            return np.zeros(len(rows))
+        hits = np.asarray(skill_matrix @ related.astype(np.int32)) > 0
+        return hits.sum(axis=1) / related.shape[1]
+    
+    skill_scores = (match_fractions(job_terms['required_related']) * 0.7) + (match_fractions(job_terms['preferred_related']) * 0.3)
+    skill_scores = np.where(skill_scores > 1.0, 1.0, skill_scores)
+    skill_scores = np.where(np.diff(indptr) > 0, skill_scores, 0.0)
+    
+    location_scores = _location_scores(
+        columns['city_codes'][rows] == job_terms['city_code'],
+        columns['state_codes'][rows] == job_terms['state_code']
+    )
+    salary_scores = _salary_scores(
+        columns['salary_min'][rows], columns['salary_max'][rows], job_terms['salary_min'], job_terms['salary_max']
+    )
+    experience_scores = _experience_scores(columns['experience_years'][rows], job_terms['experience_required'])
+    diploma_scores = _diploma_scores(columns['diploma_score'][rows], job_terms['minimum_diploma_score'])
+    training_bonus = np.where(columns['passed_training'][rows], TRAINING_PASS_BONUS, 0.0)
+    
+    overall_scores = (
+        skill_scores * MATCH_WEIGHTS['skills'] +
+        location_scores * MATCH_WEIGHTS['location'] +
+        salary_scores * MATCH_WEIGHTS['salary'] +
+        experience_scores * MATCH_WEIGHTS['experience'] +
+        diploma_scores * MATCH_WEIGHTS['diploma'] +
+        training_bonus
+    )
+    return np.where(overall_scores > 1.0, 1.0, overall_scores)
+
+def _select_top_k(match_scores, seeker_ids, top_k):
+    """
+    Positions of the top_k scores, best first, with ties broken by ascending seeker ID.
+
+    Uses an O(n) partition to find the k-th best score and only sorts the
+    survivors, instead of sorting every candidate.
+    """
+    n = len(match_scores)
+    if top_k is None or top_k >= n:
+        return np.lexsort((seeker_ids, -match_scores))
+    if top_k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    
+    threshold = -np.partition(-match_scores, top_k - 1)[top_k - 1]
+    above = np.flatnonzero(match_scores > threshold)
+    
+    # Fill the remaining places with the lowest seeker IDs among the tied scores
+    tied = np.flatnonzero(match_scores == threshold)
+    needed = top_k - len(above)
+    if needed < len(tied):
+        tied = tied[np.argpartition(seeker_ids[tied], needed - 1)[:needed]]
+    
+    survivors = np.concatenate([above, tied])
+    return survivors[np.lexsort((seeker_ids[survivors], -match_scores[survivors]))]
 
 class JobMatchingEngine:
     """
@@ -22,99 +241,200 @@ class JobMatchingEngine:
     """
     
     def __init__(self):
-        self.knn_model = None
-        self.scaler = StandardScaler()
-        self.label_encoders = {}
-        self.tfidf_vectorizer = TfidfVectorizer(max_features=100, stop_words='english')
-        self.rf_classifier = None
-        self.feature_columns = []
-        self.is_trained = False
+        self._models = NO_MODELS  # replaced whole by _publish_models, never mutated
+        self._retrieval_lookup = None
+        self._tfidf_vectorizer = None
+        self.skill_vocabulary = SkillVocabulary()
+        self.candidate_store = CandidateStore(self.skill_vocabulary)
+        self.posting_index = PostingIndex(self.skill_vocabulary)
+        self.match_cache = MatchCache(MATCH_CACHE_SIZE)
+        self.top_k_trackers = {}  # job posting id -> TopKTracker
+        self._tracked_postings = PostingIndex(self.skill_vocabulary)  # postings of the trackers
+        self._tracked_postings.load([])
+        self.placement_predictions = {}  # job seeker id -> placement probability under model_id
+        self._write_lock = threading.Lock()
+        self._model_load_status = 'untrained'  # untrained, loading or failed, until is_trained
         
+    @property
+    def parallel_scorer(self):
+        """
+        The process's ShardedScorer, or None while parallel scoring is off; see start_parallel_scoring
+        """
+        return _parallel_scorer
+    
+    @property
+    def models(self):
+        """
+        The current ModelSnapshot.
+
+        Read it once per operation and use that snapshot throughout: it is
+        immutable, but training or loading may publish a new one at any
+        time. Reading it never waits on a lock.
+        """
+        return self._models
+    
+    def __getattr__(self, name):
+        # Model attributes (knn_model, scaler, label_encoders, ...) read through the current snapshot
+        if name in ModelSnapshot.__slots__:
+            return getattr(self.__dict__.get('_models', NO_MODELS), name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+    
+    @property
+    def is_trained(self):
+        return self._models.is_trained
+    
+    @property
+    def model_version(self):
+        return self._models.version
+    
+    @property
+    def model_status(self):
+        """
+        'ready' once models are trained or loaded, else 'untrained', 'loading' or 'failed'
+        """
+        return 'ready' if self.is_trained else self._model_load_status
+        
+    @property
+    def tfidf_vectorizer(self):
+        if self._tfidf_vectorizer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            self._tfidf_vectorizer = TfidfVectorizer(max_features=100, stop_words='english')
+        return self._tfidf_vectorizer
+    
     def prepare_features(self, job_seekers_df, job_postings_df=None):
         """
-        Prepare features for machine learning from job seekers and job postings data
+        Prepare features for machine learning from job seekers and job postings data.
+
+        Works column by column: each distinct skills value is parsed once, and
+        the skill flags are substring tests over the joined skill lists.
         """
-        features_list = []
+        import pandas as pd
         
-        for _, seeker in job_seekers_df.iterrows():
-            # Parse skills from JSON string
+        n = len(job_seekers_df)
+        
+        # Parse skills from JSON strings, once per distinct value
+        parsed = {}
+        def parse(value):
             try:
-                skills = json.loads(seeker['skills']) if isinstance(seeker['skills'], str) else seeker['skills']
+                skills = json.loads(value) if isinstance(value, str) else value
             except:
                 skills = []
+            # A NUL separator keeps substring tests from matching across skills
+            return len(skills), '\0'.join(str(skill) for skill in skills)
+        
+        skills_count = np.zeros(n, dtype=np.int64)
+        joined_skills = np.empty(n, dtype=object)
+        for i, value in enumerate(job_seekers_df['skills'].to_numpy()):
+            key = value if isinstance(value, str) else id(value)
+            if key not in parsed:
+                parsed[key] = parse(value)
+            skills_count[i], joined_skills[i] = parsed[key]
+        joined_skills = pd.Series(joined_skills, dtype=object)
+        
+        def skill_flag(skill):
+            return joined_skills.str.contains(skill, regex=False).astype(np.int64).to_numpy()
+        
+        preferred_salary_min = _column(job_seekers_df, 'preferred_salary_min', 20000)
+        preferred_salary_max = _column(job_seekers_df, 'preferred_salary_max', 35000)
+        placement_status = _column(job_seekers_df, 'placement_status', 'Unknown')
+        training_result = job_seekers_df['training_result'].to_numpy()
+        
+        return pd.DataFrame({
+            # Numerical features
+            'diploma_score': job_seekers_df['diploma_score'].to_numpy(),
+            'experience_years': job_seekers_df['experience_years'].to_numpy(),
+            'preferred_salary_min': preferred_salary_min,
+            'preferred_salary_max': preferred_salary_max,
+            'skills_count': skills_count,
             
-            # Create feature vector
-            features = {
-                # Numerical features
-                'diploma_score': seeker['diploma_score'],
-                'experience_years': seeker['experience_years'],
-                'preferred_salary_min': seeker.get('preferred_salary_min', 20000),
-                'preferred_salary_max': seeker.get('preferred_salary_max', 35000),
-                'skills_count': len(skills),
-                
-                # Categorical features (will be encoded)
-                'state': seeker['state'],
-                'city': seeker['city'],
-                'category': seeker['category'],
-                'gender': seeker['gender'],
-                'training_result': seeker['training_result'],
-                'placement_status': seeker.get('placement_status', 'Unknown'),
-                
-                # Skills features (binary encoding for common skills)
-                'has_solar_installation': 1 if any('Solar Panel Installation' in skill for skill in skills) else 0,
-                'has_maintenance': 1 if any('Maintenance' in skill for skill in skills) else 0,
-                'has_electrical': 1 if any('Electrical' in skill for skill in skills) else 0,
-                'has_safety': 1 if any('Safety' in skill for skill in skills) else 0,
-                'has_technical_doc': 1 if any('Technical Documentation' in skill for skill in skills) else 0,
-                'has_project_mgmt': 1 if any('Project Management' in skill for skill in skills) else 0,
-                
-                # Derived features
-                'salary_range': seeker.get('preferred_salary_max', 35000) - seeker.get('preferred_salary_min', 20000),
-                'is_placed': 1 if seeker.get('placement_status') == 'Placed' else 0,
-                'passed_training': 1 if seeker['training_result'] == 'Pass' else 0,
-                
-                # ID for reference
-                'seeker_id': seeker['id']
-            }
+            # Categorical features (will be encoded)
+            'state': job_seekers_df['state'].to_numpy(),
+            'city': job_seekers_df['city'].to_numpy(),
+            'category': job_seekers_df['category'].to_numpy(),
+            'gender': job_seekers_df['gender'].to_numpy(),
+            'training_result': training_result,
+            'placement_status': placement_status,
             
-            features_list.append(features)
-        
-        return pd.DataFrame(features_list)
+            # Skills features (binary encoding for common skills)
+            'has_solar_installation': skill_flag('Solar Panel Installation'),
+            'has_maintenance': skill_flag('Maintenance'),
+            'has_electrical': skill_flag('Electrical'),
+            'has_safety': skill_flag('Safety'),
+            'has_technical_doc': skill_flag('Technical Documentation'),
+            'has_project_mgmt': skill_flag('Project Management'),
+            
+            # Derived features
+            'salary_range': preferred_salary_max - preferred_salary_min,
+            'is_placed': (placement_status == 'Placed').astype(np.int64),
+            'passed_training': (training_result == 'Pass').astype(np.int64),
+            
+            # ID for reference
+            'seeker_id': job_seekers_df['id'].to_numpy()
+        }).infer_objects()
     
-    def encode_categorical_features(self, df, fit=True):
+    def encode_categorical_features(self, df, fit=True, label_encoders=None):
         """
-        Encode categorical features using label encoding
+        Encode categorical features using label encoding.
+
+        Transforming maps values through a dict of the fitted classes instead
+        of LabelEncoder.transform, with unseen values encoded as 'Unknown'.
+        label_encoders defaults to the encoders of the current models when
+        transforming; fitting fills the dict passed in.
         """
+        from sklearn.preprocessing import LabelEncoder
+        
+        if label_encoders is None:
+            label_encoders = {} if fit else self.models.label_encoders
         categorical_columns = ['state', 'city', 'category', 'gender', 'training_result', 'placement_status']
         
         for col in categorical_columns:
             if col in df.columns:
                 if fit:
-                    if col not in self.label_encoders:
-                        self.label_encoders[col] = LabelEncoder()
-                    df[col + '_encoded'] = self.label_encoders[col].fit_transform(df[col].astype(str))
+                    if col not in label_encoders:
+                        label_encoders[col] = LabelEncoder()
+                    df[col + '_encoded'] = label_encoders[col].fit_transform(df[col].astype(str))
                 else:
-                    if col in self.label_encoders:
+                    if col in label_encoders:
                         # Handle unseen categories
-                        unique_values = set(self.label_encoders[col].classes_)
-                        df[col] = df[col].astype(str).apply(lambda x: x if x in unique_values else 'Unknown')
-                        df[col + '_encoded'] = self.label_encoders[col].transform(df[col])
+                        code_map = {label: code for code, label in enumerate(label_encoders[col].classes_)}
+                        values = df[col].astype(str)
+                        seen = values.isin(code_map.keys())
+                        if not seen.all() and 'Unknown' not in code_map:
+                            raise ValueError(f"y contains previously unseen labels: {values[~seen].unique().tolist()}")
+                        df[col] = values.where(seen, 'Unknown')
+                        df[col + '_encoded'] = df[col].map(code_map).astype(np.int64)
                     else:
                         df[col + '_encoded'] = 0  # Default encoding for unseen categories
         
         return df
     
-    def train_models(self, job_seekers_df):
+    def train_models(self, job_seekers_df, progress=None):
         """
-        Train the machine learning models using job seekers data
+        Train the machine learning models using job seekers data.
+
+        progress, if given, is called with the name of each stage as it
+        starts ('featurize', then 'fit'); an exception it raises aborts
+        training. The models are built into a new snapshot that replaces
+        the current one only once complete, so matching can go on meanwhile.
         """
+        from sklearn.neighbors import NearestNeighbors
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.ensemble import RandomForestClassifier
+        
         print("Training ML models...")
+        if progress is not None:
+            progress('featurize')
+        
+        # Intern the skill vocabulary used for matching
+        for skills in _column(job_seekers_df, 'skills', None):
+            self.skill_vocabulary.intern_many(parse_skill_list(skills))
         
         # Prepare features
         features_df = self.prepare_features(job_seekers_df)
         
         # Encode categorical features
-        features_df = self.encode_categorical_features(features_df, fit=True)
+        label_encoders = {}
+        features_df = self.encode_categorical_features(features_df, fit=True, label_encoders=label_encoders)
         
         # Select numerical features for ML
         numerical_features = [
@@ -126,29 +446,265 @@ class JobMatchingEngine:
         
         # Add encoded categorical features
         encoded_features = [col for col in features_df.columns if col.endswith('_encoded')]
-        self.feature_columns = numerical_features + encoded_features
+        feature_columns = numerical_features + encoded_features
         
         # Prepare training data
-        X = features_df[self.feature_columns].fillna(0)
+        X = features_df[feature_columns].fillna(0)
+        if progress is not None:
+            progress('fit')
         
         # Scale features
-        X_scaled = self.scaler.fit_transform(X)
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
         
         # Train KNN model for similarity matching
-        self.knn_model = NearestNeighbors(n_neighbors=10, metric='cosine')
-        self.knn_model.fit(X_scaled)
+        knn_model = NearestNeighbors(n_neighbors=10, metric='cosine')
+        knn_model.fit(X_scaled)
+        retrieval_norms = np.linalg.norm(X_scaled, axis=1)
         
         # Train Random Forest for placement prediction
         y_placement = features_df['is_placed']
-        self.rf_classifier = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.rf_classifier.fit(X_scaled, y_placement)
+        rf_classifier = RandomForestClassifier(n_estimators=100, random_state=42)
+        rf_classifier.fit(X_scaled, y_placement)
         
-        self.is_trained = True
+        self._publish_models(ModelSnapshot(
+            knn_model=knn_model,
+            scaler=scaler,
+            label_encoders=label_encoders,
+            rf_classifier=rf_classifier,
+            feature_columns=feature_columns,
+            training_seeker_ids=features_df['seeker_id'].to_numpy(),
+            retrieval_matrix=self._unit_rows(X_scaled),
+            retrieval_norms=retrieval_norms,
+            baseline={
+                'mean': scaler.mean_.copy(),
+                'scale': scaler.scale_.copy(),
+                'count': len(X),
+                'trained_at': datetime.utcnow().isoformat()
+            },
+            model_id=datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        ))
         print(f"Models trained successfully with {len(features_df)} candidates")
-        print(f"Feature columns: {len(self.feature_columns)}")
+        print(f"Feature columns: {len(feature_columns)}")
+        
+        return True
+    
+    def update_models(self, job_seekers_df, progress=None):
+        """
+        Fold new or changed job seekers into the current models without a full refit.
+
+        The scaler takes the new rows into its mean and variance with a
+        streaming update, and the label encoders only append categories
+        they have not seen, so existing codes keep their meaning. Existing
+        trees and retrieval index rows are re-expressed in the updated
+        scaling in one linear pass; seekers already in the index have their
+        row replaced and new ones are appended, with no refit of the index.
+        The forest grows by trees fitted on the new rows only, in
+        proportion to their share of all rows seen (at least
+        MIN_UPDATE_TREES, so small batches weigh somewhat more).
+
+        Publishes the result as a new snapshot, like train_models; progress
+        works the same way. refit_reason tells when a full train_models is
+        due instead.
+        """
+        from sklearn.neighbors import NearestNeighbors
+        from sklearn.ensemble import RandomForestClassifier
+        
+        models = self.models
+        if self.refit_reason() in ('untrained', 'incomplete'):
+            raise ValueError('The current models cannot be updated incrementally; train them first')
+        
+        print("Updating ML models...")
+        if progress is not None:
+            progress('featurize')
+        
+        for skills in _column(job_seekers_df, 'skills', None):
+            self.skill_vocabulary.intern_many(parse_skill_list(skills))
+        features_df, label_encoders, X = self._update_features(models, job_seekers_df)
+        if progress is not None:
+            progress('fit')
+        
+        old_scaler = ArrayScaler.from_scaler(models.scaler, len(models.training_seeker_ids))
+        scaler = old_scaler.updated(X)
+        X_scaled = scaler.transform(X)
+        
+        # Index rows back to scaled features, then into the updated scaling
+        scaled_rows = np.asarray(models.retrieval_matrix, dtype=float) * np.asarray(models.retrieval_norms)[:, None]
+        scaled_rows = (scaled_rows * old_scaler.scale_ + old_scaler.mean_ - scaler.mean_) / scaler.scale_
+        
+        seeker_ids = np.asarray(models.training_seeker_ids)
+        update_ids = features_df['seeker_id'].to_numpy()
+        order = np.argsort(seeker_ids, kind='stable')
+        positions = np.minimum(np.searchsorted(seeker_ids[order], update_ids), len(seeker_ids) - 1)
+        indexed = seeker_ids[order[positions]] == update_ids
+        scaled_rows[order[positions[indexed]]] = X_scaled[indexed]
+        scaled_rows = np.vstack([scaled_rows, X_scaled[~indexed]])
+        seeker_ids = np.concatenate([seeker_ids, update_ids[~indexed]])
+        
+        retrieval_matrix = self._unit_rows(scaled_rows)
+        knn_model = NearestNeighbors(n_neighbors=models.knn_model.n_neighbors, metric=models.knn_model.metric)
+        knn_model.fit(retrieval_matrix)
+        
+        forest = ForestArrays.from_forest(models.rf_classifier).rescaled(
+            old_scaler.mean_, old_scaler.scale_, scaler.mean_, scaler.scale_
+        )
+        n_trees = max(MIN_UPDATE_TREES, round(forest.n_estimators * len(X) / old_scaler.n_samples_seen_))
+        new_trees = RandomForestClassifier(n_estimators=n_trees, random_state=42)
+        new_trees.fit(X_scaled, features_df['is_placed'])
+        forest = forest.extended(new_trees)
+        
+        self._publish_models(ModelSnapshot(
+            knn_model=knn_model,
+            scaler=scaler,
+            label_encoders=label_encoders,
+            rf_classifier=forest,
+            feature_columns=models.feature_columns,
+            training_seeker_ids=seeker_ids,
+            retrieval_matrix=retrieval_matrix,
+            retrieval_norms=np.linalg.norm(scaled_rows, axis=1),
+            baseline=models.baseline,
+            model_id=datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        ))
+        print(f"Models updated with {len(X)} candidates ({n_trees} trees added, {forest.n_estimators} in total)")
         
         return True
     
+    def refit_reason(self, new_job_seekers_df=None):
+        """
+        Why the models call for a full train_models rather than update_models, or None.
+
+        'untrained'; 'incomplete' if they lack the state updates need (e.g.
+        loaded from an artifact written before incremental updates);
+        'schedule' once the last full refit is FULL_REFIT_INTERVAL_DAYS old;
+        'forest_size' once updates grew the forest to MAX_FOREST_TREES;
+        'growth' once updates, counting new_job_seekers_df, added more than
+        MAX_UPDATE_GROWTH times the rows of the last full refit; 'drift' if
+        the mean of a numeric feature over the rows added since the last
+        full refit, new_job_seekers_df included, is more than
+        DRIFT_THRESHOLD standard deviations from the mean at that refit.
+        Encoded categories are left out of the drift check: their codes are
+        arbitrary, and update_models appends codes for new ones.
+        """
+        models = self.models
+        if not models.is_trained:
+            return 'untrained'
+        if models.baseline is None or models.retrieval_norms is None or models.training_seeker_ids is None:
+            return 'incomplete'
+        baseline = models.baseline
+        if datetime.utcnow() - datetime.fromisoformat(baseline['trained_at']) >= timedelta(days=FULL_REFIT_INTERVAL_DAYS):
+            return 'schedule'
+        if models.rf_classifier.n_estimators >= MAX_FOREST_TREES:
+            return 'forest_size'
+        
+        scaler = ArrayScaler.from_scaler(models.scaler, len(models.training_seeker_ids))
+        if new_job_seekers_df is not None and len(new_job_seekers_df):
+            scaler = scaler.updated(self._update_features(models, new_job_seekers_df)[2])
+        added = scaler.n_samples_seen_ - baseline['count']
+        if added > MAX_UPDATE_GROWTH * baseline['count']:
+            return 'growth'
+        if added > 0:
+            # Statistics of the added rows, from the running ones less those of the full refit
+            added_mean = (scaler.n_samples_seen_ * scaler.mean_ - baseline['count'] * baseline['mean']) / added
+            numeric = np.array([not column.endswith('_encoded') for column in models.feature_columns])
+            if np.max((np.abs(added_mean - baseline['mean']) / baseline['scale'])[numeric]) > DRIFT_THRESHOLD:
+                return 'drift'
+        return None
+    
+    def _update_features(self, models, job_seekers_df):
+        """
+        Features of job seekers for an incremental update of models: (features_df, extended label encoders, X)
+        """
+        from sklearn.preprocessing import LabelEncoder
+        
+        features_df = self.prepare_features(job_seekers_df).drop_duplicates('seeker_id', keep='last')
+        
+        # Code tables are append-only: categories not seen yet get the next codes. classes_ is then
+        # no longer sorted, which the code maps in encode_categorical_features do not rely on.
+        label_encoders = {}
+        for col, encoder in models.label_encoders.items():
+            classes = list(encoder.classes_)
+            if col in features_df.columns:
+                classes += sorted(set(features_df[col].astype(str)) - set(classes))
+            label_encoders[col] = LabelEncoder()
+            label_encoders[col].classes_ = np.array(classes, dtype=object)
+        
+        features_df = self.encode_categorical_features(features_df, fit=False, label_encoders=label_encoders)
+        X = features_df[list(models.feature_columns)].fillna(0).to_numpy(dtype=float)
+        return features_df, label_encoders, X
+    
+    def _publish_models(self, models):
+        """
+        Make a new ModelSnapshot current with one reference swap.
+
+        Readers that already took the old snapshot finish with it. The
+        placement predictions of the old models are dropped in the same
+        step, under the write lock that candidate updates take.
+        """
+        with self._write_lock:
+            self._models = models.published(self._models.version + 1)
+            self.placement_predictions = {}
+            self.candidate_store.clear_placement_probabilities()
+    
+    def adopt_models(self, trained):
+        """
+        Start serving the models of another, trained engine.
+
+        Lets training run on a separate engine while this one keeps serving
+        the old models, e.g. until the new ones are saved.
+        """
+        self.skill_vocabulary.intern_many(trained.skill_vocabulary.terms)
+        self._publish_models(trained.models)
+    
+    def predict_placement(self, job_seekers_df, models=None):
+        """
+        Placement probability of each job seeker from the random forest, in one batch
+        """
+        models = models or self.models
+        features_df = self.encode_categorical_features(
+            self.prepare_features(job_seekers_df), fit=False, label_encoders=models.label_encoders
+        )
+        X_scaled = models.scaler.transform(features_df[list(models.feature_columns)].fillna(0))
+        
+        classes = list(models.rf_classifier.classes_)
+        if 1 not in classes:
+            return np.zeros(len(features_df))
+        return models.rf_classifier.predict_proba(X_scaled)[:, classes.index(1)]
+    
+    def refresh_placement_predictions(self, job_seekers):
+        """
+        Predict placement for a list of job seeker dicts and make the predictions available to ranking.
+
+        Returns {job_seeker_id: probability}, tagged by the caller with
+        model_id when stored.
+        """
+        import pandas as pd
+        
+        models = self.models
+        if not models.is_trained or not job_seekers:
+            return {}
+        try:
+            probabilities = self.predict_placement(pd.DataFrame(job_seekers), models)
+        except ValueError as e:
+            print(f"Error predicting placement: {e}")
+            return {}
+        predictions = {int(seeker['id']): float(p) for seeker, p in zip(job_seekers, probabilities)}
+        self.apply_placement_predictions(predictions, models.model_id)
+        return predictions
+    
+    def apply_placement_predictions(self, predictions, model_id):
+        """
+        Make stored {job_seeker_id: probability} predictions available to ranking.
+
+        Predictions made by other models than the current one are ignored;
+        returns whether they were applied.
+        """
+        with self._write_lock:
+            if model_id is None or model_id != self.model_id:
+                return False
+            self.placement_predictions.update(predictions)
+            self.candidate_store.set_placement_probabilities(predictions)
+        return True
+    
     def calculate_skill_similarity(self, candidate_skills, job_required_skills, job_preferred_skills=None):
         """
         Calculate skill similarity between candidate and job requirements
@@ -162,30 +718,17 @@ class JobMatchingEngine:
         if job_preferred_skills is None:
             job_preferred_skills = []
         
-        # Convert to lowercase for comparison
-        candidate_skills_lower = [skill.lower() for skill in candidate_skills]
-        required_skills_lower = [skill.lower() for skill in job_required_skills]
-        preferred_skills_lower = [skill.lower() for skill in job_preferred_skills]
+        # Look up the precomputed related-ID sets; skills outside the vocabulary are compared as strings
+        vocabulary = self.skill_vocabulary
         
         # Calculate required skills match
-        required_matches = 0
-        for req_skill in required_skills_lower:
-            for cand_skill in candidate_skills_lower:
-                if req_skill in cand_skill or cand_skill in req_skill:
-                    required_matches += 1
-                    break
-        
-        required_score = required_matches / len(required_skills_lower) if required_skills_lower else 0
+        required_matches = vocabulary.count_related(job_required_skills, candidate_skills)
+        required_score = required_matches / len(job_required_skills) if job_required_skills else 0
         
         # Calculate preferred skills match
-        preferred_matches = 0
-        if preferred_skills_lower:
-            for pref_skill in preferred_skills_lower:
-                for cand_skill in candidate_skills_lower:
-                    if pref_skill in cand_skill or cand_skill in pref_skill:
-                        preferred_matches += 1
-                        break
-            preferred_score = preferred_matches / len(preferred_skills_lower)
+        if job_preferred_skills:
+            preferred_matches = vocabulary.count_related(job_preferred_skills, candidate_skills)
+            preferred_score = preferred_matches / len(job_preferred_skills)
         else:
             preferred_score = 0
         
@@ -235,185 +778,1070 @@ class JobMatchingEngine:
             else:
                 return 0
     
-    def match_candidates_to_job(self, job_posting, job_seekers_df, top_k=10):
+    def score_candidates(self, job_posting, candidates, rows=None):
         """
-        Find the best matching candidates for a specific job posting
+        Score the rows of a CandidateSnapshot against a job posting in one pass.
+
+        Returns a dict of numpy arrays (one entry per scored row, all rows if
+        rows is None) holding the component scores and the overall match_score,
+        using the same rules as the per-candidate calculate_* helpers.
         """
-        if not self.is_trained:
-            print("Models not trained yet. Training with current data...")
-            self.train_models(job_seekers_df)
+        take = (lambda values: values) if rows is None else (lambda values: values[rows])
         
-        matches = []
+        job_required_skills = parse_skill_list(job_posting.get('required_skills', '[]'))
+        job_preferred_skills = parse_skill_list(job_posting.get('preferred_skills', '[]'))
         
-        # Parse job requirements
-        try:
-            job_required_skills = json.loads(job_posting.get('required_skills', '[]'))
-        except:
-            job_required_skills = []
+        skill_scores = _skill_scores(
+            self.skill_vocabulary, candidates.skill_matrix_for(rows), job_required_skills, job_preferred_skills
+        )
         
-        try:
-            job_preferred_skills = json.loads(job_posting.get('preferred_skills', '[]'))
-        except:
-            job_preferred_skills = []
+        location_scores = _location_scores(
+            take(candidates.city_codes) == candidates.city_code(job_posting['city']),
+            take(candidates.state_codes) == candidates.state_code(job_posting['state'])
+        )
         
-        for _, candidate in job_seekers_df.iterrows():
-            # Skip unavailable candidates
-            if candidate.get('availability_status') != 'available':
-                continue
+        terms = posting_terms(job_posting)
+        salary_scores = _salary_scores(
+            take(candidates.salary_min), take(candidates.salary_max), terms['salary_min'], terms['salary_max']
+        )
+        experience_scores = _experience_scores(take(candidates.experience_years), terms['experience_required'])
+        diploma_scores = _diploma_scores(take(candidates.diploma_score), terms['minimum_diploma_score'])
+        training_bonus = np.where(take(candidates.passed_training), TRAINING_PASS_BONUS, 0.0)
+        
+        overall_scores = (
+            skill_scores * MATCH_WEIGHTS['skills'] +
+            location_scores * MATCH_WEIGHTS['location'] +
+            salary_scores * MATCH_WEIGHTS['salary'] +
+            experience_scores * MATCH_WEIGHTS['experience'] +
+            diploma_scores * MATCH_WEIGHTS['diploma'] +
+            training_bonus
+        )
+        
+        return {
+            'match_score': np.where(overall_scores > 1.0, 1.0, overall_scores),
+            'skill_score': skill_scores,
+            'location_score': location_scores,
+            'salary_score': salary_scores,
+            'experience_score': experience_scores,
+            'diploma_score': diploma_scores,
+            'training_bonus': training_bonus
+        }
+    
+    def rank_candidates(self, job_posting, candidates, top_k=10, min_score=None):
+        """
+        Rank the live rows of a CandidateSnapshot for a job posting.
+
+        Ties on match_score are broken by job seeker ID, so the ranking does
+        not depend on where a candidate sits in the store. Matches below
+        min_score are left out of the top_k. Only the top_k
+        survivors are turned into match dicts. Candidate groups whose best
+        possible score cannot reach the current k-th best (or min_score) are
+        never scored; see _candidate_groups. Groups of at least
+        PARALLEL_MIN_CANDIDATES rows are scored across the parallel scorer's
+        worker processes when it is configured.
+        """
+        best_rows = self._rank_rows(job_posting, candidates, top_k, min_score)
+        with span('build_matches'):
+            scores = self.score_candidates(job_posting, candidates, best_rows)
+            return [self._build_match(scores, candidates, best_rows, i) for i in range(len(best_rows))]
+    
+    def _rank_rows(self, job_posting, candidates, top_k, min_score):
+        """
+        Snapshot rows of the ranked candidates, best first; the ranking behind rank_candidates
+        """
+        best_rows = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0)
+        job_terms = None
+        parallel_scorer = self.parallel_scorer
+        if top_k is not None and top_k <= 0:
+            return best_rows
+        
+        for upper_bound, group in self._candidate_groups(job_posting, candidates):
+            if min_score is not None and upper_bound < min_score:
+                break
+            if top_k is not None and len(best_rows) >= top_k and upper_bound < best_scores[-1]:
+                break
             
-            # Parse candidate skills
-            try:
-                candidate_skills = json.loads(candidate['skills']) if isinstance(candidate['skills'], str) else candidate['skills']
-            except:
-                candidate_skills = []
+            with span('candidate_groups'):
+                rows = group()
+            if not len(rows):
+                continue
+            with span('score'):
+                if parallel_scorer is not None and len(rows) >= parallel_scorer.min_candidates:
+                    if job_terms is None:
+                        job_terms = self._job_terms(job_posting, candidates)
+                    rows, group_scores = parallel_scorer.top_rows(candidates, job_terms, rows, top_k, min_score)
+                else:
+                    group_scores = self.score_candidates(job_posting, candidates, rows)['match_score']
             
-            # Calculate individual scores
-            skill_score = self.calculate_skill_similarity(
-                candidate_skills, job_required_skills, job_preferred_skills
+            with span('sort'):
+                best_rows = np.concatenate([best_rows, rows])
+                best_scores = np.concatenate([best_scores, group_scores])
+                top = _select_top_k(best_scores, candidates.seeker_ids[best_rows], top_k)
+                best_rows, best_scores = best_rows[top], best_scores[top]
+        
+        if min_score is not None:
+            best_rows = best_rows[best_scores >= min_score]
+        return best_rows
+    
+    def _job_terms(self, job_posting, candidates):
+        """
+        A job posting's scoring terms as plain values and arrays, for score_columns
+        """
+        vocabulary = self.skill_vocabulary
+        required_related = vocabulary.query_relation(parse_skill_list(job_posting.get('required_skills', '[]')))
+        preferred_related = vocabulary.query_relation(parse_skill_list(job_posting.get('preferred_skills', '[]')))
+        size = min(len(required_related), len(preferred_related))
+        
+        job_terms = posting_terms(job_posting)
+        job_terms.update({
+            'city_code': candidates.city_code(job_posting['city']),
+            'state_code': candidates.state_code(job_posting['state']),
+            'required_related': required_related[:size],
+            'preferred_related': preferred_related[:size],
+            'vocabulary_size': size
+        })
+        return job_terms
+    
+    def _candidate_groups(self, job_posting, candidates):
+        """
+        Split the live candidates into groups with an upper bound on their match score.
+
+        Candidates are grouped by location tier (same city, same state, other)
+        and by whether they hold any skill related to the posting's skills.
+        The nearby tiers come from the store's city and state indexes and the
+        skilled part of the other tier from its skill index. Returns
+        (upper_bound, rows) pairs in descending bound order, where rows is a
+        callable so groups that get pruned are never materialized. The bounds
+        use the same arithmetic as score_candidates with every other component
+        at its maximum, so no candidate can score above its group's bound.
+        """
+        job_required_skills = parse_skill_list(job_posting.get('required_skills', '[]'))
+        job_preferred_skills = parse_skill_list(job_posting.get('preferred_skills', '[]'))
+        related_mask = self.skill_vocabulary.query_relation(job_required_skills + job_preferred_skills).any(axis=1)
+        
+        computed = {}
+        def lazy(name, compute):
+            def rows():
+                if name not in computed:
+                    computed[name] = compute()
+                return computed[name]
+            return rows
+        
+        city_rows = lazy('city', lambda: candidates.rows_for_city(candidates.city_code(job_posting['city'])))
+        state_rows = lazy('state', lambda: np.setdiff1d(
+            candidates.rows_for_state(candidates.state_code(job_posting['state'])), city_rows(), assume_unique=True
+        ))
+        nearby_rows = lazy('nearby', lambda: np.union1d(city_rows(), state_rows()))
+        other_skilled_rows = lazy('other_skilled', lambda: np.setdiff1d(
+            candidates.rows_for_skills(np.flatnonzero(related_mask)), nearby_rows(), assume_unique=True
+        ))
+        other_rows = lazy('other', lambda: np.setdiff1d(
+            np.setdiff1d(candidates.live_rows(), nearby_rows(), assume_unique=True),
+            other_skilled_rows(), assume_unique=True
+        ))
+        
+        def split(name, tier_rows, skilled):
+            tier_skilled = lazy(name + '_skilled', lambda: candidates.has_any_skill(tier_rows(), related_mask))
+            return lambda: tier_rows()[tier_skilled() == skilled]
+        
+        terms = posting_terms(job_posting)
+        salary_missing = any(np.isnan(terms[key]) or terms[key] == 0 for key in ('salary_min', 'salary_max'))
+        salary_bound = 0.5 if salary_missing else 1.0
+        skill_bound = (1.0 if job_required_skills else 0.0) * 0.7 + (1.0 if job_preferred_skills else 0.0) * 0.3
+        skill_bound = min(skill_bound, 1.0)
+        
+        groups = []
+        for location_score, skilled, rows in (
+            (1.0, True, split('city', city_rows, True)), (1.0, False, split('city', city_rows, False)),
+            (0.7, True, split('state', state_rows, True)), (0.7, False, split('state', state_rows, False)),
+            (0.3, True, other_skilled_rows), (0.3, False, other_rows)
+        ):
+            upper_bound = (
+                (skill_bound if skilled else 0.0) * MATCH_WEIGHTS['skills'] +
+                location_score * MATCH_WEIGHTS['location'] +
+                salary_bound * MATCH_WEIGHTS['salary'] +
+                1.0 * MATCH_WEIGHTS['experience'] +
+                1.0 * MATCH_WEIGHTS['diploma'] +
+                TRAINING_PASS_BONUS
             )
-            
-            location_score = self.calculate_location_score(
-                candidate['city'], candidate['state'],
-                job_posting['city'], job_posting['state']
+            groups.append((min(upper_bound, 1.0), rows))
+        
+        groups.sort(key=lambda group: group[0], reverse=True)
+        return groups
+    
+    def _build_match(self, scores, candidates, rows, i):
+        """
+        Build the match dict for the i-th scored row
+        """
+        row = rows[i]
+        match = {
+            'job_seeker_id': int(candidates.seeker_ids[row]),
+            'match_score': float(scores['match_score'][i]),
+            'skill_score': float(scores['skill_score'][i]),
+            'location_score': float(scores['location_score'][i]),
+            'salary_score': float(scores['salary_score'][i]),
+            'experience_score': float(scores['experience_score'][i]),
+            'diploma_score': float(scores['diploma_score'][i])
+        }
+        match['reason_codes'] = reason_codes(match, candidates.diploma_score[row], candidates.placed[row])
+        return match
+    
+    def match_job(self, job_posting, top_k=10, min_score=None, candidate_budget=None,
+                  placement_weight=0.0, min_placement_probability=None):
+        """
+        Find the best matching candidates for a job posting from the resident candidate store.
+
+        Results for postings with an ID are served from the match cache while
+        neither the posting, the candidate pool nor the model has changed in
+        a way that affects them. Cache misses for active postings are served
+        from the posting's TopKTracker. Requests with a candidate_budget or
+        a placement signal bypass both (see match_job_approximate).
+        """
+        if candidate_budget is not None or placement_weight or min_placement_probability is not None:
+            return self.match_job_approximate(
+                job_posting, top_k, min_score, candidate_budget, placement_weight, min_placement_probability
             )
-            
-            salary_score = self.calculate_salary_compatibility(
-                candidate.get('preferred_salary_min', 20000),
-                candidate.get('preferred_salary_max', 35000),
-                job_posting.get('salary_min', 15000),
-                job_posting.get('salary_max', 40000)
+        if job_posting.get('id') is None:
+            return self.rank_candidates(job_posting, self.candidate_store.snapshot(), top_k, min_score)
+        
+        key = MatchCache.key(job_posting, top_k, min_score, self.model_version)
+        with span('match_cache'):
+            matches = self.match_cache.get(key, self.candidate_store.version)
+        if matches is None:
+            pool_version, matches = self._match_tracked(job_posting, top_k, min_score)
+            self.match_cache.put(key, job_posting, top_k, matches, pool_version)
+        return list(matches)
+    
+    def project_job_posting(self, job_posting, models=None):
+        """
+        Map a job posting into the scaled seeker feature space of the KNN model.
+
+        The posting's requirements stand in for the matching seeker features
+        (diploma minimum, experience, salary band, skills, location), and a
+        passed training is assumed since it earns the score bonus. Unseen
+        locations encode as 'Unknown' like encode_categorical_features.
+        Features a posting says nothing about take the training mean, which
+        scales to zero and drops out of the cosine.
+        """
+        terms = posting_terms(job_posting)
+        skills = (
+            parse_skill_list(job_posting.get('required_skills', '[]')) +
+            parse_skill_list(job_posting.get('preferred_skills', '[]'))
+        )
+        joined_skills = '\0'.join(skills)
+        models = models or self.models
+        
+        def encoded(col, value):
+            if col not in models.label_encoders:
+                return None
+            code_map = {label: code for code, label in enumerate(models.label_encoders[col].classes_)}
+            return code_map.get(str(value), code_map.get('Unknown'))
+        
+        salary_min = 0.0 if np.isnan(terms['salary_min']) else terms['salary_min']
+        salary_max = 0.0 if np.isnan(terms['salary_max']) else terms['salary_max']
+        salary_range = terms['salary_max'] - terms['salary_min']
+        features = {
+            'diploma_score': terms['minimum_diploma_score'],
+            'experience_years': terms['experience_required'],
+            'preferred_salary_min': salary_min,
+            'preferred_salary_max': salary_max,
+            'skills_count': len(skills),
+            'has_solar_installation': int('Solar Panel Installation' in joined_skills),
+            'has_maintenance': int('Maintenance' in joined_skills),
+            'has_electrical': int('Electrical' in joined_skills),
+            'has_safety': int('Safety' in joined_skills),
+            'has_technical_doc': int('Technical Documentation' in joined_skills),
+            'has_project_mgmt': int('Project Management' in joined_skills),
+            'salary_range': 0.0 if np.isnan(salary_range) else salary_range,
+            'passed_training': 1,
+            'state_encoded': encoded('state', job_posting.get('state')),
+            'city_encoded': encoded('city', job_posting.get('city')),
+            'training_result_encoded': encoded('training_result', 'Pass')
+        }
+        
+        mean = models.scaler.mean_
+        vector = np.array([
+            mean[i] if features.get(column) is None else features[column]
+            for i, column in enumerate(models.feature_columns)
+        ], dtype=float)
+        return ((vector - mean) / models.scaler.scale_)[None, :]
+    
+    @staticmethod
+    def _unit_rows(matrix):
+        """
+        Rows of a feature matrix scaled to unit length (all-zero rows stay zero)
+        """
+        matrix = np.asarray(matrix, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+    
+    def _retrieval_rows(self, job_posting, candidates, candidate_budget):
+        """
+        Snapshot rows for exact rescoring: the posting's candidate_budget
+        nearest seekers in the KNN index, plus live seekers the index has not
+        seen. Returns None when there is no usable index or the budget covers
+        the pool, in which case the caller ranks exhaustively.
+        """
+        models = self.models
+        if not models.is_trained or models.knn_model is None or models.training_seeker_ids is None:
+            return None
+        if candidate_budget >= min(len(models.training_seeker_ids), len(self.candidate_store)):
+            return None
+        
+        # Per store and model version: live seeker ids sorted for lookup, and the unindexed rows
+        lookup_key = (candidates.version, models.version)
+        if self._retrieval_lookup is None or self._retrieval_lookup[0] != lookup_key:
+            live = candidates.live_rows()
+            live_ids = candidates.seeker_ids[live]
+            order = np.argsort(live_ids)
+            fresh_rows = live[~np.isin(live_ids, models.training_seeker_ids)]
+            self._retrieval_lookup = (lookup_key, live_ids[order], live[order], fresh_rows)
+        _, sorted_ids, sorted_rows, fresh_rows = self._retrieval_lookup
+        
+        query = self.project_job_posting(job_posting, models)
+        if models.retrieval_matrix is not None:
+            # Brute-force cosine as one matrix-vector product, cheaper per query than kneighbors
+            similarity = models.retrieval_matrix @ self._unit_rows(query)[0]
+            neighbours = np.argpartition(-similarity, candidate_budget - 1)[:candidate_budget]
+        else:
+            neighbours = models.knn_model.kneighbors(query, n_neighbors=candidate_budget, return_distance=False)[0]
+        neighbour_ids = models.training_seeker_ids[neighbours]
+        positions = np.minimum(np.searchsorted(sorted_ids, neighbour_ids), max(len(sorted_ids) - 1, 0))
+        found = sorted_ids[positions] == neighbour_ids if len(sorted_ids) else np.zeros(len(neighbour_ids), dtype=bool)
+        return np.union1d(sorted_rows[positions[found]], fresh_rows)
+    
+    def match_job_approximate(self, job_posting, top_k=10, min_score=None, candidate_budget=RETRIEVAL_CANDIDATE_BUDGET,
+                              placement_weight=0.0, min_placement_probability=None):
+        """
+        Match through the KNN retrieval stage: take the posting's nearest
+        candidate_budget seekers and exactly rescore only those. Falls back
+        to the exhaustive vectorized ranking without a trained index, or
+        when candidate_budget is None.
+
+        With placement_weight, candidates are ranked by
+        (1 - placement_weight) * match_score + placement_weight * probability
+        of placement; min_placement_probability keeps only candidates
+        predicted at least that likely to be placed. Both read the
+        predictions held in the candidate store, so no model runs here.
+        """
+        candidates = self.candidate_store.snapshot()
+        rows = None
+        if candidate_budget is not None:
+            with span('retrieve'):
+                rows = self._retrieval_rows(job_posting, candidates, candidate_budget)
+        if rows is None:
+            if not placement_weight and min_placement_probability is None:
+                return self.rank_candidates(job_posting, candidates, top_k, min_score)
+            rows = candidates.live_rows()
+        
+        probabilities = candidates.placement_probability[rows]
+        if min_placement_probability is not None:
+            eligible = probabilities >= min_placement_probability  # False for unscored seekers
+            rows, probabilities = rows[eligible], probabilities[eligible]
+        
+        with span('score'):
+            scores = self.score_candidates(job_posting, candidates, rows)
+            ranking_scores = scores['match_score']
+            if placement_weight:
+                ranking_scores = (
+                    (1 - placement_weight) * ranking_scores + placement_weight * np.nan_to_num(probabilities, nan=0.0)
+                )
+        with span('sort'):
+            kept = np.arange(len(rows)) if min_score is None else np.flatnonzero(scores['match_score'] >= min_score)
+            top = kept[_select_top_k(ranking_scores[kept], candidates.seeker_ids[rows[kept]], top_k)]
+        
+        with span('build_matches'):
+            top_scores = {key: values[top] for key, values in scores.items()}
+            matches = [self._build_match(top_scores, candidates, rows[top], i) for i in range(len(top))]
+        if placement_weight or min_placement_probability is not None:
+            for match, probability, ranking_score in zip(matches, probabilities[top], ranking_scores[top]):
+                match['placement_probability'] = None if np.isnan(probability) else float(probability)
+                match['ranking_score'] = float(ranking_score)
+        return matches
+    
+    def iter_match_chunks(self, job_posting, top_k=10, min_score=None, candidate_budget=None,
+                          placement_weight=0.0, min_placement_probability=None, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Yield match_job's matches in lists of up to chunk_size, best first.
+
+        Large requests (top_k above MAX_TRACKED_TOP_K, or None) skip the
+        cache and trackers: the ranking is kept as an array of rows and only
+        chunk_size match dicts exist at a time, so memory stays bounded by
+        the chunk rather than the result size. Requests with a
+        candidate_budget or a placement signal are ranked by
+        match_job_approximate first and then split into chunks.
+        """
+        approximate = candidate_budget is not None or placement_weight or min_placement_probability is not None
+        if approximate or (top_k is not None and top_k <= MAX_TRACKED_TOP_K):
+            matches = self.match_job(
+                job_posting, top_k, min_score, candidate_budget, placement_weight, min_placement_probability
             )
+            for start in range(0, len(matches), chunk_size):
+                yield matches[start:start + chunk_size]
+            return
+        
+        candidates = self.candidate_store.snapshot()
+        best_rows = self._rank_rows(job_posting, candidates, top_k, min_score)
+        for start in range(0, len(best_rows), chunk_size):
+            rows = best_rows[start:start + chunk_size]
+            scores = self.score_candidates(job_posting, candidates, rows)
+            yield [self._build_match(scores, candidates, rows, i) for i in range(len(rows))]
+    
+    def _match_tracked(self, job_posting, top_k, min_score):
+        """
+        Rank candidates for a posting through its top-k tracker, building the tracker if needed.
+
+        Returns (candidate store version, matches).
+        """
+        if job_posting.get('status') != 'active' or top_k is None or not 0 < top_k <= MAX_TRACKED_TOP_K:
+            candidates = self.candidate_store.snapshot()
+            return candidates.version, self.rank_candidates(job_posting, candidates, top_k, min_score)
+        
+        version = (job_posting.get('updated_at'), self.model_version)
+        with self._write_lock:
+            candidates = self.candidate_store.snapshot()
+            tracker = self.top_k_trackers.get(job_posting['id'])
+            ranked = None
+            if tracker is not None and tracker.version == version and tracker.pool_version == candidates.version:
+                ranked = tracker.top(top_k)
+            if ranked is not None:
+                if min_score is not None:
+                    ranked = [(seeker_id, score) for seeker_id, score in ranked if score >= min_score]
+                rows = np.array([self.candidate_store.row(seeker_id) for seeker_id, _ in ranked], dtype=np.int64)
+        
+        if ranked is None:
+            # Rank from the snapshot without blocking writers, then install the tracker
+            # only if no write changed the pool meanwhile, as it would have missed that write
+            capacity = max(top_k, TRACKED_TOP_K) + TOP_K_SLACK
+            matches = self.rank_candidates(job_posting, candidates, capacity)
+            tracker = TopKTracker(job_posting, version, capacity, matches, candidates.version)
+            with self._write_lock:
+                if self.candidate_store.version == candidates.version:
+                    self.top_k_trackers[job_posting['id']] = tracker
+                    self._tracked_postings.upsert(job_posting)
             
-            # Experience score
-            required_exp = job_posting.get('experience_required', 0)
-            candidate_exp = candidate.get('experience_years', 0)
-            if required_exp == 0:
-                experience_score = 1.0  # No experience required
-            elif candidate_exp >= required_exp:
-                experience_score = 1.0  # Meets requirement
-            else:
-                experience_score = max(0.3, candidate_exp / required_exp)  # Partial credit
-            
-            # Diploma score
-            min_diploma_score = job_posting.get('minimum_diploma_score', 60.0)
-            candidate_diploma = candidate.get('diploma_score', 70.0)
-            if candidate_diploma >= min_diploma_score:
-                diploma_score = min(candidate_diploma / 100.0, 1.0)
-            else:
-                diploma_score = max(0.2, candidate_diploma / min_diploma_score)
-            
-            # Training result bonus
-            training_bonus = 0.1 if candidate.get('training_result') == 'Pass' else 0
+            matches = matches[:top_k]
+            if min_score is not None:
+                matches = [match for match in matches if match['match_score'] >= min_score]
+            return candidates.version, matches
+        
+        with span('build_matches'):
+            scores = self.score_candidates(job_posting, candidates, rows)
+            return candidates.version, [self._build_match(scores, candidates, rows, i) for i in range(len(rows))]
+    
+    def load_seekers(self, job_seekers):
+        """
+        Replace the candidate store contents, dropping cached matches and top-k trackers
+        """
+        with self._write_lock:
+            self.candidate_store.load(job_seekers)
+            self.candidate_store.set_placement_probabilities(self.placement_predictions)
+            self.top_k_trackers.clear()
+            self._tracked_postings.load([])
+            self.match_cache.clear()
+    
+    def unload_seekers(self):
+        """
+        Empty the candidate store so the next match request reloads it, dropping cached matches and top-k trackers
+        """
+        with self._write_lock:
+            self.candidate_store.unload()
+            self.top_k_trackers.clear()
+            self._tracked_postings.load([])
+            self.match_cache.clear()
+    
+    def upsert_seeker(self, job_seeker, predict_placement=True):
+        """
+        Refresh one job seeker in the candidate store, then patch the top-k trackers and match cache.
+
+        Only this seeker is rescored, once against every tracked or cached
+        posting, so a write costs O(postings) instead of a full rematch. The
+        tracked postings are kept pre-parsed in a PostingIndex and scored in
+        one vectorized pass. The seeker's placement probability is predicted
+        again under the current models and returned (None if untrained or
+        predict_placement is False, e.g. for bulk writes that predict in one
+        batch afterwards).
+        """
+        with self._write_lock:
+            old_version = self.candidate_store.version
+            self.candidate_store.upsert(job_seeker)
             
-            # Calculate weighted overall score
-            weights = {
-                'skills': 0.35,
-                'location': 0.20,
-                'salary': 0.15,
-                'experience': 0.15,
-                'diploma': 0.15
-            }
+            seeker_id = int(job_seeker['id'])
+            self.placement_predictions.pop(seeker_id, None)
+            probability = self._predict_seeker_placement(job_seeker) if predict_placement else None
+            scores = None
+            if seeker_id in self.candidate_store:
+                postings = self._tracked_postings.snapshot()
+                rows = postings.live_rows()
+                match_scores = self.score_postings(
+                    seeker_terms(job_seeker, self.skill_vocabulary), postings, rows
+                )['match_score']
+                scores = {}
+                for job_id, score in zip(postings.job_ids[rows], match_scores):
+                    tracker = self.top_k_trackers[int(job_id)]
+                    scores[(tracker.job_posting['id'], tracker.job_posting.get('updated_at'))] = float(score)
+                
+                # Cached postings without a tracker, e.g. closed postings
+                job_postings = {
+                    key: job_posting for key, job_posting in self.match_cache.cached_postings().items()
+                    if key not in scores
+                }
+                if job_postings:
+                    candidates = self.candidate_store.snapshot()
+                    seeker_rows = np.array([self.candidate_store.row(seeker_id)])
+                    block_scores = self._score_block(
+                        list(job_postings.values()), candidates, self._prepare_seekers(candidates, seeker_rows)
+                    )['match_score'][:, 0]
+                    scores.update((key, float(score)) for key, score in zip(job_postings, block_scores))
             
-            overall_score = (
-                skill_score * weights['skills'] +
-                location_score * weights['location'] +
-                salary_score * weights['salary'] +
-                experience_score * weights['experience'] +
-                diploma_score * weights['diploma'] +
-                training_bonus
-            )
+            self._apply_seeker_change(seeker_id, scores, old_version)
+            return probability
+    
+    def _predict_seeker_placement(self, job_seeker):
+        # Called under the write lock, after the seeker's store row is refreshed
+        import pandas as pd
+        
+        seeker_id = int(job_seeker['id'])
+        models = self.models
+        if not models.is_trained:
+            return None
+        try:
+            probability = float(self.predict_placement(pd.DataFrame([job_seeker]), models)[0])
+        except ValueError as e:
+            print(f"Error predicting placement for job seeker {seeker_id}: {e}")
+            return None
+        self.placement_predictions[seeker_id] = probability
+        self.candidate_store.set_placement_probabilities({seeker_id: probability})
+        return probability
+    
+    def remove_seeker(self, job_seeker_id):
+        """
+        Drop a job seeker from the candidate store, then patch the top-k trackers and match cache
+        """
+        with self._write_lock:
+            old_version = self.candidate_store.version
+            self.candidate_store.remove(job_seeker_id)
+            self.placement_predictions.pop(job_seeker_id, None)
+            self._apply_seeker_change(job_seeker_id, None, old_version)
+    
+    def _apply_seeker_change(self, seeker_id, scores, old_version):
+        new_version = self.candidate_store.version
+        for job_id, tracker in list(self.top_k_trackers.items()):
+            if tracker.pool_version != old_version:
+                del self.top_k_trackers[job_id]
+                self._tracked_postings.remove(job_id)
+                continue
+            score = None if scores is None else scores[(job_id, tracker.job_posting.get('updated_at'))]
+            tracker.apply(seeker_id, score)
+            tracker.pool_version = new_version
+        self.match_cache.apply_seeker_change(seeker_id, scores, old_version, new_version)
+    
+    def upsert_posting(self, job_posting):
+        """
+        Refresh one job posting in the posting index and drop its top-k tracker and cached matches
+        """
+        self.posting_index.upsert(job_posting)
+        with self._write_lock:
+            self.top_k_trackers.pop(job_posting['id'], None)
+            self._tracked_postings.remove(job_posting['id'])
+        self.match_cache.invalidate_job(job_posting['id'])
+    
+    def remove_posting(self, job_posting_id):
+        """
+        Drop a job posting from the posting index, with its top-k tracker and cached matches
+        """
+        self.posting_index.remove(job_posting_id)
+        with self._write_lock:
+            self.top_k_trackers.pop(job_posting_id, None)
+            self._tracked_postings.remove(job_posting_id)
+        self.match_cache.invalidate_job(job_posting_id)
+    
+    def match_jobs_batch(self, job_postings, top_k=10, block_cells=BATCH_BLOCK_CELLS):
+        """
+        Rank the candidate store for many job postings in one pass.
+
+        The live rows and their skill matrix are prepared once and shared by
+        every posting. Postings are scored in blocks of a jobs x seekers score
+        matrix of about block_cells entries. Returns {job_id: matches} with the
+        same matches match_job would return for each posting.
+        """
+        candidates = self.candidate_store.snapshot()
+        rows = candidates.live_rows()
+        results = {job_posting['id']: [] for job_posting in job_postings}
+        if not len(rows) or (top_k is not None and top_k <= 0):
+            return results
+        
+        seekers = self._prepare_seekers(candidates, rows)
+        
+        block_size = max(1, block_cells // len(rows))
+        for start in range(0, len(job_postings), block_size):
+            block = job_postings[start:start + block_size]
+            scores = self._score_block(block, candidates, seekers)
             
-            # Create match reasons
-            reasons = []
-            if skill_score > 0.7:
-                reasons.append(f"Strong skills match ({skill_score:.1%})")
-            if location_score == 1.0:
-                reasons.append("Same city location")
-            elif location_score > 0.5:
-                reasons.append("Same state location")
-            if salary_score > 0.8:
-                reasons.append("Excellent salary compatibility")
-            if candidate_diploma >= 85:
-                reasons.append("High diploma score")
-            if candidate.get('placement_status') == 'Placed':
-                reasons.append("Previously placed successfully")
+            for b, job_posting in enumerate(block):
+                top = _select_top_k(scores['match_score'][b], seekers['seeker_ids'], top_k)
+                job_scores = {key: values[b, top] for key, values in scores.items()}
+                results[job_posting['id']] = [
+                    self._build_match(job_scores, candidates, rows[top], i) for i in range(len(top))
+                ]
+        
+        return results
+    
+    def _prepare_seekers(self, candidates, rows):
+        """
+        Gather the seeker-side arrays _score_block needs for the given snapshot rows
+        """
+        return {
+            'seeker_ids': candidates.seeker_ids[rows],
+            'skill_matrix': candidates.skill_matrix_for(rows),
+            'city_codes': candidates.city_codes[rows],
+            'state_codes': candidates.state_codes[rows],
+            'salary_min': candidates.salary_min[rows],
+            'salary_max': candidates.salary_max[rows],
+            'experience_years': candidates.experience_years[rows],
+            'diploma_score': candidates.diploma_score[rows],
+            'passed_training': candidates.passed_training[rows]
+        }
+    
+    def _score_block(self, job_postings, candidates, seekers):
+        """
+        Score a block of job postings against prepared seeker arrays as (jobs x seekers) arrays.
+
+        Postings tend to repeat the same salary bands, cities and skill lists,
+        so every component is computed once per distinct posting value and
+        gathered into the block rows.
+        """
+        def shared(keys, compute):
+            distinct = {}
+            inverse = np.array([distinct.setdefault(key, len(distinct)) for key in keys], dtype=np.int64)
+            return compute(list(distinct))[inverse]
+        
+        def column(values):
+            return np.array(values, dtype=float)[:, None]
+        
+        def nan_key(value):
+            return None if np.isnan(value) else value
+        
+        vocabulary = self.skill_vocabulary
+        terms = [posting_terms(job_posting) for job_posting in job_postings]
+        
+        def skill_rows(skill_lists):
+            # One sparse product for every distinct skill in the block
+            skills = sorted({skill for lists in skill_lists for terms in lists for skill in terms})
+            positions = {skill: i for i, skill in enumerate(skills)}
+            skill_matrix = seekers['skill_matrix']
+            related = vocabulary.query_relation(skills)[:skill_matrix.shape[1]].astype(np.int32)
+            hits = np.asarray(skill_matrix @ related) > 0
+            has_skills = np.diff(skill_matrix.indptr) > 0
             
-            match_data = {
-                'job_seeker_id': candidate['id'],
-                'match_score': min(overall_score, 1.0),
-                'skill_score': skill_score,
-                'location_score': location_score,
-                'salary_score': salary_score,
-                'experience_score': experience_score,
-                'diploma_score': diploma_score,
-                'reasons': reasons,
-                'candidate_data': candidate.to_dict() if hasattr(candidate, 'to_dict') else candidate.to_dict()
-            }
+            def match_fraction(terms):
+                if not terms:
+                    return np.zeros(skill_matrix.shape[0])
+                return hits[:, [positions[skill] for skill in terms]].sum(axis=1) / len(terms)
             
-            matches.append(match_data)
+            rows = []
+            for required_terms, preferred_terms in skill_lists:
+                total_scores = (match_fraction(required_terms) * 0.7) + (match_fraction(preferred_terms) * 0.3)
+                total_scores = np.where(total_scores > 1.0, 1.0, total_scores)
+                rows.append(np.where(has_skills, total_scores, 0.0))
+            return np.vstack(rows)
+        
+        skill_scores = shared(
+            [
+                (
+                    tuple(skill.lower() for skill in parse_skill_list(job_posting.get('required_skills', '[]'))),
+                    tuple(skill.lower() for skill in parse_skill_list(job_posting.get('preferred_skills', '[]')))
+                )
+                for job_posting in job_postings
+            ],
+            skill_rows
+        )
+        
+        location_scores = shared(
+            [(candidates.city_code(job['city']), candidates.state_code(job['state'])) for job in job_postings],
+            lambda keys: _location_scores(
+                seekers['city_codes'][None, :] == column([city for city, _ in keys]),
+                seekers['state_codes'][None, :] == column([state for _, state in keys])
+            )
+        )
+        
+        salary_scores = shared(
+            [(nan_key(t['salary_min']), nan_key(t['salary_max'])) for t in terms],
+            lambda keys: _salary_scores(
+                seekers['salary_min'][None, :], seekers['salary_max'][None, :],
+                column([np.nan if low is None else low for low, _ in keys]),
+                column([np.nan if high is None else high for _, high in keys])
+            )
+        )
+        
+        experience_scores = shared(
+            [t['experience_required'] for t in terms],
+            lambda keys: _experience_scores(seekers['experience_years'][None, :], column(keys))
+        )
+        
+        diploma_scores = shared(
+            [t['minimum_diploma_score'] for t in terms],
+            lambda keys: _diploma_scores(seekers['diploma_score'][None, :], column(keys))
+        )
+        
+        training_bonus = np.where(seekers['passed_training'], TRAINING_PASS_BONUS, 0.0)[None, :]
+        
+        overall_scores = (
+            skill_scores * MATCH_WEIGHTS['skills'] +
+            location_scores * MATCH_WEIGHTS['location'] +
+            salary_scores * MATCH_WEIGHTS['salary'] +
+            experience_scores * MATCH_WEIGHTS['experience'] +
+            diploma_scores * MATCH_WEIGHTS['diploma'] +
+            training_bonus
+        )
+        
+        return {
+            'match_score': np.where(overall_scores > 1.0, 1.0, overall_scores),
+            'skill_score': skill_scores,
+            'location_score': location_scores,
+            'salary_score': salary_scores,
+            'experience_score': experience_scores,
+            'diploma_score': diploma_scores
+        }
+    
+    def score_postings(self, seeker, postings, rows):
+        """
+        Score the rows of a PostingSnapshot for one job seeker's seeker_terms.
+
+        The mirror image of score_candidates: the seeker's values are scalars
+        and the posting values are arrays, so the component scores are the
+        same ones match_job gives this seeker for each posting.
+        """
+        related_mask = self.skill_vocabulary.relation[np.array(seeker['skill_ids'], dtype=np.int64)].any(axis=0)
+        
+        skill_scores = (postings.required_fractions(related_mask, rows) * 0.7) + (postings.preferred_fractions(related_mask, rows) * 0.3)
+        skill_scores = np.where(skill_scores > 1.0, 1.0, skill_scores)
+        skill_scores = skill_scores if seeker['skill_ids'] else np.zeros(len(rows))
+        
+        location_scores = _location_scores(
+            postings.city_codes[rows] == postings.city_code(seeker['city']),
+            postings.state_codes[rows] == postings.state_code(seeker['state'])
+        )
+        salary_scores = _salary_scores(
+            seeker['salary_min'], seeker['salary_max'], postings.salary_min[rows], postings.salary_max[rows]
+        )
+        experience_scores = _experience_scores(seeker['experience_years'], postings.experience_required[rows])
+        diploma_scores = _diploma_scores(seeker['diploma_score'], postings.minimum_diploma_score[rows])
+        training_bonus = TRAINING_PASS_BONUS if seeker['passed_training'] else 0.0
+        
+        overall_scores = (
+            skill_scores * MATCH_WEIGHTS['skills'] +
+            location_scores * MATCH_WEIGHTS['location'] +
+            salary_scores * MATCH_WEIGHTS['salary'] +
+            experience_scores * MATCH_WEIGHTS['experience'] +
+            diploma_scores * MATCH_WEIGHTS['diploma'] +
+            training_bonus
+        )
+        
+        return {
+            'match_score': np.where(overall_scores > 1.0, 1.0, overall_scores),
+            'skill_score': skill_scores,
+            'location_score': location_scores,
+            'salary_score': salary_scores,
+            'experience_score': experience_scores,
+            'diploma_score': diploma_scores
+        }
+    
+    def match_seeker(self, job_seeker, top_k=10, min_score=None):
+        """
+        Rank the open job postings in the posting index for a job seeker dict.
+
+        Ties on match_score are broken by job posting ID.
+        """
+        if top_k is not None and top_k <= 0:
+            return []
+        
+        seeker = seeker_terms(job_seeker, self.skill_vocabulary)
+        postings = self.posting_index.snapshot()
+        rows = postings.live_rows()
+        scores = self.score_postings(seeker, postings, rows)
+        
+        if min_score is not None:
+            keep = scores['match_score'] >= min_score
+            rows = rows[keep]
+            scores = {key: values[keep] for key, values in scores.items()}
         
-        # Sort by match score and return top k
-        matches.sort(key=lambda x: x['match_score'], reverse=True)
-        return matches[:top_k]
+        top = _select_top_k(scores['match_score'], postings.job_ids[rows], top_k)
+        
+        matches = []
+        for i in top:
+            match = {'job_posting_id': int(postings.job_ids[rows[i]])}
+            match.update({key: float(values[i]) for key, values in scores.items()})
+            match['reason_codes'] = reason_codes(match, seeker['diploma_score'], seeker['placed'])
+            matches.append(match)
+        return matches
+    
+    def match_candidates_to_job(self, job_posting, job_seekers_df, top_k=10):
+        """
+        Find the best matching candidates for a specific job posting.
+
+        Matches carry seeker IDs and scores only; callers load the candidate
+        records they need for the final top_k. Ranking uses the rule-based
+        match scores, so it never waits on training.
+        """
+        candidates = CandidateStore(self.skill_vocabulary)
+        candidates.load_frame(job_seekers_df)
+        
+        return self.rank_candidates(job_posting, candidates.snapshot(), top_k)
     
     def save_models(self, model_dir):
         """
-        Save trained models to disk
+        Save trained models to disk as a versioned artifact under model_dir.
+
+        Numeric state (scaler statistics, forest nodes, the retrieval
+        matrix) is stored as .npy arrays and the label encoders as code
+        tables, so load_models can memory-map instead of unpickling; see
+        src.model_artifacts. Returns the artifact directory.
         """
-        if not os.path.exists(model_dir):
-            os.makedirs(model_dir)
+        models = self.models
+        if not models.is_trained:
+            print("No trained models to save")
+            return None
+        if models.training_seeker_ids is None or models.retrieval_matrix is None:
+            # Pickled models from before the retrieval stage cannot be written as an artifact
+            print("Cannot save models without retrieval state (training_seeker_ids); retrain them with train_models")
+            return None
         
-        if self.is_trained:
-            joblib.dump(self.knn_model, os.path.join(model_dir, 'knn_model.pkl'))
-            joblib.dump(self.scaler, os.path.join(model_dir, 'scaler.pkl'))
-            joblib.dump(self.label_encoders, os.path.join(model_dir, 'label_encoders.pkl'))
-            joblib.dump(self.rf_classifier, os.path.join(model_dir, 'rf_classifier.pkl'))
+        scaler = ArrayScaler.from_scaler(models.scaler, len(models.training_seeker_ids))
+        arrays = {
+            'scaler_mean': scaler.mean_,
+            'scaler_scale': scaler.scale_,
+            'scaler_var': scaler.var_,
+            'training_seeker_ids': models.training_seeker_ids,
+            'retrieval_matrix': models.retrieval_matrix
+        }
+        arrays.update(forest_arrays(models.rf_classifier))
+        # State for incremental updates
+        if models.retrieval_norms is not None:
+            arrays['retrieval_norms'] = models.retrieval_norms
+        if models.baseline is not None:
+            arrays['baseline_mean'] = models.baseline['mean']
+            arrays['baseline_scale'] = models.baseline['scale']
+        
+        code_tables = {
+            'feature_columns': list(models.feature_columns),
+            'label_encoders': {col: [str(label) for label in encoder.classes_]
+                               for col, encoder in models.label_encoders.items()},
+            'rf_classes': models.rf_classifier.classes_.tolist(),
+            'skill_vocabulary': list(self.skill_vocabulary.terms)
+        }
+        metadata = {
+            'model_id': models.model_id,
+            'training_date': datetime.now().isoformat(),
+            'knn': {'n_neighbors': models.knn_model.n_neighbors, 'metric': models.knn_model.metric},
+            'scaler_samples_seen': scaler.n_samples_seen_
+        }
+        if models.baseline is not None:
+            metadata['baseline'] = {'count': models.baseline['count'], 'trained_at': models.baseline['trained_at']}
+        
+        artifact_path = write_artifact(model_dir, models.model_id, arrays, code_tables, metadata)
+        print(f"Models saved to {artifact_path}")
+        return artifact_path
+    
+    def load_models(self, model_dir, verify=False):
+        """
+        Load trained models from disk.
+
+        model_dir is an artifact directory or an artifact root, whose LATEST
+        file names the artifact to load; directories of joblib pickles from
+        before the artifact format still load. Arrays stay memory-mapped,
+        so processes loading the same artifact share its pages. verify
+        checks every file against its manifest checksum first.
+        """
+        models = self.read_models(model_dir, verify)
+        if models is None:
+            return False
+        self._publish_models(models)
+        return True
+    
+    def read_models(self, model_dir, verify=False):
+        """
+        Read persisted models (see load_models) into a ModelSnapshot without publishing it; None if they cannot be read
+        """
+        from sklearn.neighbors import NearestNeighbors
+        from sklearn.preprocessing import LabelEncoder
+        
+        try:
+            artifact_path = resolve_artifact(model_dir)
+            if artifact_path is None:
+                return self._read_legacy_models(model_dir)
+            artifact = ModelArtifact(artifact_path, verify=verify)
+            code_tables = artifact.code_tables
             
-            # Save metadata
-            metadata = {
-                'feature_columns': self.feature_columns,
-                'is_trained': self.is_trained,
-                'training_date': datetime.now().isoformat()
-            }
+            label_encoders = {}
+            for col, classes in code_tables['label_encoders'].items():
+                label_encoders[col] = LabelEncoder()
+                label_encoders[col].classes_ = np.array(classes, dtype=object)
             
-            with open(os.path.join(model_dir, 'metadata.json'), 'w') as f:
-                json.dump(metadata, f, indent=2)
+            # The KNN index is rebuilt over the mapped retrieval matrix; cosine neighbours do not depend on row length
+            retrieval_matrix = artifact.array('retrieval_matrix')
+            knn_model = NearestNeighbors(**artifact.metadata['knn']).fit(retrieval_matrix)
             
-            print(f"Models saved to {model_dir}")
-        else:
-            print("No trained models to save")
+            # Artifacts written before incremental updates lack their state; such models need a full refit to update
+            baseline = None
+            if artifact.has_array('baseline_mean') and 'baseline' in artifact.metadata:
+                baseline = dict(artifact.metadata['baseline'], mean=artifact.array('baseline_mean'),
+                                scale=artifact.array('baseline_scale'))
+            
+            models = ModelSnapshot(
+                knn_model=knn_model,
+                scaler=ArrayScaler(
+                    artifact.array('scaler_mean'), artifact.array('scaler_scale'),
+                    artifact.array('scaler_var') if artifact.has_array('scaler_var') else None,
+                    artifact.metadata.get('scaler_samples_seen')
+                ),
+                label_encoders=label_encoders,
+                rf_classifier=ForestArrays({name: artifact.array(name) for name in FOREST_ARRAYS},
+                                           code_tables['rf_classes']),
+                feature_columns=code_tables['feature_columns'],
+                training_seeker_ids=artifact.array('training_seeker_ids'),
+                retrieval_matrix=retrieval_matrix,
+                retrieval_norms=artifact.array('retrieval_norms') if artifact.has_array('retrieval_norms') else None,
+                baseline=baseline,
+                model_id=artifact.metadata['model_id']
+            )
+            self.skill_vocabulary.intern_many(code_tables['skill_vocabulary'])
+            
+            print(f"Models loaded from {artifact_path}")
+            return models
+        except Exception as e:
+            print(f"Error loading models: {e}")
+            return None
+    
+    def load_latest_models(self, model_dir):
+        """
+        Load the latest persisted models and warm them up, for startup.
+
+        Does nothing if models were trained or adopted meanwhile. Returns
+        whether models were loaded; until they are, matching ranks by the
+        rule-based scores alone, without retrieval or placement signals.
+        """
+        if self.is_trained:
+            return False
+        if resolve_artifact(model_dir) is None and not os.path.exists(os.path.join(model_dir, 'metadata.json')):
+            print(f"No persisted models in {model_dir}; matching uses rule-based scores until models are trained")
+            return False
+        
+        self._model_load_status = 'loading'
+        models = self.read_models(model_dir)
+        if models is None:
+            self._model_load_status = 'failed'
+            return False
+        try:
+            self.warm_up(models)
+        except Exception as e:
+            print(f"Error warming up models: {e}")
+        
+        # Training may have published newer models while these loaded
+        if self.is_trained:
+            return False
+        self._publish_models(models)
+        return True
+    
+    def warm_up(self, models=None):
+        """
+        Score a dummy posting against a dummy seeker through every matching stage.
+
+        Pays for the lazy imports and first-call setup (and pages in the
+        mapped model arrays) before the first real request does. Startup
+        warms models up before publishing them.
+        """
+        import pandas as pd
+        
+        models = models or self.models
+        start = datetime.now()
+        skills = self.skill_vocabulary.terms[:2]
+        job_posting = {
+            'id': None, 'required_skills': skills[:1], 'preferred_skills': skills[1:], 'city': '', 'state': '',
+            'salary_min': 20000, 'salary_max': 30000, 'experience_required': 0, 'minimum_diploma_score': 60.0
+        }
+        job_seeker = {
+            'id': 0, 'skills': json.dumps(skills), 'city': '', 'state': '', 'diploma_score': 70.0,
+            'experience_years': 1, 'preferred_salary_min': 18000, 'preferred_salary_max': 28000,
+            'training_result': 'Pass', 'placement_status': 'Not Placed', 'category': 'General',
+            'gender': 'Male', 'availability_status': 'available'
+        }
+        # Categories the encoders know, so the placement model accepts the seeker
+        for col, encoder in models.label_encoders.items():
+            if col in job_seeker and len(encoder.classes_):
+                job_seeker[col] = str(encoder.classes_[0])
+        
+        candidates = CandidateStore(self.skill_vocabulary)
+        candidates.load([job_seeker])
+        self.rank_candidates(job_posting, candidates.snapshot(), 1)
+        if models.is_trained:
+            query = self.project_job_posting(job_posting, models)
+            if models.retrieval_matrix is not None:
+                models.retrieval_matrix @ self._unit_rows(query)[0]
+            self.predict_placement(pd.DataFrame([job_seeker]), models)
+        print(f"Models warmed up in {(datetime.now() - start).total_seconds() * 1000:.0f} ms")
     
-    def load_models(self, model_dir):
+    def _read_legacy_models(self, model_dir):
         """
-        Load trained models from disk
+        Read models saved as joblib pickles, before the artifact format
         """
+        import joblib
+        
         try:
-            self.knn_model = joblib.load(os.path.join(model_dir, 'knn_model.pkl'))
-            self.scaler = joblib.load(os.path.join(model_dir, 'scaler.pkl'))
-            self.label_encoders = joblib.load(os.path.join(model_dir, 'label_encoders.pkl'))
-            self.rf_classifier = joblib.load(os.path.join(model_dir, 'rf_classifier.pkl'))
+            # Models saved before the retrieval stage have no KNN row ids
+            seeker_ids_path = os.path.join(model_dir, 'training_seeker_ids.pkl')
+            retrieval_path = os.path.join(model_dir, 'retrieval_matrix.pkl')
             
             # Load metadata
             with open(os.path.join(model_dir, 'metadata.json'), 'r') as f:
                 metadata = json.load(f)
+            if not metadata['is_trained']:
+                print(f"No trained models in {model_dir}")
+                return None
             
-            self.feature_columns = metadata['feature_columns']
-            self.is_trained = metadata['is_trained']
+            models = ModelSnapshot(
+                knn_model=joblib.load(os.path.join(model_dir, 'knn_model.pkl')),
+                scaler=joblib.load(os.path.join(model_dir, 'scaler.pkl')),
+                label_encoders=joblib.load(os.path.join(model_dir, 'label_encoders.pkl')),
+                rf_classifier=joblib.load(os.path.join(model_dir, 'rf_classifier.pkl')),
+                feature_columns=metadata['feature_columns'],
+                training_seeker_ids=joblib.load(seeker_ids_path) if os.path.exists(seeker_ids_path) else None,
+                retrieval_matrix=joblib.load(retrieval_path) if os.path.exists(retrieval_path) else None,
+                model_id=metadata.get('model_id', metadata.get('training_date'))
+            )
+            self.skill_vocabulary.intern_many(metadata.get('skill_vocabulary', []))
             
             print(f"Models loaded from {model_dir}")
-            return True
+            return models
         except Exception as e:
             print(f"Error loading models: {e}")
-            return False
+            return None
 
 # Global ML engine instance
 ml_engine = JobMatchingEngine()
 
+def preload_ml_stack():
+    """
+    Import the ML libraries ahead of the first match or training run.
+
+    Call it from a server's pre-fork hook (or set PRELOAD_ML_STACK=1 for
+    src.main) so forked workers share the loaded modules instead of each
+    paying the import on its first request.
+    """
+    import pandas
+    import joblib
+    import scipy.sparse
+    import sklearn.ensemble
+    import sklearn.neighbors
+    import sklearn.preprocessing
+
 def initialize_ml_engine(job_seekers_data):
     """
     Initialize and train the ML engine with job seekers data
     """
     global ml_engine
+    import pandas as pd
     
     if isinstance(job_seekers_data, list):
         df = pd.DataFrame(job_seekers_data)
@@ -423,11 +1851,148 @@ def initialize_ml_engine(job_seekers_data):
     success = ml_engine.train_models(df)
     return success
 
+def load_persisted_models(model_dir=MODEL_DIR):
+    """
+    Load and warm up the latest persisted models at startup; returns whether models were loaded
+    """
+    global ml_engine
+    return ml_engine.load_latest_models(model_dir)
+
+def load_job_seekers(job_seekers_data):
+    """
+    Load the candidate store with the current job seekers
+    """
+    global ml_engine
+    ml_engine.load_seekers(job_seekers_data)
+
+def sync_job_seeker(job_seeker_dict, predict_placement=True):
+    """
+    Refresh one job seeker in the candidate store and match cache after it was created or updated.
+    Returns the seeker's new placement probability, or None if there are no trained models.
+    """
+    global ml_engine
+    return ml_engine.upsert_seeker(job_seeker_dict, predict_placement)
+
+def remove_job_seeker(job_seeker_id):
+    """
+    Drop a deleted job seeker from the candidate store and match cache
+    """
+    global ml_engine
+    ml_engine.remove_seeker(job_seeker_id)
+
+def refresh_placement_predictions(job_seekers_data):
+    """
+    Predict placement for job seekers under the current models; returns {job_seeker_id: probability}
+    """
+    global ml_engine
+    return ml_engine.refresh_placement_predictions(job_seekers_data)
+
+def apply_placement_predictions(predictions, model_id):
+    """
+    Load stored placement predictions made by the given models into the candidate store
+    """
+    global ml_engine
+    return ml_engine.apply_placement_predictions(predictions, model_id)
+
+def load_job_postings(job_postings_data):
+    """
+    Load the posting index with the current job postings
+    """
+    global ml_engine
+    ml_engine.posting_index.load(job_postings_data)
+
+def sync_job_posting(job_posting_dict):
+    """
+    Refresh one job posting in the posting index and match cache after it was created or updated
+    """
+    global ml_engine
+    ml_engine.upsert_posting(job_posting_dict)
+
+def remove_job_posting(job_posting_id):
+    """
+    Drop a deleted job posting from the posting index and match cache
+    """
+    global ml_engine
+    ml_engine.remove_posting(job_posting_id)
+
+def match_job_seeker(job_seeker_dict, top_k=10, min_score=None):
+    """
+    Get top matching open job postings for a job seeker from the posting index
+    """
+    global ml_engine
+    return ml_engine.match_seeker(job_seeker_dict, top_k, min_score)
+
+def invalidate_job_matches(job_posting_id):
+    """
+    Drop the cached matches of a job posting so the next request rescores it
+    """
+    global ml_engine
+    ml_engine.match_cache.invalidate_job(job_posting_id)
+
+def get_match_cache_stats():
+    """
+    Get the match cache counters
+    """
+    global ml_engine
+    return ml_engine.match_cache.stats()
+
+def configure_parallel_scoring(workers, min_candidates=PARALLEL_MIN_CANDIDATES):
+    """
+    Replace the process's scorer with workers processes for pools of min_candidates rows; 0 or 1 turns it off
+    """
+    global _parallel_scorer
+    with _parallel_scorer_lock:
+        if _parallel_scorer is not None:
+            _parallel_scorer.close()
+            _parallel_scorer = None
+        if workers and workers > 1:
+            _parallel_scorer = ShardedScorer(workers, min_candidates)
+            _parallel_scorer.start()
+
+def start_parallel_scoring():
+    """
+    Start the scoring worker processes configured by MATCH_WORKERS, once per process; see ShardedScorer.start
+    """
+    global _parallel_scorer
+    with _parallel_scorer_lock:
+        if _parallel_scorer is None and PARALLEL_WORKERS > 1:
+            _parallel_scorer = ShardedScorer(PARALLEL_WORKERS, PARALLEL_MIN_CANDIDATES)
+        if _parallel_scorer is not None:
+            _parallel_scorer.start()
+
+def iter_job_posting_matches(job_posting_dict, top_k=10, min_score=None, candidate_budget=None,
+                             placement_weight=0.0, min_placement_probability=None):
+    """
+    Get top matching candidates for a job posting in chunks, for streaming responses
+    """
+    global ml_engine
+    return ml_engine.iter_match_chunks(
+        job_posting_dict, top_k, min_score, candidate_budget, placement_weight, min_placement_probability
+    )
+
+def match_job_posting(job_posting_dict, top_k=10, min_score=None, candidate_budget=None,
+                      placement_weight=0.0, min_placement_probability=None):
+    """
+    Get top matching candidates for a job posting from the candidate store
+    """
+    global ml_engine
+    return ml_engine.match_job(
+        job_posting_dict, top_k, min_score, candidate_budget, placement_weight, min_placement_probability
+    )
+
+def match_job_postings(job_posting_dicts, top_k=10):
+    """
+    Get top matching candidates for many job postings in one pass over the candidate store
+    """
+    global ml_engine
+    return ml_engine.match_jobs_batch(job_posting_dicts, top_k)
+
 def get_job_matches(job_posting_dict, job_seekers_data, top_k=10):
     """
     Get top matching candidates for a job posting
     """
     global ml_engine
+    import pandas as pd
     
     if isinstance(job_seekers_data, list):
         df = pd.DataFrame(job_seekers_data)
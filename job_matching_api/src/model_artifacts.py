@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Versioned, memory-mappable model artifacts for the Job Matching System
+Stores numeric arrays as .npy files opened with mmap_mode, so processes loading the same artifact share its pages
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+from datetime import datetime
+
+# Layout version written to every manifest; readers refuse newer layouts
+ARTIFACT_FORMAT_VERSION = 1
+
+MANIFEST_NAME = 'manifest.json'
+CODE_TABLES_NAME = 'code_tables.json'
+
+# File in an artifact root naming the artifact directory to load
+LATEST_NAME = 'LATEST'
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _write_atomic(path, text):
+    staging = path + '.tmp'
+    with open(staging, 'w') as f:
+        f.write(text)
+    os.replace(staging, path)
+
+def write_artifact(root, name, arrays, code_tables=None, metadata=None):
+    """
+    Write the artifact directory root/name and point root/LATEST at it.
+
+    arrays maps names to numpy arrays, each saved as <name>.npy.
+    code_tables holds JSON-serializable lookup tables (e.g. label encoder
+    classes) and metadata goes into the manifest next to the size and
+    sha256 of every file. The files are written to a staging directory
+    that is renamed into place, so readers never see a partial artifact.
+    """
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, name)
+    staging = os.path.join(root, f'.{name}.tmp')
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    files = {}
+    for array_name, array in arrays.items():
+        file_name = f'{array_name}.npy'
+        array = np.ascontiguousarray(array)
+        np.save(os.path.join(staging, file_name), array, allow_pickle=False)
+        files[file_name] = {'shape': list(array.shape), 'dtype': array.dtype.str}
+
+    with open(os.path.join(staging, CODE_TABLES_NAME), 'w') as f:
+        json.dump(code_tables or {}, f)
+    files[CODE_TABLES_NAME] = {}
+
+    for file_name, entry in files.items():
+        file_path = os.path.join(staging, file_name)
+        entry['size'] = os.path.getsize(file_path)
+        entry['sha256'] = _sha256(file_path)
+
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'name': name,
+        'created_at': datetime.utcnow().isoformat(),
+        'metadata': metadata or {},
+        'files': files
+    }
+    with open(os.path.join(staging, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.rename(staging, path)
+    _write_atomic(os.path.join(root, LATEST_NAME), name)
+    return path
+
+def resolve_artifact(path):
+    """
+    The artifact directory at path, following root/LATEST if path is an artifact root; None if there is none
+    """
+    if os.path.exists(os.path.join(path, MANIFEST_NAME)):
+        return path
+    latest = os.path.join(path, LATEST_NAME)
+    if os.path.exists(latest):
+        with open(latest) as f:
+            return os.path.join(path, f.read().strip())
+    return None
+
+class ModelArtifact:
+    """
+    Read side of an artifact directory.
+
+    Opening checks the layout version and that every file has the size the
+    manifest records; verify() also compares checksums, which reads every
+    byte. Arrays are memory-mapped read-only on first access.
+    """
+
+    def __init__(self, path, verify=False):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+        if manifest['format_version'] > ARTIFACT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported artifact format version {manifest['format_version']}")
+
+        self.name = manifest['name']
+        self.created_at = manifest['created_at']
+        self.metadata = manifest['metadata']
+        self.files = manifest['files']
+        for file_name, entry in self.files.items():
+            if os.path.getsize(os.path.join(path, file_name)) != entry['size']:
+                raise ValueError(f"Artifact file {file_name} does not match the manifest size")
+        if verify:
+            self.verify()
+
+        with open(os.path.join(path, CODE_TABLES_NAME)) as f:
+            self.code_tables = json.load(f)
+        self._arrays = {}
+
+    def verify(self):
+        """
+        Compare every file against its manifest checksum
+        """
+        for file_name, entry in self.files.items():
+            if _sha256(os.path.join(self.path, file_name)) != entry['sha256']:
+                raise ValueError(f"Artifact file {file_name} does not match the manifest checksum")
+
+    def has_array(self, name):
+        return f'{name}.npy' in self.files
+
+    def array(self, name):
+        """
+        A stored array, memory-mapped read-only
+        """
+        if name not in self._arrays:
+            file_name = f'{name}.npy'
+            # Zero-length arrays cannot be mapped
+            mmap_mode = 'r' if np.prod(self.files[file_name]['shape']) else None
+            self._arrays[name] = np.load(os.path.join(self.path, file_name), mmap_mode=mmap_mode, allow_pickle=False)
+        return self._arrays[name]
+
+class ArrayScaler:
+    """
+    StandardScaler.transform over stored mean_ and scale_ arrays.
+
+    With var_ and n_samples_seen_ as well, updated() folds new rows into
+    the statistics like StandardScaler.partial_fit, returning a new scaler.
+    """
+
+    def __init__(self, mean, scale, var=None, n_samples_seen=None):
+        self.mean_ = mean
+        self.scale_ = scale
+        self.var_ = var
+        self.n_samples_seen_ = n_samples_seen
+
+    @classmethod
+    def from_scaler(cls, scaler, n_samples_seen=None):
+        """
+        An ArrayScaler with the statistics of a fitted StandardScaler or ArrayScaler.
+
+        Scalers without a variance (older artifacts) take scale_ squared;
+        n_samples_seen is used when the scaler does not record its count.
+        """
+        var = getattr(scaler, 'var_', None)
+        if var is None:
+            var = np.square(scaler.scale_)
+        seen = getattr(scaler, 'n_samples_seen_', None)
+        return cls(np.asarray(scaler.mean_, dtype=float), np.asarray(scaler.scale_, dtype=float),
+                   np.asarray(var, dtype=float), int(n_samples_seen if seen is None else seen))
+
+    def transform(self, X):
+        X = np.array(X, dtype=float)
+        X -= self.mean_
+        X /= self.scale_
+        return X
+
+    def updated(self, X):
+        """
+        A scaler whose statistics also cover the rows of X, combined with the pairwise mean/variance update
+        """
+        X = np.asarray(X, dtype=float)
+        if not len(X):
+            return self
+        n_old, n_new = self.n_samples_seen_, len(X)
+        n = n_old + n_new
+        delta = X.mean(axis=0) - self.mean_
+        mean = self.mean_ + delta * n_new / n
+        var = (self.var_ * n_old + X.var(axis=0) * n_new + np.square(delta) * n_old * n_new / n) / n
+        # Constant features keep unit scale, as in StandardScaler
+        scale = np.sqrt(var)
+        scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0
+        return ArrayScaler(mean, scale, var, n)
+
+# Arrays making up a flattened forest
+FOREST_ARRAYS = (
+    'forest_tree_offsets', 'forest_children_left', 'forest_children_right',
+    'forest_feature', 'forest_threshold', 'forest_leaf_proba'
+)
+
+def forest_arrays(forest):
+    """
+    Node arrays of a fitted scikit-learn forest classifier, with the trees concatenated, for ForestArrays
+    """
+    if isinstance(forest, ForestArrays):
+        return forest.arrays()
+    trees = [estimator.tree_ for estimator in forest.estimators_]
+    # Leaf class fractions, normalized like DecisionTreeClassifier.predict_proba
+    value = np.concatenate([tree.value[:, 0, :] for tree in trees])
+    normalizer = value.sum(axis=1, keepdims=True)
+    normalizer[normalizer == 0.0] = 1.0
+    return {
+        'forest_tree_offsets': np.cumsum([0] + [tree.node_count for tree in trees]).astype(np.int64),
+        'forest_children_left': np.concatenate([tree.children_left for tree in trees]),
+        'forest_children_right': np.concatenate([tree.children_right for tree in trees]),
+        'forest_feature': np.concatenate([tree.feature for tree in trees]),
+        'forest_threshold': np.concatenate([tree.threshold for tree in trees]),
+        'forest_leaf_proba': value / normalizer
+    }
+
+class ForestArrays:
+    """
+    Random forest classifier evaluated directly over its node arrays.
+
+    Gives the predict_proba of the scikit-learn forest the arrays came from
+    (see forest_arrays) without unpickling any tree objects, so the arrays
+    can stay memory-mapped. Each tree is walked level by level for all
+    rows at once.
+    """
+
+    def __init__(self, arrays, classes):
+        self.tree_offsets = arrays['forest_tree_offsets']
+        self.children_left = arrays['forest_children_left']
+        self.children_right = arrays['forest_children_right']
+        self.feature = arrays['forest_feature']
+        self.threshold = arrays['forest_threshold']
+        self.leaf_proba = arrays['forest_leaf_proba']
+        self.classes_ = np.asarray(classes)
+
+    def arrays(self):
+        """
+        The node arrays, in the form forest_arrays returns
+        """
+        return {
+            'forest_tree_offsets': self.tree_offsets,
+            'forest_children_left': self.children_left,
+            'forest_children_right': self.children_right,
+            'forest_feature': self.feature,
+            'forest_threshold': self.threshold,
+            'forest_leaf_proba': self.leaf_proba
+        }
+
+    @classmethod
+    def from_forest(cls, forest):
+        return forest if isinstance(forest, ForestArrays) else cls(forest_arrays(forest), forest.classes_)
+
+    @property
+    def n_estimators(self):
+        return len(self.tree_offsets) - 1
+
+    def rescaled(self, old_mean, old_scale, new_mean, new_scale):
+        """
+        The same trees over features standardized with new_mean and new_scale instead of old_mean and old_scale.
+
+        Standardizing is increasing per feature, so mapping each split
+        threshold back to raw units and forward again keeps every split,
+        up to floating point rounding at the threshold itself.
+        """
+        internal = self.children_left != -1
+        features = self.feature[internal]
+        threshold = np.array(self.threshold, dtype=float)
+        raw = threshold[internal] * old_scale[features] + old_mean[features]
+        threshold[internal] = (raw - new_mean[features]) / new_scale[features]
+        arrays = self.arrays()
+        arrays['forest_threshold'] = threshold
+        return ForestArrays(arrays, self.classes_)
+
+    def extended(self, other):
+        """
+        A forest with the trees of both forests, over the union of their classes
+        """
+        other = ForestArrays.from_forest(other)
+        classes = np.union1d(self.classes_, other.classes_)
+
+        def leaf_proba(forest):
+            proba = np.zeros((len(forest.leaf_proba), len(classes)))
+            proba[:, np.searchsorted(classes, forest.classes_)] = forest.leaf_proba
+            return proba
+
+        return ForestArrays({
+            'forest_tree_offsets': np.concatenate([self.tree_offsets, other.tree_offsets[1:] + self.tree_offsets[-1]]),
+            'forest_children_left': np.concatenate([self.children_left, other.children_left]),
+            'forest_children_right': np.concatenate([self.children_right, other.children_right]),
+            'forest_feature': np.concatenate([self.feature, other.feature]),
+            'forest_threshold': np.concatenate([self.threshold, other.threshold]),
+            'forest_leaf_proba': np.concatenate([leaf_proba(self), leaf_proba(other)])
+        }, classes)
+
+    def predict_proba(self, X):
+        # Trees compare float32 features, as in scikit-learn
+        X = np.asarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_starts = np.arange(n_rows) * n_features
+
+        proba = np.zeros((n_rows, self.leaf_proba.shape[1]))
+        for start in self.tree_offsets[:-1]:
+            nodes = np.full(n_rows, start, dtype=np.int64)
+            pending = np.arange(n_rows)
+            while len(pending):
+                current = nodes[pending]
+                left = self.children_left[current]
+                internal = left != -1
+                if not internal.all():
+                    pending, current, left = pending[internal], current[internal], left[internal]
+                go_left = flat_X[row_starts[pending] + self.feature[current]] <= self.threshold[current]
+                nodes[pending] = start + np.where(go_left, left, self.children_right[current])
+            proba += self.leaf_proba[nodes]
+        proba /= self.n_estimators
+        return proba
+    
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
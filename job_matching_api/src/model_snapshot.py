@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Immutable model snapshots for the Job Matching System
+Training and loading build a complete snapshot off to the side; the engine publishes it by swapping one reference
+"""
+
+from types import MappingProxyType
+
+class ModelSnapshot:
+    """
+    One consistent set of trained models.
+
+    Attributes cannot be reassigned once the snapshot is built, and
+    feature_columns and label_encoders are read-only views, so a reader
+    holding a snapshot sees the same scaler, encoders and feature columns
+    for as long as it keeps it. The fitted objects themselves are shared,
+    not copied, and must not be refitted after publishing.
+    """
+
+    __slots__ = (
+        'knn_model', 'scaler', 'label_encoders', 'rf_classifier', 'feature_columns',
+        'training_seeker_ids', 'retrieval_matrix', 'retrieval_norms', 'baseline', 'model_id', 'version'
+    )
+
+    def __init__(self, knn_model=None, scaler=None, label_encoders=None, rf_classifier=None, feature_columns=(),
+                 training_seeker_ids=None, retrieval_matrix=None, retrieval_norms=None, baseline=None,
+                 model_id=None, version=0):
+        values = {
+            'knn_model': knn_model,
+            'scaler': scaler,
+            'label_encoders': MappingProxyType(dict(label_encoders or {})),
+            'rf_classifier': rf_classifier,
+            'feature_columns': tuple(feature_columns),
+            'training_seeker_ids': training_seeker_ids,
+            'retrieval_matrix': retrieval_matrix,
+            'retrieval_norms': retrieval_norms,  # length of each scaled row before normalizing
+            'baseline': None if baseline is None else MappingProxyType(dict(baseline)),  # last full refit
+            'model_id': model_id,  # persistent identity of the models, tags stored predictions
+            'version': version  # engine-local publish counter, part of match cache keys
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('ModelSnapshot is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('ModelSnapshot is immutable')
+
+    def __repr__(self):
+        return f'<ModelSnapshot {self.model_id} v{self.version}>'
+
+    @property
+    def is_trained(self):
+        return self.rf_classifier is not None
+
+    def published(self, version):
+        """
+        A copy of the snapshot carrying the given publish version
+        """
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values['version'] = version
+        return ModelSnapshot(**values)
+
+# Snapshot of an engine with no models
+NO_MODELS = ModelSnapshot()
@@ -1,9 +1,8 @@
-from flask_sqlalchemy import SQLAlchemy
+from src.models.user import db
 from datetime import datetime
+from src.match_reasons import pack_reason_codes, unpack_reasons
 import json
 
-db = SQLAlchemy()
-
 class JobMatch(db.Model):
     __tablename__ = 'job_matches'
     
@@ -11,7 +10,7 @@ class JobMatch(db.Model):
     job_posting_id = db.Column(db.Integer, db.ForeignKey('job_postings.id'), nullable=False)
     job_seeker_id = db.Column(db.Integer, db.ForeignKey('job_seekers.id'), nullable=False)
     match_score = db.Column(db.Float, nullable=False)  # 0.0 to 1.0
-    match_reasons = db.Column(db.Text)  # JSON array explaining match factors
+    match_reasons = db.Column(db.Text)  # packed reason codes (older rows: JSON array of reason text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Unique constraint to prevent duplicate matches
@@ -21,11 +20,12 @@ class JobMatch(db.Model):
         return f'<JobMatch {self.job_posting_id}-{self.job_seeker_id}: {self.match_score}>'
 
     def get_match_reasons_list(self):
-        """Parse match reasons JSON string to list"""
-        try:
-            return json.loads(self.match_reasons) if self.match_reasons else []
-        except:
-            return []
+        """Render the stored match reasons as a list of text"""
+        return unpack_reasons(self.match_reasons)
+
+    def set_match_reason_codes(self, codes):
+        """Store match reasons as packed reason codes, rendered to text on read"""
+        self.match_reasons = pack_reason_codes(codes)
 
     def set_match_reasons_list(self, reasons_list):
         """Set match reasons from list to JSON string"""
@@ -1,9 +1,7 @@
-from flask_sqlalchemy import SQLAlchemy
+from src.models.user import db
 from datetime import datetime
 import json
 
-db = SQLAlchemy()
-
 class JobPosting(db.Model):
     __tablename__ = 'job_postings'
     
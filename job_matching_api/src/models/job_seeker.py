@@ -1,9 +1,7 @@
-from flask_sqlalchemy import SQLAlchemy
+from src.models.user import db
 from datetime import datetime
 import json
 
-db = SQLAlchemy()
-
 class JobSeeker(db.Model):
     __tablename__ = 'job_seekers'
     
@@ -27,6 +25,14 @@ class JobSeeker(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Fields returned by to_dict, which to_dict_fields can project
+    DICT_FIELDS = [
+        'id', 'name', 'phone_number', 'email', 'city', 'state', 'qualifications',
+        'diploma_score', 'experience_years', 'skills', 'category', 'gender',
+        'training_result', 'placement_status', 'preferred_salary_min',
+        'preferred_salary_max', 'availability_status', 'created_at', 'updated_at'
+    ]
+
     def __repr__(self):
         return f'<JobSeeker {self.name}>'
 
@@ -64,6 +70,19 @@ class JobSeeker(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+    def to_dict_fields(self, fields):
+        """Return only the given to_dict fields"""
+        data = {}
+        for field in fields:
+            if field == 'skills':
+                data[field] = self.get_skills_list()
+            elif field in ('created_at', 'updated_at'):
+                value = getattr(self, field)
+                data[field] = value.isoformat() if value else None
+            else:
+                data[field] = getattr(self, field)
+        return data
+
     def to_dict_summary(self):
         """Return summary dict for listing purposes"""
         return {
@@ -0,0 +1,44 @@
+from src.models.user import db
+from datetime import datetime
+
+class PlacementPrediction(db.Model):
+    __tablename__ = 'placement_predictions'
+
+    job_seeker_id = db.Column(db.Integer, db.ForeignKey('job_seekers.id'), primary_key=True)
+    probability = db.Column(db.Float, nullable=False)  # 0.0 to 1.0
+    model_id = db.Column(db.String(50), nullable=False, index=True)  # models that made the prediction
+    predicted_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<PlacementPrediction {self.job_seeker_id}: {self.probability}>'
+
+    @classmethod
+    def for_model(cls, model_id):
+        """Return {job_seeker_id: probability} of the predictions made by the given models"""
+        rows = db.session.query(cls.job_seeker_id, cls.probability).filter(cls.model_id == model_id).all()
+        return dict(rows)
+
+    @classmethod
+    def save_all(cls, predictions, model_id):
+        """Insert or refresh predictions from {job_seeker_id: probability}, tagged with model_id"""
+        if not predictions:
+            return
+        query = cls.query
+        if len(predictions) <= 500:
+            query = query.filter(cls.job_seeker_id.in_(list(predictions)))
+        existing = {prediction.job_seeker_id: prediction for prediction in query.all()}
+        for job_seeker_id, probability in predictions.items():
+            prediction = existing.get(job_seeker_id)
+            if prediction is None:
+                db.session.add(cls(job_seeker_id=job_seeker_id, probability=probability, model_id=model_id))
+            else:
+                prediction.probability = probability
+                prediction.model_id = model_id
+
+    def to_dict(self):
+        return {
+            'job_seeker_id': self.job_seeker_id,
+            'probability': self.probability,
+            'model_id': self.model_id,
+            'predicted_at': self.predicted_at.isoformat() if self.predicted_at else None
+        }
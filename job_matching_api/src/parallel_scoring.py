@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Multi-core scoring of large candidate pools for the Job Matching System
+Publishes the candidate store columns to shared memory and scores shards of them in a process pool
+"""
+
+import atexit
+import multiprocessing
+import numpy as np
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import resource_tracker, shared_memory
+
+# CandidateSnapshot columns published to shared memory; workers never need the alive flags
+SHARED_COLUMNS = (
+    'seeker_ids', 'diploma_score', 'experience_years', 'salary_min', 'salary_max',
+    'city_codes', 'state_codes', 'passed_training', 'skill_indptr', 'skill_indices'
+)
+
+# Worker side: shared memory blocks attached so far, by name
+_attached = {}
+
+def _attach(spec):
+    """
+    Worker side: numpy views of the columns described by a publication spec
+    """
+    columns = {}
+    for column, (name, dtype, length) in spec.items():
+        block = _attached.get(name)
+        if block is None:
+            # Workers share the parent's resource tracker, and the parent unlinks the block
+            block = shared_memory.SharedMemory(name=name)
+            _attached[name] = block
+        columns[column] = np.ndarray(length, dtype=dtype, buffer=block.buf)
+
+    # Let go of blocks from publications this spec replaced
+    names = {name for name, _, _ in spec.values()}
+    for name in [name for name in _attached if name not in names]:
+        try:
+            _attached.pop(name).close()
+        except BufferError:
+            pass
+    return columns
+
+def _score_shard(spec, job, rows, top_k, min_score):
+    """
+    Worker side: the top_k (rows, match scores) of a shard of candidate rows
+    """
+    from src.ml_engine import score_columns, _select_top_k
+
+    columns = _attach(spec)
+    scores = score_columns(columns, rows, job)
+    if min_score is not None:
+        keep = scores >= min_score
+        rows, scores = rows[keep], scores[keep]
+    top = _select_top_k(scores, columns['seeker_ids'][rows], top_k)
+    return rows[top], scores[top]
+
+def _ready():
+    """
+    Worker side: no-op run once per worker to start the pool
+    """
+    return None
+
+class _Publication:
+    """
+    Shared memory copies of the scoring columns of one candidate store layout.
+
+    Within a layout, rows are only ever appended, so the blocks are
+    allocated with room to spare and a newer snapshot only copies its new
+    rows in. Workers scoring an older snapshot read a shorter prefix, which
+    never changes. refs counts the requests still scoring from the blocks.
+    """
+
+    def __init__(self, candidates):
+        self.layout = candidates.layout
+        self.rows = 0
+        self.nnz = 0
+        self.refs = 0
+        self.blocks = {}  # column -> (SharedMemory, dtype, capacity in elements)
+        row_capacity = max(64, 2 * candidates.size)
+        nnz_capacity = max(256, 2 * len(candidates.skill_indices))
+        for column in SHARED_COLUMNS:
+            capacity = {'skill_indices': nnz_capacity, 'skill_indptr': row_capacity + 1}.get(column, row_capacity)
+            dtype = getattr(candidates, column).dtype
+            block = shared_memory.SharedMemory(create=True, size=capacity * dtype.itemsize)
+            self.blocks[column] = (block, dtype, capacity)
+        self.extend(candidates)
+
+    def capacity(self, column):
+        return self.blocks[column][2]
+
+    def fits(self, candidates):
+        return (
+            candidates.layout == self.layout and
+            candidates.size <= self.capacity('seeker_ids') and
+            len(candidates.skill_indices) <= self.capacity('skill_indices')
+        )
+
+    def extend(self, candidates):
+        """
+        Copy in the rows of a snapshot that are not published yet
+        """
+        if candidates.size <= self.rows:
+            return
+        for column in SHARED_COLUMNS:
+            values = getattr(candidates, column)
+            block, dtype, _ = self.blocks[column]
+            start = self.nnz if column == 'skill_indices' else self.rows
+            np.ndarray(len(values), dtype=dtype, buffer=block.buf)[start:] = values[start:]
+        self.rows = candidates.size
+        self.nnz = len(candidates.skill_indices)
+
+    def spec(self, candidates):
+        """
+        Block names, dtypes and lengths of a snapshot's columns, which must already be published
+        """
+        return {
+            column: (block.name, dtype.str, len(getattr(candidates, column)))
+            for column, (block, dtype, _) in self.blocks.items()
+        }
+
+    def release(self):
+        for block, _, _ in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks = {}
+
+class ShardedScorer:
+    """
+    Scores candidate rows across a process pool over shared-memory copies of the candidate store.
+
+    The snapshot columns are copied into shared memory once per store
+    layout, and store writes only copy the rows they append; requests only
+    send the block names, the job's precomputed terms and each shard's rows,
+    so the pool is never pickled. Each worker returns its shard's top-k and
+    the caller merges them, which gives the same top-k as scoring every row
+    in one process. A replaced publication is unlinked once no request is
+    scoring from it.
+    """
+
+    def __init__(self, workers, min_candidates):
+        self.workers = workers
+        self.min_candidates = min_candidates
+        self._executor = None
+        self._publications = []  # _Publication objects, newest last
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def start(self):
+        """
+        Start the worker processes, if they are not running yet.
+
+        Call it at startup: while this is the only thread, workers are forked,
+        so they skip re-importing the web app. Once other threads run, forking
+        could copy a lock one of them holds, so workers come from a fork
+        server (or spawn) instead.
+        """
+        with self._lock:
+            if self._executor is not None:
+                return
+            methods = multiprocessing.get_all_start_methods()
+            if 'fork' in methods and threading.active_count() == 1:
+                method = 'fork'
+            else:
+                method = 'forkserver' if 'forkserver' in methods else 'spawn'
+            # Workers attach to blocks the parent unlinks, so they must share its resource tracker
+            resource_tracker.ensure_running()
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(method))
+            # Start every worker now rather than in the first request that needs them
+            for future in [self._executor.submit(_ready) for _ in range(self.workers)]:
+                future.result()
+
+    def _acquire(self, candidates):
+        """
+        Shared memory spec of a snapshot's columns, publishing its rows if needed, with a reference held
+        """
+        with self._lock:
+            publication = next((p for p in reversed(self._publications) if p.fits(candidates)), None)
+            if publication is None:
+                publication = _Publication(candidates)
+                self._publications.append(publication)
+            else:
+                publication.extend(candidates)
+            publication.refs += 1
+            self._release_unused()
+            return publication, publication.spec(candidates)
+
+    def _release(self, publication):
+        with self._lock:
+            publication.refs -= 1
+            self._release_unused()
+
+    def _release_unused(self):
+        # Keep the newest publication for the next request; older ones go once no request uses them
+        for publication in self._publications[:-1]:
+            if publication.refs == 0:
+                publication.release()
+        self._publications = [p for p in self._publications[:-1] if p.refs] + self._publications[-1:]
+
+    def top_rows(self, candidates, job, rows, top_k, min_score=None):
+        """
+        The top_k (rows, match scores) among the given rows of a CandidateSnapshot
+        """
+        if self._executor is None:
+            self.start()
+        publication, spec = self._acquire(candidates)
+        futures = []
+        try:
+            shards = [shard for shard in np.array_split(rows, self.workers) if len(shard)]
+            futures = [self._executor.submit(_score_shard, spec, job, shard, top_k, min_score) for shard in shards]
+            results = [future.result() for future in futures]
+        finally:
+            # Even when a shard failed, others may still be reading the blocks
+            wait(futures)
+            self._release(publication)
+
+        from src.ml_engine import _select_top_k
+        merged_rows = np.concatenate([shard_rows for shard_rows, _ in results])
+        merged_scores = np.concatenate([shard_scores for _, shard_scores in results])
+        top = _select_top_k(merged_scores, candidates.seeker_ids[merged_rows], top_k)
+        return merged_rows[top], merged_scores[top]
+
+    def close(self):
+        """
+        Shut the process pool down and unlink the shared memory blocks
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+            for publication in self._publications:
+                publication.release()
+            self._publications = []
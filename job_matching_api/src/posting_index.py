@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+In-process columnar index of open job postings
+Keeps parsed skills, locations and salary ranges as numpy arrays for ranking postings for a job seeker
+"""
+
+import numpy as np
+import threading
+from src.skill_vocabulary import parse_skill_list
+from src.candidate_store import MISSING_CODE, UNKNOWN_CODE, _grow
+
+def _to_float(value, default=np.nan):
+    """
+    Convert a nullable posting value to float
+    """
+    return float(value) if value is not None else default
+
+def posting_terms(job_posting):
+    """
+    Numeric requirements of a job posting dict, with missing values normalized
+    """
+    return {
+        'salary_min': _to_float(job_posting.get('salary_min', 15000)),
+        'salary_max': _to_float(job_posting.get('salary_max', 40000)),
+        'experience_required': _to_float(job_posting.get('experience_required', 0), 0.0),
+        'minimum_diploma_score': _to_float(job_posting.get('minimum_diploma_score', 60.0), 60.0)
+    }
+
+class PostingSnapshot:
+    """
+    Consistent, read-only view of the posting index for a single match request
+    """
+
+    def __init__(self, index, size, required_nnz, preferred_nnz):
+        self.size = size
+        self.version = index.version
+        self.job_ids = index._job_ids[:size]
+        # Tombstones copy the alive flags once a snapshot shares them; see PostingIndex._tombstone
+        self.alive = index._alive[:size]
+        index._alive_shared = True
+        self.salary_min = index._salary_min[:size]
+        self.salary_max = index._salary_max[:size]
+        self.experience_required = index._experience_required[:size]
+        self.minimum_diploma_score = index._minimum_diploma_score[:size]
+        self.city_codes = index._city_codes[:size]
+        self.state_codes = index._state_codes[:size]
+        self.required_indptr = index._required_indptr[:size + 1]
+        self.required_indices = index._required_indices[:required_nnz]
+        self.preferred_indptr = index._preferred_indptr[:size + 1]
+        self.preferred_indices = index._preferred_indices[:preferred_nnz]
+        # Copies, so codes of cities and states appended after the snapshot stay unknown to it
+        self._cities = dict(index._cities)
+        self._states = dict(index._states)
+
+    def city_code(self, city):
+        """
+        Code of a city among the snapshot's rows, compared case-insensitively
+        """
+        return self._cities.get(city.lower(), UNKNOWN_CODE) if isinstance(city, str) else UNKNOWN_CODE
+
+    def state_code(self, state):
+        """
+        Code of a state among the snapshot's rows, compared case-insensitively
+        """
+        return self._states.get(state.lower(), UNKNOWN_CODE) if isinstance(state, str) else UNKNOWN_CODE
+
+    def live_rows(self):
+        """
+        Rows of postings that are still open
+        """
+        return np.flatnonzero(self.alive)
+
+    def _fractions(self, indptr, indices, related_mask, rows):
+        lengths = np.diff(indptr)
+        owners = np.repeat(np.arange(self.size), lengths)
+        hits = np.bincount(owners, weights=related_mask[indices], minlength=self.size)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fractions = np.where(lengths > 0, hits / lengths, 0.0)
+        return fractions[rows]
+
+    def required_fractions(self, related_mask, rows):
+        """
+        Fraction of each row's required skills flagged in related_mask
+        """
+        return self._fractions(self.required_indptr, self.required_indices, related_mask, rows)
+
+    def preferred_fractions(self, related_mask, rows):
+        """
+        Fraction of each row's preferred skills flagged in related_mask
+        """
+        return self._fractions(self.preferred_indptr, self.preferred_indices, related_mask, rows)
+
+class PostingIndex:
+    """
+    Columnar index of active job postings, refreshed incrementally on writes.
+
+    Mirrors CandidateStore: rows are append-only, updates tombstone the old
+    row, and compact() drops tombstones once they make up half the index.
+    Skill lists keep their duplicates, since a posting's skill fraction is
+    taken over every listed skill.
+    """
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+        self.is_loaded = False
+        self.version = 0
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self, capacity=0):
+        self._size = 0
+        self._dead = 0
+        self._rows = {}  # job posting id -> row
+        self._job_ids = np.zeros(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._alive_shared = False  # whether a snapshot views _alive, so tombstones must copy it
+        self._salary_min = np.zeros(capacity, dtype=float)
+        self._salary_max = np.zeros(capacity, dtype=float)
+        self._experience_required = np.zeros(capacity, dtype=float)
+        self._minimum_diploma_score = np.zeros(capacity, dtype=float)
+        self._city_codes = np.zeros(capacity, dtype=np.int32)
+        self._state_codes = np.zeros(capacity, dtype=np.int32)
+        self._required_indptr = np.zeros(capacity + 1, dtype=np.int64)
+        self._required_indices = np.zeros(0, dtype=np.int64)
+        self._preferred_indptr = np.zeros(capacity + 1, dtype=np.int64)
+        self._preferred_indices = np.zeros(0, dtype=np.int64)
+        self._cities = {}  # lowercased city -> code
+        self._states = {}  # lowercased state -> code
+
+    def __len__(self):
+        return self._size - self._dead
+
+    def __contains__(self, job_id):
+        return job_id in self._rows
+
+    def city_code(self, city):
+        """
+        Code of a city, compared case-insensitively
+        """
+        return self._cities.get(city.lower(), UNKNOWN_CODE) if isinstance(city, str) else UNKNOWN_CODE
+
+    def state_code(self, state):
+        """
+        Code of a state, compared case-insensitively
+        """
+        return self._states.get(state.lower(), UNKNOWN_CODE) if isinstance(state, str) else UNKNOWN_CODE
+
+    def snapshot(self):
+        """
+        Return a PostingSnapshot of the current rows
+        """
+        with self._lock:
+            return PostingSnapshot(
+                self, self._size,
+                int(self._required_indptr[self._size]), int(self._preferred_indptr[self._size])
+            )
+
+    def load(self, job_postings):
+        """
+        Replace the index contents with a list of job posting dicts
+        """
+        with self._lock:
+            self._reset(capacity=len(job_postings))
+            for job_posting in job_postings:
+                if job_posting.get('status') == 'active':
+                    self._append(job_posting)
+            self.is_loaded = True
+            self.version += 1
+
+    def upsert(self, job_posting):
+        """
+        Insert or refresh a job posting dict; postings that are not active are removed
+        """
+        with self._lock:
+            if not self.is_loaded:
+                return  # The next full load picks the change up
+            self._tombstone(job_posting['id'])
+            if job_posting.get('status') == 'active':
+                self._append(job_posting)
+            self.version += 1
+            self._maybe_compact()
+
+    def remove(self, job_id):
+        """
+        Remove a job posting from the index
+        """
+        with self._lock:
+            if not self.is_loaded:
+                return
+            self._tombstone(job_id)
+            self.version += 1
+            self._maybe_compact()
+
+    def _tombstone(self, job_id):
+        row = self._rows.pop(job_id, None)
+        if row is not None:
+            # Copy-on-write, so snapshots taken earlier still see the row alive
+            if self._alive_shared:
+                self._alive = self._alive.copy()
+                self._alive_shared = False
+            self._alive[row] = False
+            self._dead += 1
+        return row
+
+    def _code(self, codes, value):
+        if not isinstance(value, str):
+            return MISSING_CODE
+        return codes.setdefault(value.lower(), len(codes))
+
+    def _append_skills(self, indptr_name, indices_name, row, skills):
+        indptr = getattr(self, indptr_name)
+        indices = getattr(self, indices_name)
+        skill_ids = self.vocabulary.intern_many(parse_skill_list(skills))
+        start = int(indptr[row])
+        end = start + len(skill_ids)
+        if end > len(indices):
+            indices = _grow(indices, max(256, end * 2))
+            setattr(self, indices_name, indices)
+        indices[start:end] = skill_ids
+        indptr[row + 1] = end
+
+    def _append(self, job_posting):
+        row = self._size
+        if row == len(self._job_ids):
+            self._grow_rows(max(64, row * 2))
+
+        self._append_skills('_required_indptr', '_required_indices', row, job_posting.get('required_skills', '[]'))
+        self._append_skills('_preferred_indptr', '_preferred_indices', row, job_posting.get('preferred_skills', '[]'))
+
+        terms = posting_terms(job_posting)
+        self._job_ids[row] = int(job_posting['id'])
+        self._salary_min[row] = terms['salary_min']
+        self._salary_max[row] = terms['salary_max']
+        self._experience_required[row] = terms['experience_required']
+        self._minimum_diploma_score[row] = terms['minimum_diploma_score']
+        self._city_codes[row] = self._code(self._cities, job_posting.get('city'))
+        self._state_codes[row] = self._code(self._states, job_posting.get('state'))
+        self._alive[row] = True
+
+        self._rows[int(job_posting['id'])] = row
+        self._size += 1
+        return row
+
+    def _grow_rows(self, capacity):
+        # Copy-on-grow, so snapshots taken earlier keep their own arrays
+        for name in ('_job_ids', '_alive', '_salary_min', '_salary_max', '_experience_required',
+                     '_minimum_diploma_score', '_city_codes', '_state_codes'):
+            setattr(self, name, _grow(getattr(self, name), capacity))
+        self._required_indptr = _grow(self._required_indptr, capacity + 1)
+        self._preferred_indptr = _grow(self._preferred_indptr, capacity + 1)
+        self._alive_shared = False
+
+    def _maybe_compact(self):
+        if self._dead > 64 and self._dead * 2 > self._size:
+            self.compact()
+
+    def compact(self):
+        """
+        Drop tombstoned rows, keeping the relative order of live rows
+        """
+        with self._lock:
+            live = np.flatnonzero(self._alive[:self._size])
+            size = len(live)
+            capacity = max(64, size * 2)
+
+            for indptr_name, indices_name in (('_required_indptr', '_required_indices'),
+                                              ('_preferred_indptr', '_preferred_indices')):
+                indptr = getattr(self, indptr_name)
+                indices = getattr(self, indices_name)
+                skill_rows = [indices[indptr[row]:indptr[row + 1]] for row in live]
+                compacted = np.zeros(capacity + 1, dtype=np.int64)
+                compacted[1:size + 1] = np.cumsum(indptr[live + 1] - indptr[live])
+                setattr(self, indptr_name, compacted)
+                setattr(self, indices_name,
+                        np.concatenate(skill_rows) if skill_rows else np.zeros(0, dtype=np.int64))
+
+            for name in ('_job_ids', '_alive', '_salary_min', '_salary_max', '_experience_required',
+                         '_minimum_diploma_score', '_city_codes', '_state_codes'):
+                setattr(self, name, _grow(getattr(self, name)[live], capacity))
+
+            self._rows = {int(job_id): row for row, job_id in enumerate(self._job_ids[:size])}
+            self._alive_shared = False
+            self._size = size
+            self._dead = 0
+            self.version += 1
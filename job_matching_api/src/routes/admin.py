@@ -1,14 +1,63 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from src.models.user import db, User
 from src.models.job_seeker import JobSeeker
 from src.models.job_posting import JobPosting
 from src.models.job_match import JobMatch
-from src.ml_engine import initialize_ml_engine, get_job_matches
+from src.models.placement_prediction import PlacementPrediction
+from src.training_jobs import training_jobs
+from src.match_reasons import render_reasons
+from src.timing import get_timing_histograms, reset_timing_histograms
+from src.ml_engine import (
+    ml_engine, JobMatchingEngine, MODEL_DIR, sync_job_seeker, remove_job_seeker, load_job_postings, match_job_seeker,
+    get_match_cache_stats, refresh_placement_predictions, apply_placement_predictions
+)
 import json
-import pandas as pd
 
 admin_bp = Blueprint('admin', __name__)
 
+def _ensure_posting_index():
+    """Load the ML engine's posting index from the database on first use"""
+    if not ml_engine.posting_index.is_loaded:
+        job_postings = JobPosting.query.filter_by(status='active').all()
+        load_job_postings([job.to_dict() for job in job_postings])
+    return ml_engine.posting_index
+
+def _sync_job_seekers(job_seekers):
+    """Refresh job seekers in the ML engine and store their new placement predictions"""
+    job_seeker_dicts = [job_seeker.to_dict() for job_seeker in job_seekers]
+    if len(job_seeker_dicts) == 1:
+        probability = sync_job_seeker(job_seeker_dicts[0])
+        predictions = {} if probability is None else {job_seeker_dicts[0]['id']: probability}
+    else:
+        # Predict placement for the whole batch in one classifier call
+        for job_seeker_dict in job_seeker_dicts:
+            sync_job_seeker(job_seeker_dict, predict_placement=False)
+        predictions = refresh_placement_predictions(job_seeker_dicts)
+    if predictions:
+        PlacementPrediction.save_all(predictions, ml_engine.model_id)
+        db.session.commit()
+
+def _refresh_placement_predictions(full=False):
+    """
+    Bring stored placement predictions up to the current models.
+
+    Predictions already stored for these models are reused; only seekers
+    without one are run through the classifier, unless full is set.
+    """
+    stored = {} if full else PlacementPrediction.for_model(ml_engine.model_id)
+    apply_placement_predictions(stored, ml_engine.model_id)
+    
+    job_seekers = JobSeeker.query.all()
+    stale = [seeker.to_dict() for seeker in job_seekers if seeker.id not in stored]
+    predictions = refresh_placement_predictions(stale)
+    PlacementPrediction.save_all(predictions, ml_engine.model_id)
+    db.session.commit()
+    return {
+        'model_id': ml_engine.model_id,
+        'predicted': len(predictions),
+        'reused': len(stored)
+    }
+
 @admin_bp.route('/job-seekers', methods=['GET'])
 def get_job_seekers():
     """Get all job seekers with pagination and filtering"""
@@ -87,6 +136,7 @@ def create_job_seeker():
         
         db.session.add(job_seeker)
         db.session.commit()
+        _sync_job_seekers([job_seeker])
         
         return jsonify({
             'message': 'Job seeker created successfully',
@@ -130,6 +180,7 @@ def update_job_seeker(seeker_id):
             job_seeker.set_skills_list(data['skills'])
         
         db.session.commit()
+        _sync_job_seekers([job_seeker])
         
         return jsonify({
             'message': 'Job seeker updated successfully',
@@ -145,8 +196,10 @@ def delete_job_seeker(seeker_id):
     """Delete a job seeker"""
     try:
         job_seeker = JobSeeker.query.get_or_404(seeker_id)
+        PlacementPrediction.query.filter_by(job_seeker_id=seeker_id).delete()
         db.session.delete(job_seeker)
         db.session.commit()
+        remove_job_seeker(seeker_id)
         
         return jsonify({'message': 'Job seeker deleted successfully'})
         
@@ -154,6 +207,55 @@ def delete_job_seeker(seeker_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@admin_bp.route('/jobs-for-seeker/<int:seeker_id>', methods=['GET'])
+def get_jobs_for_seeker(seeker_id):
+    """Get ranked open job postings for a specific job seeker"""
+    try:
+        job_seeker = JobSeeker.query.get_or_404(seeker_id)
+        
+        # Get query parameters
+        top_k = request.args.get('top_k', 10, type=int)
+        min_score = request.args.get('min_score', 0.0, type=float)
+        
+        # Score the resident index of open job postings
+        posting_index = _ensure_posting_index()
+        matches = match_job_seeker(job_seeker.to_dict(), top_k, min_score)
+        
+        # Load the returned postings in one query
+        job_ids = [match['job_posting_id'] for match in matches]
+        job_postings = {
+            job.id: job.to_dict_summary()
+            for job in JobPosting.query.filter(JobPosting.id.in_(job_ids)).all()
+        } if job_ids else {}
+        
+        # Format response
+        formatted_matches = []
+        for match in matches:
+            formatted_matches.append({
+                'job_posting_id': match['job_posting_id'],
+                'match_score': match['match_score'],
+                'match_percentage': round(match['match_score'] * 100, 1),
+                'reasons': render_reasons(match['reason_codes']),
+                'job_posting': job_postings.get(match['job_posting_id']),
+                'score_breakdown': {
+                    'skills': round(match['skill_score'] * 100, 1),
+                    'location': round(match['location_score'] * 100, 1),
+                    'salary': round(match['salary_score'] * 100, 1),
+                    'experience': round(match['experience_score'] * 100, 1),
+                    'diploma': round(match['diploma_score'] * 100, 1)
+                }
+            })
+        
+        return jsonify({
+            'job_seeker': job_seeker.to_dict_summary(),
+            'matches': formatted_matches,
+            'total_matches': len(formatted_matches),
+            'total_postings_evaluated': len(posting_index)
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @admin_bp.route('/job-seekers/bulk-import', methods=['POST'])
 def bulk_import_job_seekers():
     """Bulk import job seekers from CSV data"""
@@ -165,10 +267,12 @@ def bulk_import_job_seekers():
         
         # Parse CSV data
         import io
+        import pandas as pd
         csv_string = data['csv_data']
         df = pd.read_csv(io.StringIO(csv_string))
         
         imported_count = 0
+        imported_seekers = []
         errors = []
         
         for index, row in df.iterrows():
@@ -210,12 +314,14 @@ def bulk_import_job_seekers():
                         pass  # Skip invalid skills data
                 
                 db.session.add(job_seeker)
+                imported_seekers.append(job_seeker)
                 imported_count += 1
                 
             except Exception as e:
                 errors.append(f"Row {index + 1}: {str(e)}")
         
         db.session.commit()
+        _sync_job_seekers(imported_seekers)
         
         return jsonify({
             'message': f'Successfully imported {imported_count} job seekers',
@@ -283,36 +389,175 @@ def get_statistics():
             },
             'matches': {
                 'total': total_matches
+            },
+            'ml_model': {
+                'status': ml_engine.model_status,
+                'model_id': ml_engine.model_id
             }
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Training modes: 'auto' updates the models incrementally unless they call for a full refit
+TRAINING_MODES = ('auto', 'full', 'incremental')
+
+def _run_training_job(app, job, mode='auto'):
+    """
+    Body of a background training job: load, featurize, fit and persist.
+
+    Training happens on a separate engine, so ml_engine keeps serving the
+    old models until the new ones are saved and swapped in. Incremental
+    updates fold in only the job seekers the models have not seen; 'auto'
+    runs a full refit instead when refit_reason gives a reason.
+    """
+    import pandas as pd
+    
+    with app.app_context():
+        job.enter_stage('load')
+        seekers_data = [seeker.to_dict() for seeker in JobSeeker.query.all()]
+        if not seekers_data:
+            raise ValueError('No job seekers data available for training')
+        
+        trained_engine = JobMatchingEngine()
+        refit_reason = None
+        new_seekers_data = seekers_data
+        if mode != 'full':
+            trained_engine.adopt_models(ml_engine)
+            # Job seekers the current models have not seen
+            if trained_engine.training_seeker_ids is not None:
+                indexed = set(trained_engine.training_seeker_ids.tolist())
+                new_seekers_data = [seeker for seeker in seekers_data if seeker['id'] not in indexed]
+            refit_reason = trained_engine.refit_reason(pd.DataFrame(new_seekers_data))
+        
+        if mode == 'full' or (mode == 'auto' and refit_reason is not None):
+            trained_engine.train_models(pd.DataFrame(seekers_data), progress=job.enter_stage)
+            mode, training_data_count = 'full', len(seekers_data)
+        elif new_seekers_data:
+            trained_engine.update_models(pd.DataFrame(new_seekers_data), progress=job.enter_stage)
+            mode, training_data_count = 'incremental', len(new_seekers_data)
+        else:
+            # Nothing new to learn from; keep serving the current models
+            return {
+                'mode': 'incremental',
+                'refit_reason': refit_reason,
+                'training_data_count': 0,
+                'model_id': ml_engine.model_id
+            }
+        
+        job.enter_stage('persist')
+        trained_engine.save_models(MODEL_DIR)
+        ml_engine.adopt_models(trained_engine)
+        
+        return {
+            'mode': mode,
+            'refit_reason': refit_reason,
+            'training_data_count': training_data_count,
+            'model_id': ml_engine.model_id,
+            'placement_predictions': _refresh_placement_predictions()
+        }
+
 @admin_bp.route('/train-ml-model', methods=['POST'])
 def train_ml_model():
-    """Train the machine learning model with current job seekers data"""
+    """Start training the machine learning model on current job seekers data in the background"""
     try:
-        # Get all job seekers
-        job_seekers = JobSeeker.query.all()
+        data = request.get_json(silent=True) or {}
+        mode = data.get('mode', 'auto')
+        if mode not in TRAINING_MODES:
+            return jsonify({'error': f"mode must be one of: {', '.join(TRAINING_MODES)}"}), 400
+        if mode == 'incremental' and ml_engine.refit_reason() in ('untrained', 'incomplete'):
+            return jsonify({'error': 'The current models cannot be updated incrementally; run a full training'}), 400
         
-        if not job_seekers:
-            return jsonify({'error': 'No job seekers data available for training'}), 400
+        app = current_app._get_current_object()
+        job, created = training_jobs.submit(lambda job: _run_training_job(app, job, mode))
         
-        # Convert to list of dictionaries
-        seekers_data = [seeker.to_dict() for seeker in job_seekers]
+        if not created:
+            return jsonify({
+                'error': 'A training job is already in progress',
+                'training_job': job.to_dict()
+            }), 409
         
-        # Initialize ML engine
-        success = initialize_ml_engine(seekers_data)
+        return jsonify({
+            'message': 'ML model training started',
+            'training_job': job.to_dict()
+        }), 202
         
-        if success:
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/training-jobs', methods=['GET'])
+def get_training_jobs():
+    """List recent training jobs, newest first"""
+    try:
+        return jsonify({'training_jobs': [job.to_dict() for job in training_jobs.jobs()]})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/training-jobs/<job_id>', methods=['GET'])
+def get_training_job(job_id):
+    """Get the status and progress of a training job"""
+    try:
+        job = training_jobs.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Training job not found'}), 404
+        return jsonify(job.to_dict())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/training-jobs/<job_id>/cancel', methods=['POST'])
+def cancel_training_job(job_id):
+    """Cancel a training job at its next stage"""
+    try:
+        cancelled = training_jobs.cancel(job_id)
+        if cancelled is None:
+            return jsonify({'error': 'Training job not found'}), 404
+        if not cancelled:
             return jsonify({
-                'message': 'ML model trained successfully',
-                'training_data_count': len(seekers_data)
-            })
-        else:
-            return jsonify({'error': 'Failed to train ML model'}), 500
-            
+                'error': 'Training job already finished',
+                'training_job': training_jobs.get(job_id).to_dict()
+            }), 409
+        return jsonify({
+            'message': 'Training job cancellation requested',
+            'training_job': training_jobs.get(job_id).to_dict()
+        })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@admin_bp.route('/placement-predictions/refresh', methods=['POST'])
+def refresh_placement_prediction_scores():
+    """Predict placement for every job seeker not yet scored by the current models"""
+    try:
+        if not ml_engine.is_trained:
+            return jsonify({'error': 'ML model is not trained'}), 400
+        
+        data = request.get_json(silent=True) or {}
+        return jsonify(_refresh_placement_predictions(full=bool(data.get('full', False))))
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/match-cache/stats', methods=['GET'])
+def get_match_cache_statistics():
+    """Get match cache hit/miss counters for sizing the cache"""
+    try:
+        return jsonify(get_match_cache_stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/request-timings', methods=['GET'])
+def get_request_timings():
+    """Get per-endpoint histograms of request stage times"""
+    try:
+        return jsonify(get_timing_histograms())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/request-timings', methods=['DELETE'])
+def reset_request_timings():
+    """Clear the request stage histograms"""
+    try:
+        reset_timing_histograms()
+        return jsonify({'message': 'Request timings reset'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,13 +1,180 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from src.models.user import db, User
 from src.models.job_seeker import JobSeeker
 from src.models.job_posting import JobPosting
 from src.models.job_match import JobMatch
-from src.ml_engine import get_job_matches
+from src.models.placement_prediction import PlacementPrediction
+from src.match_reasons import render_reasons
+from src.timing import span
+from src.ml_engine import (
+    ml_engine, load_job_seekers, match_job_posting, match_job_postings, sync_job_posting, remove_job_posting,
+    invalidate_job_matches, iter_job_posting_matches, apply_placement_predictions
+)
+from sqlalchemy.orm import load_only
 import json
 
 employer_bp = Blueprint('employer', __name__)
 
+# Most job postings a batch match request may name in job_ids
+MAX_BATCH_JOBS = 500
+
+def _ensure_candidate_store():
+    """Load the ML engine's candidate store from the database on first use"""
+    if not ml_engine.candidate_store.is_loaded:
+        with span('seeker_query'):
+            job_seekers = JobSeeker.query.filter_by(availability_status='available').all()
+        with span('seeker_to_dict'):
+            job_seeker_dicts = [seeker.to_dict() for seeker in job_seekers]
+        with span('store_load'):
+            load_job_seekers(job_seeker_dicts)
+        if ml_engine.model_id is not None:
+            apply_placement_predictions(PlacementPrediction.for_model(ml_engine.model_id), ml_engine.model_id)
+    return ml_engine.candidate_store
+
+def _parse_candidate_fields(value):
+    """Parse a fields= projection (comma-separated or a list); None means the full candidate record"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    fields = [str(field).strip() for field in value if str(field).strip()]
+    unknown = [field for field in fields if field not in JobSeeker.DICT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown candidate fields: {', '.join(unknown)}")
+    return ['id'] + [field for field in dict.fromkeys(fields) if field != 'id']
+
+def _parse_top_k(value):
+    """Parse a top_k value from a JSON body; it must be a positive integer"""
+    try:
+        if isinstance(value, (bool, float)):
+            raise ValueError
+        top_k = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('top_k must be a positive integer')
+    if top_k < 1:
+        raise ValueError('top_k must be a positive integer')
+    return top_k
+
+def _parse_min_score(value):
+    """Parse a min_score value from a JSON body; it must be a number between 0 and 1"""
+    try:
+        if isinstance(value, bool):
+            raise ValueError
+        min_score = float(value)
+    except (TypeError, ValueError):
+        raise ValueError('min_score must be a number between 0 and 1')
+    if not 0.0 <= min_score <= 1.0:
+        raise ValueError('min_score must be a number between 0 and 1')
+    return min_score
+
+def _parse_job_ids(value):
+    """Parse a job_ids value from a JSON body; it must be a non-empty list of at most MAX_BATCH_JOBS integers"""
+    if not isinstance(value, list) or not value or any(
+        isinstance(job_id, bool) or not isinstance(job_id, int) for job_id in value
+    ):
+        raise ValueError('job_ids must be a non-empty list of integers')
+    if len(value) > MAX_BATCH_JOBS:
+        raise ValueError(f'job_ids may name at most {MAX_BATCH_JOBS} job postings')
+    return value
+
+def _load_candidates(seeker_ids, fields=None):
+    """Load candidate records for the given job seeker IDs in one query, projected to fields"""
+    if not seeker_ids:
+        return {}
+    
+    query = JobSeeker.query.filter(JobSeeker.id.in_(seeker_ids))
+    if fields is None:
+        return {seeker.id: seeker.to_dict() for seeker in query.all()}
+    
+    query = query.options(load_only(*[getattr(JobSeeker, field) for field in fields]))
+    return {seeker.id: seeker.to_dict_fields(fields) for seeker in query.all()}
+
+def _format_match(match):
+    """Format an engine match for an API response"""
+    formatted_match = {
+        'job_seeker_id': match['job_seeker_id'],
+        'match_score': match['match_score'],
+        'match_percentage': round(match['match_score'] * 100, 1),
+        'reasons': render_reasons(match['reason_codes']),
+        'score_breakdown': {
+            'skills': round(match['skill_score'] * 100, 1),
+            'location': round(match['location_score'] * 100, 1),
+            'salary': round(match['salary_score'] * 100, 1),
+            'experience': round(match['experience_score'] * 100, 1),
+            'diploma': round(match['diploma_score'] * 100, 1)
+        }
+    }
+    if 'placement_probability' in match:
+        formatted_match['placement_probability'] = match['placement_probability']
+        formatted_match['ranking_score'] = match['ranking_score']
+    return formatted_match
+
+def _save_matches(matches_by_job):
+    """Store new JobMatch rows for {job_id: matches}, skipping pairs that already exist"""
+    job_ids = [job_id for job_id, matches in matches_by_job.items() if matches]
+    if not job_ids:
+        return
+    
+    seeker_ids = list({match['job_seeker_id'] for job_id in job_ids for match in matches_by_job[job_id]})
+    with span('match_exists_query'):
+        existing_pairs = set(
+            db.session.query(JobMatch.job_posting_id, JobMatch.job_seeker_id)
+            .filter(JobMatch.job_posting_id.in_(job_ids), JobMatch.job_seeker_id.in_(seeker_ids)).all()
+        )
+    
+    for job_id in job_ids:
+        for match in matches_by_job[job_id]:
+            if (job_id, match['job_seeker_id']) in existing_pairs:
+                continue
+            job_match = JobMatch(
+                job_posting_id=job_id,
+                job_seeker_id=match['job_seeker_id'],
+                match_score=match['match_score']
+            )
+            job_match.set_match_reason_codes(match['reason_codes'])
+            db.session.add(job_match)
+
+def _stream_job_matches(job_posting, job_posting_dict, top_k, min_score, fields, total_candidates,
+                        candidate_budget=None, placement_weight=0.0, min_placement_probability=None):
+    """
+    Stream ranked matches as newline-delimited JSON while they are produced.
+
+    The first line describes the job posting, then each match follows on its
+    own line, and a last line carries total_matches (or an error). Matches
+    are saved and their candidates loaded one engine chunk at a time.
+    """
+    job_id = job_posting.id
+    header = {
+        'job_posting': job_posting.to_dict_summary(),
+        'total_candidates_evaluated': total_candidates
+    }
+    
+    def generate():
+        yield json.dumps(header) + '\n'
+        total_matches = 0
+        try:
+            chunks = iter_job_posting_matches(
+                job_posting_dict, top_k, min_score, candidate_budget, placement_weight, min_placement_probability
+            )
+            for matches in chunks:
+                matches = [match for match in matches if match['match_score'] >= min_score]
+                _save_matches({job_id: matches})
+                db.session.commit()
+                
+                candidates = _load_candidates([match['job_seeker_id'] for match in matches], fields)
+                for match in matches:
+                    formatted_match = _format_match(match)
+                    formatted_match['candidate'] = candidates.get(match['job_seeker_id'])
+                    yield json.dumps(formatted_match) + '\n'
+                total_matches += len(matches)
+        except Exception as e:
+            db.session.rollback()
+            yield json.dumps({'error': str(e)}) + '\n'
+            return
+        yield json.dumps({'total_matches': total_matches}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @employer_bp.route('/jobs', methods=['GET'])
 def get_employer_jobs():
     """Get all job postings for the current employer"""
@@ -64,6 +231,7 @@ def create_job_posting():
         
         db.session.add(job_posting)
         db.session.commit()
+        sync_job_posting(job_posting.to_dict())
         
         return jsonify({
             'message': 'Job posting created successfully',
@@ -108,6 +276,7 @@ def update_job_posting(job_id):
             job_posting.set_preferred_skills_list(data['preferred_skills'])
         
         db.session.commit()
+        sync_job_posting(job_posting.to_dict())
         
         return jsonify({
             'message': 'Job posting updated successfully',
@@ -125,6 +294,7 @@ def delete_job_posting(job_id):
         job_posting = JobPosting.query.get_or_404(job_id)
         db.session.delete(job_posting)
         db.session.commit()
+        remove_job_posting(job_id)
         
         return jsonify({'message': 'Job posting deleted successfully'})
         
@@ -136,78 +306,153 @@ def delete_job_posting(job_id):
 def get_job_matches(job_id):
     """Get ranked candidate matches for a specific job posting"""
     try:
-        job_posting = JobPosting.query.get_or_404(job_id)
+        with span('posting_query'):
+            job_posting = JobPosting.query.get_or_404(job_id)
         
         # Get query parameters
         top_k = request.args.get('top_k', 10, type=int)
         min_score = request.args.get('min_score', 0.0, type=float)
-        
-        # Get all available job seekers
-        job_seekers = JobSeeker.query.filter_by(availability_status='available').all()
-        
-        if not job_seekers:
+        candidate_budget = request.args.get('candidate_budget', type=int)
+        if candidate_budget is not None and candidate_budget < 1:
+            return jsonify({'error': 'candidate_budget must be a positive integer'}), 400
+        placement_weight = request.args.get('placement_weight', 0.0, type=float)
+        min_placement_probability = request.args.get('min_placement_probability', type=float)
+        if not 0.0 <= placement_weight <= 1.0:
+            return jsonify({'error': 'placement_weight must be between 0 and 1'}), 400
+        try:
+            fields = _parse_candidate_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Score the resident snapshot of available job seekers
+        candidate_store = _ensure_candidate_store()
+        
+        if not len(candidate_store):
             return jsonify({
                 'matches': [],
                 'message': 'No available job seekers found'
             })
         
-        # Convert to list of dictionaries for ML engine
-        seekers_data = [seeker.to_dict() for seeker in job_seekers]
         job_posting_dict = job_posting.to_dict()
         
-        # Get matches from ML engine
-        from src.ml_engine import get_job_matches
-        matches = get_job_matches(job_posting_dict, seekers_data, top_k)
+        # Opt-in streaming for large exports
+        stream = request.args.get('stream', 'false').lower() in ('1', 'true', 'yes')
+        if stream or request.accept_mimetypes.best == 'application/x-ndjson':
+            return _stream_job_matches(
+                job_posting, job_posting_dict, top_k, min_score, fields, len(candidate_store),
+                candidate_budget, placement_weight, min_placement_probability
+            )
+        
+        with span('match'):
+            matches = match_job_posting(
+                job_posting_dict, top_k, min_score, candidate_budget, placement_weight, min_placement_probability
+            )
         
         # Filter by minimum score
         filtered_matches = [match for match in matches if match['match_score'] >= min_score]
         
         # Save matches to database
-        for match in filtered_matches:
-            # Check if match already exists
-            existing_match = JobMatch.query.filter_by(
-                job_posting_id=job_id,
-                job_seeker_id=match['job_seeker_id']
-            ).first()
-            
-            if not existing_match:
-                job_match = JobMatch(
-                    job_posting_id=job_id,
-                    job_seeker_id=match['job_seeker_id'],
-                    match_score=match['match_score']
-                )
-                job_match.set_match_reasons_list(match['reasons'])
-                db.session.add(job_match)
+        with span('save_matches'):
+            _save_matches({job_id: filtered_matches})
+        with span('commit'):
+            db.session.commit()
         
-        db.session.commit()
+        # Load the returned candidates in one query
+        with span('load_candidates'):
+            candidates = _load_candidates([match['job_seeker_id'] for match in filtered_matches], fields)
         
         # Format response
-        formatted_matches = []
-        for match in filtered_matches:
-            formatted_match = {
-                'job_seeker_id': match['job_seeker_id'],
-                'match_score': match['match_score'],
-                'match_percentage': round(match['match_score'] * 100, 1),
-                'reasons': match['reasons'],
-                'candidate': match['candidate_data'],
-                'score_breakdown': {
-                    'skills': round(match['skill_score'] * 100, 1),
-                    'location': round(match['location_score'] * 100, 1),
-                    'salary': round(match['salary_score'] * 100, 1),
-                    'experience': round(match['experience_score'] * 100, 1),
-                    'diploma': round(match['diploma_score'] * 100, 1)
-                }
-            }
-            formatted_matches.append(formatted_match)
+        with span('format'):
+            formatted_matches = []
+            for match in filtered_matches:
+                formatted_match = _format_match(match)
+                formatted_match['candidate'] = candidates.get(match['job_seeker_id'])
+                formatted_matches.append(formatted_match)
+        
+        with span('jsonify'):
+            return jsonify({
+                'job_posting': job_posting.to_dict_summary(),
+                'matches': formatted_matches,
+                'total_matches': len(formatted_matches),
+                'total_candidates_evaluated': len(candidate_store)
+            })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@employer_bp.route('/jobs/matches/batch', methods=['POST'])
+def get_batch_job_matches():
+    """Get ranked candidate matches for many job postings in one pass"""
+    try:
+        data = request.get_json() or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        
+        job_ids = data.get('job_ids')
+        all_active = data.get('all_active', False)
+        if job_ids is None and not all_active:
+            return jsonify({'error': 'Provide job_ids or set all_active'}), 400
+        
+        # Every parameter is checked before the first query
+        try:
+            if job_ids is not None:
+                job_ids = _parse_job_ids(job_ids)
+            top_k = _parse_top_k(data.get('top_k', 10))
+            min_score = _parse_min_score(data.get('min_score', 0.0))
+            fields = _parse_candidate_fields(data.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if all_active:
+            job_postings = JobPosting.query.filter_by(status='active').all()
+        else:
+            job_postings = JobPosting.query.filter(JobPosting.id.in_(job_ids)).all()
+        
+        found_ids = {job.id for job in job_postings}
+        missing_job_ids = [job_id for job_id in (job_ids or []) if job_id not in found_ids]
+        
+        # Score every posting against the resident candidate store at once
+        candidate_store = _ensure_candidate_store()
+        matches_by_job = match_job_postings([job.to_dict() for job in job_postings], top_k)
+        
+        # Filter by minimum score
+        matches_by_job = {
+            job_id: [match for match in matches if match['match_score'] >= min_score]
+            for job_id, matches in matches_by_job.items()
+        }
+        
+        # Save matches to database
+        _save_matches(matches_by_job)
+        db.session.commit()
+        
+        # Load the returned candidates of every posting in one query
+        candidates = _load_candidates(list({
+            match['job_seeker_id'] for matches in matches_by_job.values() for match in matches
+        }), fields)
+        
+        results = []
+        for job in job_postings:
+            matches = matches_by_job.get(job.id, [])
+            formatted_matches = []
+            for match in matches:
+                formatted_match = _format_match(match)
+                formatted_match['candidate'] = candidates.get(match['job_seeker_id'])
+                formatted_matches.append(formatted_match)
+            results.append({
+                'job_posting': job.to_dict_summary(),
+                'matches': formatted_matches,
+                'total_matches': len(matches)
+            })
         
         return jsonify({
-            'job_posting': job_posting.to_dict_summary(),
-            'matches': formatted_matches,
-            'total_matches': len(formatted_matches),
-            'total_candidates_evaluated': len(seekers_data)
+            'results': results,
+            'total_jobs': len(results),
+            'missing_job_ids': missing_job_ids,
+            'total_candidates_evaluated': len(candidate_store)
         })
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @employer_bp.route('/jobs/<int:job_id>/matches/refresh', methods=['POST'])
@@ -219,6 +464,7 @@ def refresh_job_matches(job_id):
         # Delete existing matches
         JobMatch.query.filter_by(job_posting_id=job_id).delete()
         db.session.commit()
+        invalidate_job_matches(job_id)
         
         # Redirect to get new matches
         return get_job_matches(job_id)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Interned skill vocabulary for the Job Matching System
+Maps skill strings to integer IDs and precomputes which skills match each other
+"""
+
+import numpy as np
+import json
+import threading
+from collections import OrderedDict
+
+def parse_skill_list(value):
+    """
+    Parse a skills value (JSON string or list) into a list of skill strings
+    """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except:
+            return []
+    if not isinstance(value, (list, tuple)):
+        return []
+    return [str(skill) for skill in value]
+
+# Most query-only skills (job skills not held by any stored seeker or posting) whose relation columns are cached
+QUERY_TERM_CACHE_SIZE = 4096
+
+class SkillVocabulary:
+    """
+    Interned, lowercased skill terms with a precomputed "contains-either-way" relation.
+
+    Two skills match when one lowercased string is a substring of the other,
+    which is the rule JobMatchingEngine.calculate_skill_similarity applies.
+    The relation is a symmetric boolean matrix indexed by skill ID, so skill
+    matching becomes array lookups instead of string scans. The vocabulary is
+    append-only: IDs stay valid for the life of the process.
+
+    Only skills of stored seekers, postings and models are interned. Skills
+    in match queries are looked up with query_relation, which compares
+    unknown skills with the vocabulary without adding them, so free-text
+    queries cannot grow the relation. The relation is published as a view
+    whose cells are never written again, so readers take no lock.
+
+    Each term also keeps the set of IDs it matches, for single-call scoring
+    where building relation slices costs more than the comparison itself.
+    """
+
+    def __init__(self, terms=()):
+        self.terms = []
+        self._term_ids = {}  # lowercased term -> id
+        self._raw_ids = {}  # raw skill string -> id, skips lower() on repeat lookups
+        self._related_ids = []  # id -> set of ids it matches, the relation's rows as Python sets
+        self._buffer = np.zeros((0, 0), dtype=bool)
+        self._relation = self._buffer  # published view of the filled part of _buffer
+        self._query_terms = OrderedDict()  # query-only term -> relation column, least recently used first
+        self._lock = threading.Lock()
+        self.intern_many(terms)
+
+    def __len__(self):
+        return len(self.terms)
+
+    @property
+    def relation(self):
+        """
+        Boolean matrix where relation[a, b] is True if skill a contains skill b or vice versa
+        """
+        return self._relation
+
+    def lookup(self, skill):
+        """
+        Return the ID of a skill, or None if it is not in the vocabulary
+        """
+        skill_id = self._raw_ids.get(skill)
+        if skill_id is None:
+            skill_id = self._term_ids.get(skill.lower())
+        return skill_id
+
+    def intern(self, skill):
+        """
+        Return the ID of a skill, adding it to the vocabulary if it is new
+        """
+        skill_id = self._raw_ids.get(skill)
+        if skill_id is not None:
+            return skill_id
+
+        with self._lock:
+            term = skill.lower()
+            skill_id = self._term_ids.get(term)
+            if skill_id is None:
+                skill_id = self._add_term(term)
+            self._raw_ids[skill] = skill_id
+        return skill_id
+
+    def intern_many(self, skills):
+        """
+        Return the IDs of a list of skills as an integer array
+        """
+        return np.array([self.intern(skill) for skill in skills], dtype=np.int64)
+
+    def _add_term(self, term):
+        """
+        Append a term, fill in its row and column of the relation and publish the grown view
+        """
+        skill_id = len(self.terms)
+        capacity = self._buffer.shape[0]
+        if skill_id == capacity:
+            grown = np.zeros((max(16, capacity * 2),) * 2, dtype=bool)
+            grown[:capacity, :capacity] = self._buffer
+            self._buffer = grown
+
+        related = np.fromiter(
+            (term in other or other in term for other in self.terms),
+            dtype=bool, count=skill_id
+        )
+        # Only cells outside every published view are written
+        self._buffer[skill_id, :skill_id] = related
+        self._buffer[:skill_id, skill_id] = related
+        self._buffer[skill_id, skill_id] = True
+
+        related_ids = set(np.flatnonzero(related).tolist())
+        related_ids.add(skill_id)
+        self._related_ids.append(related_ids)
+        for other_id in related_ids:
+            self._related_ids[other_id].add(skill_id)
+
+        self.terms.append(term)
+        self._term_ids[term] = skill_id
+        self._query_terms.pop(term, None)
+        self._relation = self._buffer[:skill_id + 1, :skill_id + 1]
+        return skill_id
+
+    def _query_column(self, term, size):
+        """
+        Relation column of a term that is not in the vocabulary, against the first size terms
+        """
+        with self._lock:
+            column = self._query_terms.pop(term, None)
+            if column is None:
+                column = np.zeros(0, dtype=bool)
+            if len(column) < size:
+                tail = np.fromiter(
+                    (term in other or other in term for other in self.terms[len(column):size]),
+                    dtype=bool, count=size - len(column)
+                )
+                column = np.concatenate([column, tail])
+            self._query_terms[term] = column
+            while len(self._query_terms) > QUERY_TERM_CACHE_SIZE:
+                self._query_terms.popitem(last=False)
+        return column[:size]
+
+    def query_relation(self, skills):
+        """
+        Relation columns (vocabulary x skills) of a list of query skills, without interning them
+        """
+        relation = self.relation
+        size = len(relation)
+        columns = np.zeros((size, len(skills)), dtype=bool)
+        for i, skill in enumerate(skills):
+            skill_id = self.lookup(skill)
+            if skill_id is not None and skill_id < size:
+                columns[:, i] = relation[:, skill_id]
+            else:
+                columns[:, i] = self._query_column(skill.lower(), size)
+        return columns
+
+    def count_related(self, skills, others):
+        """
+        Number of skills that match at least one of others, without interning either list
+        """
+        lookup = self.lookup
+        other_ids = set()
+        unknown_others = []
+        for other in others:
+            other_id = lookup(other)
+            if other_id is None:
+                unknown_others.append(other.lower())
+            else:
+                other_ids.add(other_id)
+
+        count = 0
+        lowered = None
+        related_ids = self._related_ids
+        for skill in skills:
+            skill_id = lookup(skill)
+            if skill_id is not None:
+                if not other_ids.isdisjoint(related_ids[skill_id]):
+                    count += 1
+                    continue
+                if not unknown_others:
+                    continue
+                # Known skills are compared as strings only with skills outside the vocabulary
+                term = self.terms[skill_id]
+                candidates = unknown_others
+            else:
+                if lowered is None:
+                    lowered = [other.lower() for other in others]
+                term = skill.lower()
+                candidates = lowered
+            for other in candidates:
+                if term in other or other in term:
+                    count += 1
+                    break
+        return count
+
+    def encode_lists(self, skill_lists):
+        """
+        Encode a sequence of skill lists as a sparse (rows x vocabulary) skill ID set matrix
+        """
+        indptr = [0]
+        indices = []
+        for skills in skill_lists:
+            indices.extend(dict.fromkeys(self.intern(skill) for skill in skills))
+            indptr.append(len(indices))
+        return self.skill_matrix(np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int64))
+
+    def skill_matrix(self, indptr, indices):
+        """
+        Build a CSR matrix from skill ID set arrays, sized to the current vocabulary
+        """
+        from scipy import sparse
+        data = np.ones(len(indices), dtype=np.int32)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(self.relation)))
+
+    def match_fractions(self, skill_matrix, job_skills):
+        """
+        Fraction of job skills matched by each row of a skill ID set matrix.
+
+        A job skill is matched when any of the row's skills is related to it,
+        so counting related skills with a sparse product and testing > 0 gives
+        the per-skill hits. The job skills are looked up, not interned.
+        """
+        rows = skill_matrix.shape[0]
+        if len(job_skills) == 0:
+            return np.zeros(rows)
+        related = self.query_relation(job_skills)[:skill_matrix.shape[1]].astype(np.int32)
+        hits = np.asarray(skill_matrix @ related) > 0
+        return hits.sum(axis=1) / len(job_skills)
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic data for load and scale testing of the Job Matching System
+Fits seeker and posting distributions from the Suryamitra data files and streams any number of rows in fixed-size chunks
+"""
+
+import json
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLEANED_CSV = os.path.join(DATA_DIR, 'suryamitra_final_cleaned_2018_2023.csv')
+SEEKERS_CSV = os.path.join(DATA_DIR, 'suryamitra_job_seekers.csv')
+POSTINGS_CSV = os.path.join(DATA_DIR, 'sample_job_postings.csv')
+
+# Rows drawn per random stream; row contents depend only on the seed and the row's id
+CHUNK_SIZE = 50000
+
+QUALIFICATION = 'Suryamitra Solar Technician Certification'
+
+SEEKER_COLUMNS = [
+    'id', 'name', 'phone_number', 'email', 'city', 'state', 'qualifications', 'diploma_score',
+    'experience_years', 'skills', 'category', 'gender', 'training_result', 'placement_status',
+    'preferred_salary_min', 'preferred_salary_max', 'availability_status', 'created_at', 'updated_at'
+]
+
+POSTING_COLUMNS = [
+    'id', 'employer_id', 'title', 'description', 'required_qualifications', 'required_skills',
+    'preferred_skills', 'city', 'state', 'salary_min', 'salary_max', 'experience_required',
+    'minimum_diploma_score', 'status', 'created_at', 'updated_at'
+]
+
+def _placement_status(value):
+    # Same normalization update_database_with_new_data.py applies when loading the cleaned data
+    value = str(value).strip().lower()
+    if value in ('yes', 'y', 'placed', 'true'):
+        return 'Placed'
+    if value in ('no', 'n', 'not placed', 'false'):
+        return 'Not Placed'
+    return 'Unknown'
+
+def _frequencies(values):
+    counts = pd.Series(values).value_counts(sort=False)
+    counts = counts.sort_index()
+    return counts.index.to_numpy(), (counts / counts.sum()).to_numpy()
+
+class SyntheticProfile:
+    """
+    Distributions the generator samples from.
+
+    The cleaned 2018-2023 data carries gender, category, training result,
+    placement status and batch year, so those are fitted from it jointly,
+    keeping e.g. the link between result and placement. Its State, District,
+    Diploma_Marks and qualification columns are empty, so locations, scores,
+    skills, salaries and experience are fitted from the Suryamitra job seekers
+    file instead, with every posting location and skill smoothed in.
+    """
+
+    def __init__(self, demographics, demographic_p, batch_years, batch_year_p, locations, location_p,
+                 skills, skill_p, required_skill_p, preferred_skill_p, diploma, salary_min, salary_max,
+                 experience, experience_p, posting_templates):
+        self.demographics = demographics  # rows of (gender, category, training_result, placement_status)
+        self.demographic_p = demographic_p
+        self.batch_years = batch_years
+        self.batch_year_p = batch_year_p
+        self.locations = locations  # rows of (city, state)
+        self.location_p = location_p
+        self.skills = skills
+        self.skill_p = skill_p  # independent inclusion probability of each skill on a seeker
+        self.required_skill_p = required_skill_p  # ... and in a posting's required and preferred skills
+        self.preferred_skill_p = preferred_skill_p
+        self.diploma = diploma  # (mean, std, min, max)
+        self.salary_min = salary_min
+        self.salary_max = salary_max
+        self.experience = experience
+        self.experience_p = experience_p
+        self.posting_templates = posting_templates
+
+    @classmethod
+    def from_files(cls, cleaned_csv=CLEANED_CSV, seekers_csv=SEEKERS_CSV, postings_csv=POSTINGS_CSV):
+        cleaned = pd.read_csv(cleaned_csv)
+        seekers = pd.read_csv(seekers_csv)
+        postings = pd.read_csv(postings_csv)
+
+        demographics = pd.DataFrame({
+            'gender': cleaned['Gender'].fillna('Unknown'),
+            'category': cleaned['Category'].fillna('General').replace({'GEN.': 'Gen'}),
+            'training_result': cleaned['Result'].fillna('Pass'),
+            'placement_status': cleaned['Placement_Status'].map(_placement_status)
+        })
+        combinations = demographics.value_counts(sort=False).sort_index()
+        batch_years = cleaned['Batch_Detail'].str.extract(r'/(\d{4})-')[0].dropna().astype(int)
+
+        # Locations and skills seen in postings get one pseudo-count so every posting can find candidates
+        location_counts = seekers.groupby(['city', 'state']).size()
+        for location in postings[['city', 'state']].itertuples(index=False, name=None):
+            location_counts[location] = location_counts.get(location, 0) + 1
+        location_counts = location_counts.sort_index()
+
+        seeker_skills = seekers['skills'].map(json.loads)
+        skill_counts = pd.Series([skill for skills in seeker_skills for skill in skills]).value_counts()
+        for column in ('required_skills', 'preferred_skills'):
+            for skill in {skill for skills in postings[column].map(json.loads) for skill in skills}:
+                skill_counts[skill] = skill_counts.get(skill, 0) + 1
+        skill_counts = skill_counts.sort_index(kind='stable').sort_values(ascending=False, kind='stable')
+
+        def posting_skill_p(column):
+            counts = pd.Series([skill for skills in postings[column].map(json.loads) for skill in skills]).value_counts()
+            return counts.reindex(skill_counts.index, fill_value=0).to_numpy() / len(postings)
+
+        experience, experience_p = _frequencies(seekers['experience_years'])
+
+        def normal_fit(column):
+            values = seekers[column].astype(float)
+            return (values.mean(), values.std(), values.min(), values.max())
+
+        return cls(
+            demographics=np.array(combinations.index.tolist(), dtype=object),
+            demographic_p=(combinations / combinations.sum()).to_numpy(),
+            batch_years=_frequencies(batch_years)[0],
+            batch_year_p=_frequencies(batch_years)[1],
+            locations=np.array(location_counts.index.tolist(), dtype=object),
+            location_p=(location_counts / location_counts.sum()).to_numpy(),
+            skills=skill_counts.index.tolist(),
+            skill_p=np.minimum(skill_counts.to_numpy() / (len(seekers) + 1), 1.0),
+            required_skill_p=posting_skill_p('required_skills'),
+            preferred_skill_p=posting_skill_p('preferred_skills'),
+            diploma=normal_fit('diploma_score'),
+            salary_min=normal_fit('preferred_salary_min'),
+            salary_max=normal_fit('preferred_salary_max'),
+            experience=experience,
+            experience_p=experience_p,
+            posting_templates=postings.to_dict('records')
+        )
+
+def _clipped_normal(rng, fit, size):
+    mean, std, low, high = fit
+    return np.clip(rng.normal(mean, std, size), low, high)
+
+def _timestamps(rng, years, size):
+    # Batches run over Indian financial years, starting in April
+    unique_years, inverse = np.unique(years, return_inverse=True)
+    starts = np.array([f'{year}-04-01' for year in unique_years], dtype='datetime64[s]')[inverse]
+    seconds = rng.integers(0, 365 * 24 * 3600, size)
+    stamps = np.datetime_as_string(starts + seconds.astype('timedelta64[s]'), unit='s')
+    return np.char.replace(stamps, 'T', ' ')
+
+class SyntheticDataGenerator:
+    """
+    Deterministic seeker and posting generator.
+
+    Seekers are drawn in CHUNK_SIZE blocks, each from its own random stream
+    keyed by (seed, block), so a smaller run is exactly the head of a larger
+    one and any block can be regenerated on its own.
+    """
+
+    def __init__(self, profile=None, seed=42, num_employers=100):
+        self.profile = profile or SyntheticProfile.from_files()
+        self.seed = seed
+        self.num_employers = num_employers
+
+    def _skill_sets(self, rng, size, skill_p, minimum=0):
+        included = rng.random((size, len(self.profile.skills))) < skill_p
+        if minimum:
+            # Postings always require something; short sets get their likeliest missing skills
+            for row in np.flatnonzero(included.sum(axis=1) < minimum):
+                for skill in np.argsort(-skill_p, kind='stable'):
+                    if included[row].sum() >= minimum:
+                        break
+                    included[row, skill] = True
+        # Rows share few distinct skill sets, so each distinct set is serialized once
+        sets, inverse = np.unique(included, axis=0, return_inverse=True)
+        skills = np.array(self.profile.skills, dtype=object)
+        return np.array([json.dumps(skills[row].tolist()) for row in sets], dtype=object)[inverse.ravel()]
+
+    def seeker_block(self, block):
+        """
+        All CHUNK_SIZE seekers of one block, as a DataFrame
+        """
+        profile = self.profile
+        rng = np.random.default_rng([self.seed, 0, block])
+        size = CHUNK_SIZE
+        ids = np.arange(block * size + 1, (block + 1) * size + 1)
+        id_text = ids.astype(str)
+
+        demographics = profile.demographics[rng.choice(len(profile.demographics), size, p=profile.demographic_p)]
+        locations = profile.locations[rng.choice(len(profile.locations), size, p=profile.location_p)]
+        salary_min = np.round(_clipped_normal(rng, profile.salary_min, size)).astype(int)
+        salary_max = np.maximum(np.round(_clipped_normal(rng, profile.salary_max, size)).astype(int), salary_min)
+        placement = demographics[:, 3]
+        created_at = _timestamps(rng, rng.choice(profile.batch_years, size, p=profile.batch_year_p), size)
+
+        return pd.DataFrame({
+            'id': ids,
+            'name': np.char.add('Synthetic Seeker ', id_text),
+            'phone_number': np.char.add('+91-', rng.integers(6000000000, 10000000000, size).astype(str)),
+            'email': np.char.add(np.char.add('seeker', id_text), '@example.com'),
+            'city': locations[:, 0],
+            'state': locations[:, 1],
+            'qualifications': QUALIFICATION,
+            'diploma_score': np.round(_clipped_normal(rng, profile.diploma, size), 2),
+            'experience_years': rng.choice(profile.experience, size, p=profile.experience_p),
+            'skills': self._skill_sets(rng, size, profile.skill_p),
+            'category': demographics[:, 1],
+            'gender': demographics[:, 0],
+            'training_result': demographics[:, 2],
+            'placement_status': placement,
+            'preferred_salary_min': salary_min,
+            'preferred_salary_max': salary_max,
+            'availability_status': np.where(placement == 'Placed', 'unavailable', 'available'),
+            'created_at': created_at,
+            'updated_at': created_at
+        }, columns=SEEKER_COLUMNS)
+
+    def seeker_chunks(self, num_seekers):
+        """
+        Yield num_seekers seekers as DataFrames of at most CHUNK_SIZE rows
+        """
+        for block in range((num_seekers + CHUNK_SIZE - 1) // CHUNK_SIZE):
+            chunk = self.seeker_block(block)
+            yield chunk.iloc[:num_seekers - block * CHUNK_SIZE]
+
+    def job_seekers(self, num_seekers):
+        """
+        num_seekers seekers as one DataFrame
+        """
+        return pd.concat(list(self.seeker_chunks(num_seekers)), ignore_index=True)
+
+    def job_postings(self, num_postings):
+        """
+        num_postings postings as one DataFrame, varied from the sample posting templates
+        """
+        profile = self.profile
+        rng = np.random.default_rng([self.seed, 1])
+        templates = pd.DataFrame(profile.posting_templates).iloc[rng.integers(len(profile.posting_templates), size=num_postings)]
+        locations = profile.locations[rng.choice(len(profile.locations), num_postings, p=profile.location_p)]
+        salary_min = np.round(templates['salary_min'].to_numpy() * rng.uniform(0.85, 1.15, num_postings), -2).astype(int)
+        salary_max = np.maximum(
+            np.round(templates['salary_max'].to_numpy() * rng.uniform(0.85, 1.15, num_postings), -2).astype(int),
+            salary_min + 2000
+        )
+        minimum_diploma = np.clip(templates['minimum_diploma_score'].to_numpy() + rng.choice([-5.0, 0.0, 5.0], num_postings), 50.0, 95.0)
+        created_at = _timestamps(rng, np.full(num_postings, profile.batch_years.max()), num_postings)
+
+        return pd.DataFrame({
+            'id': np.arange(1, num_postings + 1),
+            'employer_id': rng.integers(1, self.num_employers + 1, num_postings),
+            'title': templates['title'].to_numpy(),
+            'description': templates['description'].to_numpy(),
+            'required_qualifications': templates['required_qualifications'].to_numpy(),
+            'required_skills': self._skill_sets(rng, num_postings, profile.required_skill_p, minimum=1),
+            'preferred_skills': self._skill_sets(rng, num_postings, profile.preferred_skill_p),
+            'city': locations[:, 0],
+            'state': locations[:, 1],
+            'salary_min': salary_min,
+            'salary_max': salary_max,
+            'experience_required': templates['experience_required'].to_numpy(),
+            'minimum_diploma_score': minimum_diploma,
+            'status': 'active',
+            'created_at': created_at,
+            'updated_at': created_at
+        }, columns=POSTING_COLUMNS)
+
+def _create_tables(path):
+    # Tables come from the app's own models, so the file can be pointed at by the API as is
+    from sqlalchemy import create_engine
+    from src.models.user import db, User
+    from src.models.job_seeker import JobSeeker
+    from src.models.job_posting import JobPosting
+    from src.models.job_match import JobMatch
+    from src.models.placement_prediction import PlacementPrediction
+
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine, tables=[
+        model.__table__ for model in (User, JobSeeker, JobPosting, JobMatch, PlacementPrediction)
+    ])
+    engine.dispose()
+
+def _insert(conn, table, columns, df):
+    placeholders = ', '.join('?' * len(columns))
+    conn.executemany(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+        df[columns].astype(object).itertuples(index=False, name=None)
+    )
+
+def write_sqlite(path, generator, num_seekers, num_postings, progress=None):
+    """
+    Bulk insert employers, postings and seekers into a new SQLite database at path.
+
+    Refuses to touch an existing file. progress, if given, is called with
+    the number of seekers written after each chunk.
+    """
+    if os.path.exists(path):
+        raise FileExistsError(f"{path} already exists; synthetic data is only written to a new database")
+    _create_tables(path)
+
+    from werkzeug.security import generate_password_hash
+    password_hash = generate_password_hash('employer123')
+
+    conn = sqlite3.connect(path)
+    try:
+        # The file is disposable until the load finishes, so skip the journal and fsyncs
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        with conn:
+            conn.executemany(
+                "INSERT INTO users (id, username, email, password_hash, role) VALUES (?, ?, ?, ?, 'employer')",
+                ((i, f'employer{i}', f'employer{i}@example.com', password_hash) for i in range(1, generator.num_employers + 1))
+            )
+            _insert(conn, 'job_postings', POSTING_COLUMNS, generator.job_postings(num_postings))
+        written = 0
+        for chunk in generator.seeker_chunks(num_seekers):
+            with conn:
+                _insert(conn, 'job_seekers', SEEKER_COLUMNS, chunk)
+            written += len(chunk)
+            if progress:
+                progress(written)
+    finally:
+        conn.close()
+
+def _column_arrays(df):
+    # Text columns are stored as fixed-width unicode so they load without pickle
+    return {
+        column: df[column].to_numpy().astype(str) if df[column].dtype == object else df[column].to_numpy()
+        for column in df.columns
+    }
+
+def write_columnar(directory, generator, num_seekers, num_postings, progress=None):
+    """
+    Write postings.npz and one seekers-<block>.npz per chunk to directory, one array per column
+    """
+    os.makedirs(directory, exist_ok=True)
+    np.savez(os.path.join(directory, 'postings.npz'), **_column_arrays(generator.job_postings(num_postings)))
+    written = 0
+    for block, chunk in enumerate(generator.seeker_chunks(num_seekers)):
+        np.savez(os.path.join(directory, f'seekers-{block:05d}.npz'), **_column_arrays(chunk))
+        written += len(chunk)
+        if progress:
+            progress(written)
+
+def read_columnar(directory):
+    """
+    Read a write_columnar directory back as (job_seekers_df, job_postings_df)
+    """
+    def frame(path, columns):
+        with np.load(path) as arrays:
+            return pd.DataFrame({column: arrays[column] for column in columns})
+
+    blocks = sorted(name for name in os.listdir(directory) if name.startswith('seekers-'))
+    seekers = pd.concat([frame(os.path.join(directory, name), SEEKER_COLUMNS) for name in blocks], ignore_index=True)
+    return seekers, frame(os.path.join(directory, 'postings.npz'), POSTING_COLUMNS)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Per-request stage timers for the Job Matching System
+Code on the request path wraps its stages in span(); each request's stage times are kept for a Server-Timing header and folded into histograms
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+# REQUEST_TIMING=0 turns the timers off; TIMING_HEADER=1 returns each request's stage times in a Server-Timing header
+TIMING_ENABLED = os.environ.get('REQUEST_TIMING', '1') == '1'
+TIMING_HEADER = os.environ.get('TIMING_HEADER', '0') == '1'
+
+# Upper bounds of the histogram buckets in milliseconds; a last bucket holds everything slower
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Timings of the request being handled in this context, or None outside an instrumented request
+_current_timings = ContextVar('request_timings', default=None)
+
+class RequestTimings:
+    """
+    Stage times of one request.
+
+    A stage entered more than once in a request (e.g. scoring one candidate
+    group after another) accumulates its time and a span count. Spans may
+    nest, so stage times can add up to more than the request's total.
+    """
+
+    __slots__ = ('started_ns', 'stages')
+
+    def __init__(self):
+        self.started_ns = time.perf_counter_ns()
+        self.stages = {}  # stage -> [total ns, span count]
+
+    def add(self, stage, elapsed_ns):
+        entry = self.stages.get(stage)
+        if entry is None:
+            self.stages[stage] = [elapsed_ns, 1]
+        else:
+            entry[0] += elapsed_ns
+            entry[1] += 1
+
+    def total_ms(self):
+        return (time.perf_counter_ns() - self.started_ns) / 1e6
+
+    def server_timing(self, total_ms):
+        """
+        The stage times as a Server-Timing header value
+        """
+        metrics = [f'{stage};dur={elapsed_ns / 1e6:.3f}' for stage, (elapsed_ns, _) in self.stages.items()]
+        metrics.append(f'total;dur={total_ms:.3f}')
+        return ', '.join(metrics)
+
+class span:
+    """
+    Time a block as a stage of the current request: with span('score'): ...
+
+    Outside an instrumented request it only does one context variable lookup.
+    """
+
+    __slots__ = ('stage', 'timings', 'start_ns')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.timings = _current_timings.get()
+        if self.timings is not None:
+            self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.timings is not None:
+            self.timings.add(self.stage, time.perf_counter_ns() - self.start_ns)
+        return False
+
+class StageHistogram:
+    """
+    Bucketed distribution of one stage's per-request time
+    """
+
+    __slots__ = ('buckets', 'count', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms):
+        self.buckets[bisect_left(BUCKET_BOUNDS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def percentile(self, q):
+        """
+        Upper bound of the bucket holding the q-th percentile; the slowest bucket reports the maximum seen
+        """
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return min(BUCKET_BOUNDS_MS[i], self.max_ms) if i < len(BUCKET_BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(50), 3),
+            'p95_ms': round(self.percentile(95), 3),
+            'p99_ms': round(self.percentile(99), 3),
+            'max_ms': round(self.max_ms, 3),
+            'buckets': [
+                {'le_ms': bound, 'count': count}
+                for bound, count in zip(list(BUCKET_BOUNDS_MS) + [None], self.buckets)
+            ]
+        }
+
+class TimingHistograms:
+    """
+    Stage histograms per endpoint, across requests
+    """
+
+    def __init__(self):
+        self._histograms = {}  # endpoint -> {stage -> StageHistogram}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, timings, total_ms):
+        with self._lock:
+            stages = self._histograms.setdefault(endpoint, {})
+            for stage, (elapsed_ns, _) in timings.stages.items():
+                stages.setdefault(stage, StageHistogram()).record(elapsed_ns / 1e6)
+            stages.setdefault('total', StageHistogram()).record(total_ms)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                endpoint: {stage: histogram.to_dict() for stage, histogram in stages.items()}
+                for endpoint, stages in self._histograms.items()
+            }
+
+timing_histograms = TimingHistograms()
+
+def init_request_timing(app, header=None):
+    """
+    Time every request of app: stages come from the spans it runs through, plus its total.
+
+    With header (default TIMING_HEADER), responses carry the request's
+    stage times in a Server-Timing header. Streamed response bodies run
+    after the request is recorded, so their spans are not timed.
+    """
+    if not TIMING_ENABLED:
+        return
+    if header is None:
+        header = TIMING_HEADER
+
+    from flask import g, request
+
+    @app.before_request
+    def start_request_timing():
+        g.request_timing_token = _current_timings.set(RequestTimings())
+
+    @app.after_request
+    def finish_request_timing(response):
+        token = g.pop('request_timing_token', None)
+        if token is None:
+            return response
+        timings = _current_timings.get()
+        _current_timings.reset(token)
+        total_ms = timings.total_ms()
+        timing_histograms.record(request.endpoint or 'unmatched', timings, total_ms)
+        if header:
+            response.headers['Server-Timing'] = timings.server_timing(total_ms)
+        return response
+
+    @app.teardown_request
+    def discard_request_timing(exc):
+        # after_request is skipped when a view raises
+        token = g.pop('request_timing_token', None)
+        if token is not None:
+            _current_timings.reset(token)
+
+def get_timing_histograms():
+    """
+    Get the per-endpoint stage histograms
+    """
+    return timing_histograms.to_dict()
+
+def reset_timing_histograms():
+    """
+    Clear the stage histograms
+    """
+    timing_histograms.reset()
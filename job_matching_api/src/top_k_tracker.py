@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Incrementally maintained top-k candidate lists for the Job Matching System
+Lets a single job seeker write patch each posting's ranking instead of rescoring the whole pool
+"""
+
+import bisect
+
+class TopKTracker:
+    """
+    The best candidates of one job posting, kept exact across job seeker writes.
+
+    Entries are (-match_score, job_seeker_id) pairs in ranking order, so ties
+    break by seeker ID like rank_candidates. The list always holds the exact
+    top len(entries) of the candidate pool. It keeps up to capacity entries,
+    which leaves some slack above the top_k requests it serves: a ranked
+    seeker that leaves or drops down shrinks the list, and it only needs a
+    rebuild once fewer than top_k entries remain. When exhaustive is True the
+    list holds the whole pool, so any seeker can be inserted.
+    """
+
+    def __init__(self, job_posting, version, capacity, matches, pool_version):
+        self.job_posting = job_posting
+        self.version = version
+        self.capacity = capacity
+        self.entries = [(-match['match_score'], match['job_seeker_id']) for match in matches]
+        self.exhaustive = len(self.entries) < capacity
+        self.pool_version = pool_version
+
+    def __len__(self):
+        return len(self.entries)
+
+    def top(self, top_k):
+        """
+        The (job_seeker_id, match_score) pairs of the top_k candidates, or None if the list cannot tell
+        """
+        if top_k > len(self.entries) and not self.exhaustive:
+            return None
+        return [(seeker_id, -neg_score) for neg_score, seeker_id in self.entries[:top_k]]
+
+    def apply(self, seeker_id, score):
+        """
+        Patch the list for a job seeker whose match score is now score, or None if it left the pool
+        """
+        for i, (_, ranked_id) in enumerate(self.entries):
+            if ranked_id == seeker_id:
+                del self.entries[i]
+                break
+
+        if score is None:
+            return
+
+        entry = (-score, seeker_id)
+        # Past the last entry the seeker's rank is unknown, unless the list is the whole pool
+        if not self.exhaustive and (not self.entries or entry > self.entries[-1]):
+            return
+
+        bisect.insort(self.entries, entry)
+        if len(self.entries) > self.capacity:
+            self.entries.pop()
+            self.exhaustive = False
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Background model training jobs for the Job Matching System
+Runs training off the request thread, with progress stages, cancellation and status for polling
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+# Stages a training job goes through, in order
+TRAINING_STAGES = ('load', 'featurize', 'fit', 'persist')
+
+# Finished jobs kept for status queries
+MAX_FINISHED_JOBS = 20
+
+class TrainingCancelled(Exception):
+    """
+    Raised inside a training job when it is cancelled
+    """
+
+class TrainingJob:
+    """
+    One training run and its progress.
+
+    The job body calls enter_stage() as it reaches each stage; a stage counts
+    as completed once the next one is entered or the job succeeds, so a run
+    that skips stages (e.g. an incremental update with nothing new) only
+    reports the stages it ran. Cancellation
+    is cooperative: cancel() sets a flag that the next enter_stage() turns
+    into TrainingCancelled, so a stage already running (e.g. a model fit)
+    finishes first.
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = 'queued'  # queued, running, succeeded, failed, cancelled
+        self.stage = None
+        self.stage_started_at = {}  # stage -> datetime
+        self.completed_stages = []  # stages that ran to the end, in order
+        self.created_at = datetime.utcnow()
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self._cancel_requested = threading.Event()
+
+    @property
+    def is_finished(self):
+        return self.status in ('succeeded', 'failed', 'cancelled')
+
+    def enter_stage(self, stage):
+        """
+        Record that the job reached a stage, or stop it if it was cancelled
+        """
+        if self._cancel_requested.is_set():
+            raise TrainingCancelled(f"Cancelled before stage '{stage}'")
+        self.complete_stage()
+        self.stage = stage
+        self.stage_started_at[stage] = datetime.utcnow()
+
+    def complete_stage(self):
+        """
+        Record that the current stage ran to the end
+        """
+        if self.stage is not None and self.stage not in self.completed_stages:
+            self.completed_stages.append(self.stage)
+
+    def cancel(self):
+        """
+        Ask the job to stop at its next stage boundary; returns False if it already finished
+        """
+        if self.is_finished:
+            return False
+        self._cancel_requested.set()
+        return True
+
+    def to_dict(self):
+        completed = list(self.completed_stages)
+        progress = 1.0 if self.status == 'succeeded' else round(len(completed) / len(TRAINING_STAGES), 2)
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'stage': self.stage,
+            'stages': list(TRAINING_STAGES),
+            'completed_stages': completed,
+            'progress': progress,
+            'cancel_requested': self._cancel_requested.is_set(),
+            'created_at': self.created_at.isoformat(),
+            'stage_started_at': {stage: started.isoformat() for stage, started in self.stage_started_at.items()},
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'result': self.result,
+            'error': self.error
+        }
+
+class TrainingJobManager:
+    """
+    Runs at most one training job at a time on a background thread and keeps recent jobs for status queries
+    """
+
+    def __init__(self, max_finished=MAX_FINISHED_JOBS):
+        self.max_finished = max_finished
+        self._jobs = OrderedDict()  # job id -> TrainingJob, oldest first
+        self._lock = threading.Lock()
+
+    def active_job(self):
+        """
+        The job that is queued or running, or None
+        """
+        with self._lock:
+            return self._active_job()
+
+    def _active_job(self):
+        for job in self._jobs.values():
+            if not job.is_finished:
+                return job
+        return None
+
+    def submit(self, run):
+        """
+        Start a job running run(job) in the background.
+
+        Returns (job, True) for a new job, or (active job, False) if a
+        training job is already in progress.
+        """
+        with self._lock:
+            active = self._active_job()
+            if active is not None:
+                return active, False
+            job = TrainingJob()
+            self._jobs[job.id] = job
+            self._trim()
+
+        thread = threading.Thread(target=self._run, args=(job, run), name=f'training-{job.id}', daemon=True)
+        thread.start()
+        return job, True
+
+    def _run(self, job, run):
+        job.status = 'running'
+        try:
+            job.result = run(job)
+            job.complete_stage()
+            job.status = 'succeeded'
+        except TrainingCancelled as e:
+            job.error = str(e)
+            job.status = 'cancelled'
+        except Exception as e:
+            print(f"Training job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = 'failed'
+        job.finished_at = datetime.utcnow()
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.is_finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        """
+        A job by ID, or None
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        """
+        Known jobs, newest first
+        """
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id):
+        """
+        Request cancellation of a job; returns None if the job is unknown
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        return job.cancel()
+
+# Global training job manager
+training_jobs = TrainingJobManager()